@@ -0,0 +1,39 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import AudioBlob, GenerationJob, Job, LLMCacheEntry
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'max_attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error')
+    actions = ['retry_jobs']
+
+    @admin.action(description='Retry selected failed jobs')
+    def retry_jobs(self, request, queryset):
+        retried = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED, attempts=0, deferrals=0, run_after=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f"Queued {retried} jobs again.")
+
+
+@admin.register(LLMCacheEntry)
+class LLMCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('key', 'model', 'size_bytes', 'hits', 'created_at', 'last_used_at', 'expires_at')
+    list_filter = ('model',)
+    readonly_fields = ('key', 'model', 'response', 'size_bytes', 'hits', 'created_at', 'last_used_at')
+
+
+@admin.register(AudioBlob)
+class AudioBlobAdmin(admin.ModelAdmin):
+    list_display = ('key', 'file', 'size_bytes', 'created_at', 'last_used_at')
+    readonly_fields = ('key', 'file', 'size_bytes', 'created_at', 'last_used_at')
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'test_id', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('batch', 'stages', 'content', 'test_id', 'error', 'created_at', 'started_at', 'finished_at')
@@ -3,4 +3,9 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api' 
\ No newline at end of file
+    name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import http_clients
+        http_clients.configure()
@@ -0,0 +1,163 @@
+"""Near-duplicate writing answers, so a resubmitted essay reuses its evaluation.
+
+Each answer is reduced to word 3-shingles and a ``NUM_PERM``-value MinHash
+signature, split into ``BANDS`` LSH bands; every band is stored as an
+``EssayBucket`` row when the submission is made, so the index grows with
+each submit and never needs a rebuild (``manage.py index_essays`` backfills
+older submissions). Evaluated answers to the same task of the same test
+that share a bucket are candidates, and a candidate whose shingle Jaccard
+similarity reaches ``ESSAY_DUPLICATE_THRESHOLD`` is a near-duplicate.
+
+When both answers of a new submission have an evaluated near-duplicate,
+their stored scores, criteria and feedback are reused and the examiner is
+not called (see api.evaluation). Counters of the calls avoided are kept in
+the cache, next to the LLM cache's.
+"""
+import hashlib
+import random
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from tests.models import WritingTestSubmission
+from .llm import _count
+from .models import EssayBucket
+from .text_analytics import WORD_RE, half_band
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+TASKS = ('task1', 'task2')
+
+MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed: signatures must stay comparable across processes and deploys
+_random = random.Random(20240)
+PERMUTATIONS = [(_random.randrange(1, MERSENNE_PRIME), _random.randrange(MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+AVOIDED_KEY = 'essay_duplicates:avoided'
+CHECKED_KEY = 'essay_duplicates:checked'
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def shingles(text):
+    """The answer's word 3-shingles (the whole answer when it is shorter)"""
+    words = [word.lower() for word in WORD_RE.findall(text or '')]
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def buckets(shingle_set):
+    """The LSH bucket of every band of the shingles' MinHash signature"""
+    if not shingle_set:
+        return []
+    hashes = [_hash64(shingle) for shingle in shingle_set]
+    signature = [min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in PERMUTATIONS]
+    return [
+        # Signed, to fit a BigIntegerField; the band number keeps equal rows in different bands apart
+        int.from_bytes(hashlib.blake2b(
+            repr((band, signature[band * ROWS:(band + 1) * ROWS])).encode(), digest_size=8,
+        ).digest(), 'big', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def index_submission(submission, count=True):
+    """Add a submission's answers to the index; returns its ``{task: buckets}``
+
+    ``count`` records it as checked for a duplicate (not when backfilling).
+    """
+    task_buckets = {task: buckets(shingles(getattr(submission, f'{task}_answer'))) for task in TASKS}
+    EssayBucket.objects.bulk_create([
+        EssayBucket(submission_id=submission.id, test_id=submission.test_id, task=task, bucket=bucket)
+        for task, values in task_buckets.items() for bucket in values
+    ])
+    if count:
+        _count(CHECKED_KEY)
+    return task_buckets
+
+
+def find_duplicates(submission, task_buckets=None):
+    """``{task: (evaluated submission, similarity)}`` for every answer with a near-duplicate"""
+    if task_buckets is None:
+        task_buckets = {task: buckets(shingles(getattr(submission, f'{task}_answer'))) for task in TASKS}
+    all_buckets = {bucket for values in task_buckets.values() for bucket in values}
+    if not all_buckets:
+        return {}
+
+    candidates = set(
+        EssayBucket.objects.filter(
+            test_id=submission.test_id, bucket__in=all_buckets,
+            submission__evaluation_status=WritingTestSubmission.COMPLETED,
+        ).exclude(submission_id=submission.id).values_list('submission_id', 'task', 'bucket')
+    )
+    # A bucket only counts for the task it was stored under
+    candidate_ids = {pk for pk, task, bucket in candidates if bucket in set(task_buckets[task])}
+    if not candidate_ids:
+        return {}
+
+    threshold = settings.ESSAY_DUPLICATE_THRESHOLD
+    matches = {}
+    evaluated = WritingTestSubmission.objects.filter(pk__in=candidate_ids).order_by('-evaluated_at')
+    for task in TASKS:
+        own = shingles(getattr(submission, f'{task}_answer'))
+        for candidate in evaluated:
+            similarity = jaccard(own, shingles(getattr(candidate, f'{task}_answer')))
+            if similarity >= threshold and similarity > matches.get(task, (None, 0.0))[1]:
+                matches[task] = (candidate, similarity)
+    return matches
+
+
+def duplicate_evaluation(submission, task_buckets=None):
+    """An evaluation assembled from near-duplicates of both answers, or None
+
+    The overall band is the source's when both answers match the same
+    submission, else recomputed with Task 2 counting double.
+    """
+    matches = find_duplicates(submission, task_buckets)
+    if len(matches) < len(TASKS):
+        return None
+
+    (task1_source, task1_similarity), (task2_source, task2_similarity) = matches['task1'], matches['task2']
+    if task1_source.task1_score is None or task2_source.task2_score is None:
+        return None
+    if task1_source.pk == task2_source.pk and task1_source.overall_band_score is not None:
+        overall = task1_source.overall_band_score
+    else:
+        overall = Decimal(str(half_band(float(task1_source.task1_score + 2 * task2_source.task2_score) / 3)))
+    _count(AVOIDED_KEY)
+    return {
+        'task1': {'score': task1_source.task1_score, 'feedback': task1_source.task1_feedback},
+        'task2': {'score': task2_source.task2_score, 'feedback': task2_source.task2_feedback},
+        'overall_band_score': overall,
+        'task1_criteria': task1_source.task1_criteria,
+        'task2_criteria': task2_source.task2_criteria,
+        'reused_from': {
+            'task1': {'submission_id': task1_source.pk, 'similarity': round(task1_similarity, 3)},
+            'task2': {'submission_id': task2_source.pk, 'similarity': round(task2_similarity, 3)},
+        },
+    }
+
+
+def duplicate_stats():
+    """Evaluations avoided since the cache backend started, and the size of the index"""
+    checked = cache.get(CHECKED_KEY, 0)
+    avoided = cache.get(AVOIDED_KEY, 0)
+    return {
+        'threshold': settings.ESSAY_DUPLICATE_THRESHOLD,
+        'checked': checked,
+        'avoided_calls': avoided,
+        'avoided_rate': round(avoided / checked, 4) if checked else None,
+        'indexed_submissions': EssayBucket.objects.values('submission_id').distinct().count(),
+    }
@@ -0,0 +1,179 @@
+"""Writing evaluation by the LLM examiner.
+
+Submissions are evaluated in the background job queue (see ``api.jobs``):
+the submit view saves the essay and queues an ``evaluate_writing`` job in the
+same transaction, and clients poll the submission's ``evaluation_status``.
+Examiner replies go through the LLM response cache, so an essay identical to
+one already evaluated is scored at submission time without a model call.
+
+The prompt carries the figures measured by ``api.text_analytics`` (word
+counts, sentence lengths, vocabulary range, cohesion), so the examiner
+does not count and its feedback need not restate them. Answers that are
+near-duplicates of already evaluated ones reuse that evaluation instead
+(see api.duplicates), at submission time or when the job runs.
+"""
+from django.utils import timezone
+
+from tests.models import WritingTestSubmission
+from .duplicates import duplicate_evaluation
+from .jobs import enqueue
+from .llm import cached_completion, complete_json
+from .text_analytics import analyze_submission, features_summary
+
+EVALUATION_MODEL = "gpt-3.5-turbo"
+EVALUATION_PARAMS = {
+    'response_format': {"type": "json_object"},
+    'temperature': 0.3,
+}
+
+
+def evaluation_messages(task1_answer, task2_answer, task1_description, task2_prompt, features=None):
+    """Chat messages asking the examiner to evaluate both tasks
+
+    ``features`` are the answers' text analytics; measured here when not given.
+    """
+    if features is None:
+        _, features = analyze_submission(task1_answer, task2_answer)
+    evaluation_prompt = f"""
+    You are a certified IELTS examiner. Please evaluate the following writing tasks according to IELTS criteria:
+
+    TASK 1:
+    Original Task Description: {task1_description}
+    Student's Answer: {task1_answer}
+
+    TASK 2:
+    Original Essay Prompt: {task2_prompt}
+    Student's Answer: {task2_answer}
+
+    Measured statistics (exact; use them instead of counting, and do not repeat them in the feedback):
+    {features_summary(features)}
+
+    Please evaluate both tasks based on these IELTS criteria:
+    1. Task Achievement / Task Response (0-9)
+    2. Coherence and Cohesion (0-9)
+    3. Lexical Resource (0-9)
+    4. Grammatical Range and Accuracy (0-9)
+
+    Return your evaluation in this exact JSON format:
+    {{
+        "task1": {{
+            "score": 7.5,
+            "feedback": "Detailed feedback for Task 1..."
+        }},
+        "task2": {{
+            "score": 8.0,
+            "feedback": "Detailed feedback for Task 2..."
+        }},
+        "overall_band_score": 7.5,
+        "task1_criteria": {{
+            "task_achievement": 7.5,
+            "coherence_cohesion": 7.0,
+            "lexical_resource": 8.0,
+            "grammatical_range": 7.5
+        }},
+        "task2_criteria": {{
+            "task_response": 8.0,
+            "coherence_cohesion": 8.0,
+            "lexical_resource": 8.0,
+            "grammatical_range": 8.0
+        }}
+    }}
+    """
+
+    return [
+        {"role": "system", "content": "You are a certified IELTS examiner with extensive experience in evaluating writing tasks. Provide detailed, constructive feedback."},
+        {"role": "user", "content": evaluation_prompt}
+    ]
+
+
+def _submission_messages(submission):
+    return evaluation_messages(
+        submission.task1_answer, submission.task2_answer,
+        submission.test.task1_image_description, submission.test.task2_essay_prompt,
+        features=submission.text_features
+    )
+
+
+def evaluate_writing_with_openai(task1_answer, task2_answer, task1_description, task2_prompt, features=None):
+    """Evaluate writing using OpenAI as IELTS examiner"""
+    return complete_json(
+        evaluation_messages(task1_answer, task2_answer, task1_description, task2_prompt, features),
+        EVALUATION_MODEL, **EVALUATION_PARAMS
+    )
+
+
+def queue_evaluation(submission):
+    """Queue the evaluation of a new submission; call inside the transaction that created it"""
+    return enqueue('evaluate_writing', {'submission_id': submission.id})
+
+
+def evaluate_from_cache(submission):
+    """Apply a cached evaluation of identical answers to a new submission; returns it or None"""
+    # On a miss the evaluation job looks the request up again; the miss is counted there
+    evaluation_result = cached_completion(_submission_messages(submission), EVALUATION_MODEL, count_miss=False,
+                                          **EVALUATION_PARAMS)
+    if evaluation_result is None:
+        return None
+    try:
+        apply_evaluation(submission, evaluation_result)
+    except (KeyError, TypeError):
+        return None
+    submission.save()
+    return evaluation_result
+
+
+def evaluate_from_duplicates(submission, task_buckets=None):
+    """Apply the evaluation of near-duplicate answers to a submission; returns it or None"""
+    evaluation_result = duplicate_evaluation(submission, task_buckets)
+    if evaluation_result is None:
+        return None
+    apply_evaluation(submission, evaluation_result)
+    submission.save()
+    return evaluation_result
+
+
+def apply_evaluation(submission, evaluation_result):
+    """Copy an examiner evaluation onto the submission (unsaved)"""
+    submission.task1_score = evaluation_result['task1']['score']
+    submission.task1_feedback = evaluation_result['task1']['feedback']
+    submission.task2_score = evaluation_result['task2']['score']
+    submission.task2_feedback = evaluation_result['task2']['feedback']
+    submission.overall_band_score = evaluation_result['overall_band_score']
+    submission.task1_criteria = evaluation_result.get('task1_criteria', {})
+    submission.task2_criteria = evaluation_result.get('task2_criteria', {})
+    submission.evaluation_status = WritingTestSubmission.COMPLETED
+    submission.evaluation_error = ''
+    submission.evaluated_at = timezone.now()
+
+
+def evaluate_submission(payload):
+    """Job handler: evaluate one submission; raising lets the queue retry it"""
+    submission = WritingTestSubmission.objects.select_related('test').get(pk=payload['submission_id'])
+    if submission.evaluated_at is not None:
+        return
+
+    # A near-duplicate may have been evaluated since the submission was queued
+    if evaluate_from_duplicates(submission) is not None:
+        return
+
+    submissions = WritingTestSubmission.objects.filter(pk=submission.pk)
+    submissions.update(evaluation_status=WritingTestSubmission.EVALUATING)
+    try:
+        evaluation_result = evaluate_writing_with_openai(
+            submission.task1_answer, submission.task2_answer,
+            submission.test.task1_image_description, submission.test.task2_essay_prompt,
+            features=submission.text_features
+        )
+        apply_evaluation(submission, evaluation_result)
+    except Exception as e:
+        submissions.update(evaluation_status=WritingTestSubmission.PENDING, evaluation_error=str(e))
+        raise
+    submission.save()
+
+
+def evaluation_failed(payload, error):
+    """Job failure handler: the evaluation ran out of attempts"""
+    WritingTestSubmission.objects.filter(pk=payload['submission_id']).update(
+        evaluation_status=WritingTestSubmission.FAILED,
+        evaluation_error=error,
+    )
@@ -0,0 +1,192 @@
+"""Test generation out of band, with progress by stage.
+
+The generate views only record a ``GenerationJob`` per requested test and
+queue a ``generate_test`` job for it, so LLM, TTS and image work never runs
+in a web worker and any number of admins can queue batches. Job workers
+(``manage.py run_jobs``) run the pipelines:
+
+* reading: ``content`` (with the count of questions parsed so far), ``persisted``
+* listening: ``content``, ``audio`` (one entry per section), ``persisted``
+* writing: ``content``, ``persisted``, ``image``
+
+Each stage is marked running and then done or failed, with its duration, as
+the pipeline goes, and the admin dashboard polls the progress endpoints. The
+generated content is checked within its stage, before any audio is voiced,
+and kept on the row only then, so a retried job skips the LLM call.
+The test and its ``persisted`` stage are committed together, under a lock
+on the generation's row, so neither a retry nor a second run of a job
+presumed lost creates a second test. A writing test is usable once persisted; its
+image stage is finished by the ``writing_image`` job.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .importer import import_reading_test, import_listening_test, import_writing_test
+from .jobs import enqueue
+from .listening_generation import generate_listening_test
+from .models import GenerationJob
+from .reading_generation import generate_reading_test
+from .tts import voice_sections
+from .writing_generation import generate_writing_test
+
+STAGES = {
+    GenerationJob.READING: ['content', 'persisted'],
+    GenerationJob.LISTENING: ['content', 'audio', 'persisted'],
+    GenerationJob.WRITING: ['content', 'persisted', 'image'],
+}
+
+
+def queue_generations(kind, params, created_by, count=1, pooled=False):
+    """Record ``count`` generations of one kind and queue a job for each; returns them"""
+    batch = None if pooled else uuid.uuid4()
+    generations = []
+    with transaction.atomic():
+        for _ in range(count):
+            generation = GenerationJob.objects.create(
+                kind=kind,
+                params=params,
+                batch=batch,
+                created_by=created_by,
+                pooled=pooled,
+                stages=[{'name': name, 'status': GenerationJob.PENDING} for name in STAGES[kind]],
+            )
+            enqueue('generate_test', {'generation_id': generation.id}, max_attempts=settings.GENERATION_MAX_ATTEMPTS)
+            generations.append(generation)
+    return generations
+
+
+def _save(generation, *fields):
+    generation.save(update_fields=['stages', 'updated_at', *fields])
+
+
+def _run_stage(generation, name, func, *args, **kwargs):
+    """Run one stage, recording its status and duration on the generation"""
+    stage = generation.stage(name)
+    stage.update(status=GenerationJob.RUNNING, started_at=timezone.now().isoformat())
+    stage.pop('error', None)
+    _save(generation)
+    start = time.monotonic()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        stage.update(status=GenerationJob.FAILED, error=f'{type(e).__name__}: {e}')
+        generation.error = stage['error']
+        _save(generation, 'error')
+        raise
+    stage.update(status=GenerationJob.DONE, duration_ms=round((time.monotonic() - start) * 1000))
+    return result
+
+
+def _content(generation, func, *args):
+    """The generated content, from a previous attempt when there was one"""
+    if generation.content is None:
+        generation.content = _run_stage(generation, 'content', func, *args)
+        _save(generation, 'content')
+    return generation.content
+
+
+def _persist(generation, importer, data, **kwargs):
+    """Write the test and mark the generation succeeded in one transaction
+
+    Returns None when another run of the job got there first.
+    """
+    try:
+        with transaction.atomic():
+            current = GenerationJob.objects.select_for_update().only('status', 'test_id').get(pk=generation.pk)
+            if current.status == GenerationJob.SUCCEEDED or current.test_id:
+                return None
+            test = _run_stage(generation, 'persisted', importer, data, created_by=generation.created_by,
+                              difficulty_level=generation.params.get('difficulty_level'),
+                              is_active=not generation.pooled, **kwargs)
+            generation.test_id = test.id
+            generation.status = GenerationJob.SUCCEEDED
+            generation.error = ''
+            generation.finished_at = timezone.now()
+            if generation.kind == GenerationJob.WRITING:
+                generation.stage('image').update(status=GenerationJob.RUNNING, started_at=timezone.now().isoformat())
+            _save(generation, 'test_id', 'status', 'error', 'finished_at')
+    except Exception:
+        # The failed stage was rolled back with the test
+        _save(generation, 'error')
+        raise
+    return test
+
+
+def _reading(generation):
+    content = generation.stage('content')
+    saved = [0]
+
+    def on_progress(stats):
+        # The reply streams in; show the questions accepted so far, saving at most once a second
+        content['questions'] = stats
+        if time.monotonic() - saved[0] >= 1:
+            saved[0] = time.monotonic()
+            _save(generation)
+
+    _persist(generation, import_reading_test, _content(generation, generate_reading_test, None, on_progress))
+
+
+def _listening(generation):
+    data = _content(generation, generate_listening_test, generation.params.get('difficulty_level', 'medium'))
+    audio = generation.stage('audio')
+    audio_paths = {}
+
+    if generation.params.get('include_audio', True):
+        audio['sections'] = [
+            {'section_number': section.get('section_number'),
+             'status': GenerationJob.PENDING if (section.get('audio_transcript') or '').strip() else GenerationJob.SKIPPED}
+            for section in data['sections']
+        ]
+
+        def on_section(number, error=None, reused=False):
+            section = next(section for section in audio['sections'] if section['section_number'] == number)
+            section['status'] = GenerationJob.FAILED if error else GenerationJob.DONE
+            if error:
+                section['error'] = error
+            if reused:
+                section['reused'] = True
+            _save(generation)
+
+        # A section without audio is not fatal; its failure is shown on the section
+        audio_paths, _, _ = _run_stage(generation, 'audio', voice_sections, data['sections'], on_section=on_section)
+    else:
+        audio['status'] = GenerationJob.SKIPPED
+        _save(generation)
+
+    _persist(generation, import_listening_test, data, audio_paths=audio_paths)
+
+
+def _writing(generation):
+    params = generation.params
+    data = _content(generation, generate_writing_test, params.get('difficulty_level', 'medium'),
+                    params.get('task1_type', 'random'), params.get('task2_type', 'random'))
+    _persist(generation, import_writing_test, data, generation_timings=data['timings'], generation_id=generation.id)
+
+
+PIPELINES = {
+    GenerationJob.READING: _reading,
+    GenerationJob.LISTENING: _listening,
+    GenerationJob.WRITING: _writing,
+}
+
+
+def run_generation(payload):
+    """Job handler: run a generation's pipeline"""
+    generation = GenerationJob.objects.get(pk=payload['generation_id'])
+    if generation.status in (GenerationJob.SUCCEEDED, GenerationJob.FAILED) or generation.test_id:
+        return
+    generation.status = GenerationJob.RUNNING
+    generation.started_at = generation.started_at or timezone.now()
+    generation.save(update_fields=['status', 'started_at', 'updated_at'])
+    PIPELINES[generation.kind](generation)
+
+
+def generation_failed(payload, error):
+    """Job failure handler: the pipeline failed on its last attempt"""
+    GenerationJob.objects.filter(pk=payload['generation_id']).update(
+        status=GenerationJob.FAILED, error=error, finished_at=timezone.now(), updated_at=timezone.now(),
+    )
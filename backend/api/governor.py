@@ -0,0 +1,278 @@
+"""Admission control for outbound model calls, shared by every worker process.
+
+Every chat completion (``api.llm``, so the examiner and all the generators)
+and every speech request (``api.tts``) runs through ``run``, which applies:
+
+* a token bucket per model for requests and tokens per minute, from
+  ``LLM_RATE_LIMITS`` (``model=rpm/tpm``, ``*`` for any other model, a tpm
+  of 0 for no token limit). A call takes one request and its estimated
+  tokens, waiting for the bucket to refill when it is short; the estimate
+  is corrected once the reply reports its usage;
+* at most ``LLM_MAX_IN_FLIGHT`` calls in flight at once;
+* retries with full-jitter exponential backoff on 429s, 5xx responses and
+  connection errors, honouring ``Retry-After``;
+* a circuit breaker per model: after ``LLM_BREAKER_FAILURES`` failures in a
+  row the model is not called for ``LLM_BREAKER_COOLDOWN`` seconds, then a
+  single probe call decides whether it closes again. A failed probe is not
+  retried: its error reaches the caller, so a job spends an attempt on it.
+
+The state lives in the Django cache, so it is shared by every worker when
+the cache is (``REDIS_URL``); with the local-memory cache each process
+governs only itself. Calls that cannot be admitted in time, or whose model's
+circuit is open, raise a ``RetryLater`` error: the job queue requeues the
+job without spending one of its attempts (up to ``JOB_MAX_DEFERRALS`` times).
+"""
+import itertools
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+
+import httpx
+import openai
+from django.conf import settings
+from django.core.cache import cache
+
+from .jobs import RetryLater
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'llm_governor'
+LOCK_TIMEOUT = 5  # seconds; frees the lock of a process that died holding it
+SLOT_GRACE = 30  # seconds a slot outlives the request timeout, for streamed replies
+DEFAULT_COMPLETION_TOKENS = 1000
+MODELS_KEY = f'{PREFIX}:models'  # Every model called so far, for the stats
+
+# httpx errors: a streamed reply that broke off before any of it arrived
+RETRYABLE = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError, httpx.TransportError)
+
+
+class RateLimited(RetryLater):
+    """The call could not be admitted within ``LLM_ADMISSION_TIMEOUT``"""
+
+
+class CircuitOpen(RetryLater):
+    """The model failed repeatedly and is not being called for now"""
+
+
+def rate_limits(model):
+    """``(requests, tokens)`` per minute for a model; 0 means unlimited"""
+    limits = {}
+    for entry in filter(None, (entry.strip() for entry in settings.LLM_RATE_LIMITS.split(','))):
+        try:
+            name, values = entry.split('=')
+            rpm, tpm = values.split('/')
+            limits[name.strip()] = (int(rpm), int(tpm))
+        except ValueError:
+            raise ValueError(f'Invalid LLM_RATE_LIMITS entry: {entry!r}')
+    return limits.get(model, limits.get('*', (0, 0)))
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Prompt tokens (about four characters each) plus the reply's allowance"""
+    return len(json.dumps(messages, ensure_ascii=False)) // 4 + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+@contextmanager
+def _locked(key):
+    """A short cross-process lock on one piece of governor state"""
+    lock = f'{key}:lock'
+    while not cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+        time.sleep(0.002 + random.random() * 0.008)
+    try:
+        yield
+    finally:
+        cache.delete(lock)
+
+
+def _bucket_key(model):
+    return f'{PREFIX}:bucket:{model}'
+
+
+def _refilled(model, now):
+    """The model's bucket brought up to ``now``; full when new"""
+    rpm, tpm = rate_limits(model)
+    state = cache.get(_bucket_key(model)) or {'requests': rpm, 'tokens': tpm, 'at': now}
+    elapsed = max(0.0, now - state['at'])
+    return {
+        'requests': min(rpm, state['requests'] + elapsed * rpm / 60),
+        'tokens': min(tpm, state['tokens'] + elapsed * tpm / 60),
+        'at': now,
+    }
+
+
+def _take(model, tokens, deadline):
+    """Take one request and ``tokens`` from the model's bucket, waiting for a refill when short"""
+    rpm, tpm = rate_limits(model)
+    # A call larger than the bucket waits for a full bucket
+    tokens = min(tokens, tpm)
+    while True:
+        with _locked(_bucket_key(model)):
+            now = time.time()
+            if cache.get(_bucket_key(model)) is None:
+                cache.set(MODELS_KEY, sorted({*cache.get(MODELS_KEY, []), model}), timeout=None)
+            state = _refilled(model, now)
+            short = []
+            if rpm and state['requests'] < 1:
+                short.append((1 - state['requests']) * 60 / rpm)
+            if tpm and state['tokens'] < tokens:
+                short.append((tokens - state['tokens']) * 60 / tpm)
+            if not short:
+                state['requests'] -= 1 if rpm else 0
+                state['tokens'] -= tokens if tpm else 0
+            cache.set(_bucket_key(model), state, timeout=None)
+        if not short:
+            return
+        wait = max(short)
+        if time.monotonic() + wait > deadline:
+            raise RateLimited(f'{model} is over its rate limit', delay=wait)
+        time.sleep(wait + random.random() * 0.1)
+
+
+def _refund(model, tokens):
+    """Give back tokens taken on an estimate that turned out too high"""
+    if tokens <= 0 or not rate_limits(model)[1]:
+        return
+    with _locked(_bucket_key(model)):
+        state = _refilled(model, time.time())
+        state['tokens'] = min(rate_limits(model)[1], state['tokens'] + tokens)
+        cache.set(_bucket_key(model), state, timeout=None)
+
+
+def _acquire_slot(deadline):
+    """Claim one of the ``LLM_MAX_IN_FLIGHT`` slots; returns ``(key, token)``"""
+    token = uuid.uuid4().hex
+    timeout = int(settings.OPENAI_TIMEOUT) + SLOT_GRACE
+    for delay in itertools.chain([0.01, 0.02, 0.05, 0.1], itertools.repeat(0.2)):
+        for index in random.sample(range(settings.LLM_MAX_IN_FLIGHT), settings.LLM_MAX_IN_FLIGHT):
+            key = f'{PREFIX}:slot:{index}'
+            if cache.add(key, token, timeout=timeout):
+                return key, token
+        if time.monotonic() + delay > deadline:
+            raise RateLimited(f'{settings.LLM_MAX_IN_FLIGHT} model calls already in flight', delay=1)
+        time.sleep(delay * (0.5 + random.random()))
+
+
+def _release_slot(slot):
+    key, token = slot
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def _breaker_key(model):
+    return f'{PREFIX}:breaker:{model}'
+
+
+def _probe_key(model):
+    return f'{_breaker_key(model)}:probe'
+
+
+def _check_circuit(model):
+    """Shed the call when the model's circuit is open; in half-open state let one probe through
+
+    Returns True when the call is that probe.
+    """
+    state = cache.get(_breaker_key(model))
+    if not state or not state.get('open_until'):
+        return False
+    remaining = state['open_until'] - time.time()
+    if remaining > 0:
+        raise CircuitOpen(f'{model} circuit open after {state["failures"]} failures', delay=remaining)
+    if not cache.add(_probe_key(model), 1, timeout=settings.LLM_BREAKER_COOLDOWN):
+        raise CircuitOpen(f'{model} circuit half-open, probe in flight', delay=settings.LLM_BREAKER_COOLDOWN)
+    return True
+
+
+def _record_failure(model):
+    key = _breaker_key(model)
+    with _locked(key):
+        state = cache.get(key) or {'failures': 0, 'open_until': None}
+        state['failures'] += 1
+        # A failed probe reopens the circuit at once
+        if state['failures'] >= settings.LLM_BREAKER_FAILURES or state['open_until']:
+            if not state['open_until'] or state['open_until'] <= time.time():
+                logger.warning('Opening the %s circuit for %ss after %s failures',
+                               model, settings.LLM_BREAKER_COOLDOWN, state['failures'])
+            state['open_until'] = time.time() + settings.LLM_BREAKER_COOLDOWN
+        cache.set(key, state, timeout=None)
+
+
+def _record_success(model):
+    if cache.get(_breaker_key(model)) is not None:
+        with _locked(_breaker_key(model)):
+            cache.delete(_breaker_key(model))
+
+
+def _backoff(attempt, error):
+    """Full-jitter exponential backoff, at least the server's ``Retry-After``"""
+    delay = random.uniform(0, min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2 ** attempt))
+    response = getattr(error, 'response', None)
+    try:
+        retry_after = float(response.headers.get('retry-after')) if response is not None else 0
+    except (TypeError, ValueError):
+        retry_after = 0
+    return max(delay, min(retry_after, settings.LLM_RETRY_MAX_DELAY))
+
+
+def run(model, request, tokens=0, used_tokens=None):
+    """Call ``request()`` under the model's limits, retrying transient failures
+
+    ``tokens`` is the call's estimated token use; when ``used_tokens(result)``
+    tells the actual use, the rest of the estimate goes back to the bucket.
+    """
+    for attempt in itertools.count():
+        deadline = time.monotonic() + settings.LLM_ADMISSION_TIMEOUT
+        probe = _check_circuit(model)
+        try:
+            _take(model, tokens, deadline)
+            slot = _acquire_slot(deadline)
+            try:
+                result = request()
+            except RETRYABLE as e:
+                _record_failure(model)
+                # A retried probe would only meet the reopened circuit and be deferred
+                if probe or attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                delay = _backoff(attempt, e)
+                logger.warning('%s call failed (attempt %s of %s), retrying in %.1fs: %s',
+                               model, attempt + 1, settings.LLM_MAX_RETRIES + 1, delay, e)
+                time.sleep(delay)
+                continue
+            except openai.APIStatusError:
+                # A request the model rejected says nothing about its health
+                _record_success(model)
+                raise
+            finally:
+                _release_slot(slot)
+            _record_success(model)
+        finally:
+            # Whatever happened, including never reaching the model, the probe is over
+            if probe:
+                cache.delete(_probe_key(model))
+        if used_tokens is not None:
+            used = used_tokens(result)
+            if used is not None:
+                _refund(model, tokens - used)
+        return result
+
+
+def governor_stats():
+    """Bucket levels, in-flight calls and circuit state of every model called so far"""
+    now = time.time()
+    models = cache.get(MODELS_KEY, [])
+    slots = cache.get_many([f'{PREFIX}:slot:{index}' for index in range(settings.LLM_MAX_IN_FLIGHT)])
+    stats = {'in_flight': len(slots), 'max_in_flight': settings.LLM_MAX_IN_FLIGHT, 'models': {}}
+    for model in models:
+        bucket = cache.get(_bucket_key(model))
+        breaker = cache.get(_breaker_key(model)) or {}
+        open_for = breaker['open_until'] - now if breaker.get('open_until') else 0
+        stats['models'][model] = {
+            'limits': dict(zip(('rpm', 'tpm'), rate_limits(model))),
+            'requests_available': round(_refilled(model, now)['requests'], 1) if bucket else None,
+            'tokens_available': round(_refilled(model, now)['tokens']) if bucket else None,
+            'consecutive_failures': breaker.get('failures', 0),
+            'circuit': 'open' if open_for > 0 else 'half-open' if breaker.get('open_until') else 'closed',
+        }
+    return stats
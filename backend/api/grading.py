@@ -0,0 +1,248 @@
+"""Answer keys and grading for reading and listening submissions.
+
+An answer key holds the pre-normalized correct answers of one test keyed by
+question id, so grading a submission is a dict lookup per question instead of
+a query over the test's questions. Keys are cached in process and in the
+Django cache under the test's ``answer_key_version``, a database column
+bumped whenever one of the test's questions changes (see ``api.signals``).
+Every process reads the version from the test row it already loaded, so an
+edit reaches all workers even when the cache is local to each of them.
+
+With ``GRADING_ENGINE = 'database'`` submissions are instead graded by
+PostgreSQL in a single set-based query; other databases fall back to the
+answer key.
+"""
+import json
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+
+from tests.models import ReadingTest, Question, ListeningTest, ListeningSection, ListeningQuestion
+
+READING = 'reading'
+LISTENING = 'listening'
+
+_local_keys = {}
+_local_lock = threading.Lock()
+
+
+def normalize_answer(value):
+    """Normalize an answer for comparison (case and surrounding whitespace)"""
+    if value is None:
+        return ''
+    return str(value).strip().lower()
+
+
+@dataclass
+class GradeResult:
+    correct_count: int
+    total_questions: int
+    awarded_points: int
+    total_points: int
+    question_ids: tuple
+    correct_flags: tuple
+
+    points: tuple = ()
+
+    @property
+    def score(self):
+        """Score scaled to the 9-band range"""
+        if self.total_questions > 0:
+            return (self.correct_count / self.total_questions) * 9.0
+        return 0.0
+
+    @property
+    def outcomes(self):
+        """Compact per-question outcome stored on the result row"""
+        return build_outcomes(self.question_ids, self.correct_flags, self.points)
+
+
+def build_outcomes(question_ids, correct_flags, points):
+    """Per-question outcome as parallel lists: ids, correct flags (0/1) and awarded points"""
+    return {
+        'ids': list(question_ids),
+        'correct': [int(flag) for flag in correct_flags],
+        'points': [awarded if flag else 0 for flag, awarded in zip(correct_flags, points)],
+    }
+
+
+def outcomes_by_question(outcomes):
+    """Map question id to ``(is_correct, awarded_points)`` from a stored outcome, or None"""
+    if not outcomes:
+        return None
+    return {
+        question_id: (bool(correct), awarded)
+        for question_id, correct, awarded in zip(outcomes['ids'], outcomes['correct'], outcomes['points'])
+    }
+
+
+class AnswerKey:
+    """Pre-normalized correct answers and point weights for one test"""
+
+    def __init__(self, kind, test_id, version, entries):
+        self.kind = kind
+        self.test_id = test_id
+        self.version = version
+        # entries are (question_id, normalized_answer, points) in question order
+        self.question_ids = tuple(entry[0] for entry in entries)
+        self.answers = {entry[0]: entry[1] for entry in entries}
+        self.points = {entry[0]: entry[2] for entry in entries}
+
+    @property
+    def total_questions(self):
+        return len(self.question_ids)
+
+    @property
+    def total_points(self):
+        return sum(self.points.values())
+
+    def grade(self, answers):
+        """Grade a submitted ``{question_id: answer}`` mapping"""
+        flags = tuple(
+            normalize_answer(answers.get(str(question_id))) == self.answers[question_id]
+            for question_id in self.question_ids
+        )
+        return GradeResult(
+            correct_count=sum(flags),
+            total_questions=self.total_questions,
+            awarded_points=sum(
+                self.points[question_id]
+                for question_id, is_correct in zip(self.question_ids, flags) if is_correct
+            ),
+            total_points=self.total_points,
+            question_ids=self.question_ids,
+            correct_flags=flags,
+            points=tuple(self.points[question_id] for question_id in self.question_ids),
+        )
+
+
+def _key_cache_key(kind, test_id, version):
+    return f'answer_key:{kind}:{test_id}:{version}'
+
+
+TEST_MODELS = {READING: ReadingTest, LISTENING: ListeningTest}
+
+
+def _current_version(kind, test_id):
+    return TEST_MODELS[kind].objects.filter(pk=test_id).values_list('answer_key_version', flat=True).first() or 0
+
+
+def _load_entries(kind, test_id):
+    if kind == READING:
+        rows = Question.objects.filter(test_id=test_id).order_by('order', 'id')
+    else:
+        rows = ListeningQuestion.objects.filter(section__test_id=test_id).order_by(
+            'section__section_number', 'order', 'id'
+        )
+    return [
+        (question_id, normalize_answer(correct_answer), points)
+        for question_id, correct_answer, points in rows.values_list('id', 'correct_answer', 'points')
+    ]
+
+
+def get_answer_key(kind, test_id, version=None):
+    """Return the current answer key for a test, building it on a cache miss
+
+    Pass the test's ``answer_key_version`` when the test is already loaded;
+    otherwise it is read from the database.
+    """
+    if version is None:
+        version = _current_version(kind, test_id)
+
+    local = _local_keys.get((kind, test_id))
+    if local is not None and local.version == version:
+        return local
+
+    key_cache_key = _key_cache_key(kind, test_id, version)
+    entries = cache.get(key_cache_key)
+    if entries is None:
+        entries = _load_entries(kind, test_id)
+        cache.set(key_cache_key, entries, timeout=settings.ANSWER_KEY_CACHE_TIMEOUT)
+
+    answer_key = AnswerKey(kind, test_id, version, entries)
+    with _local_lock:
+        _local_keys[(kind, test_id)] = answer_key
+    return answer_key
+
+
+def invalidate_answer_key(kind, test_id):
+    """Bump the version of a test's answer key so every process rebuilds it"""
+    TEST_MODELS[kind].objects.filter(pk=test_id).update(answer_key_version=F('answer_key_version') + 1)
+    with _local_lock:
+        _local_keys.pop((kind, test_id), None)
+
+
+# Characters stripped by str.strip() that btrim() needs spelled out
+_WHITESPACE = ' \t\n\r\x0b\x0c'
+
+_GRADE_SQL = """
+    WITH graded AS (
+        SELECT q.id, q.points, {position} AS position,
+               lower(btrim(coalesce(a.value, ''), %(whitespace)s))
+                   = lower(btrim(q.correct_answer, %(whitespace)s)) AS is_correct
+        FROM {questions} q
+        {join}
+        LEFT JOIN jsonb_each_text(%(answers)s::jsonb) a ON a.key = q.id::text
+        WHERE {test_column} = %(test_id)s
+    )
+    SELECT count(*),
+           count(*) FILTER (WHERE is_correct),
+           coalesce(sum(points), 0),
+           coalesce(sum(points) FILTER (WHERE is_correct), 0),
+           coalesce(array_agg(id ORDER BY position, id), '{{}}'),
+           coalesce(array_agg(is_correct ORDER BY position, id), '{{}}'),
+           coalesce(array_agg(points ORDER BY position, id), '{{}}')
+    FROM graded
+"""
+
+
+def _grade_sql(kind):
+    qn = connection.ops.quote_name
+    if kind == READING:
+        return _GRADE_SQL.format(
+            position='q.{}'.format(qn('order')),
+            questions=qn(Question._meta.db_table),
+            join='',
+            test_column='q.test_id',
+        )
+    return _GRADE_SQL.format(
+        position='(s.section_number, q.{})'.format(qn('order')),
+        questions=qn(ListeningQuestion._meta.db_table),
+        join='JOIN {} s ON s.id = q.section_id'.format(qn(ListeningSection._meta.db_table)),
+        test_column='s.test_id',
+    )
+
+
+def grade_in_database(kind, test_id, answers, version=None):
+    """Grade a submission in one round trip, joining the answers JSON against the questions"""
+    if connection.vendor != 'postgresql':
+        return get_answer_key(kind, test_id, version).grade(answers)
+
+    with connection.cursor() as cursor:
+        cursor.execute(_grade_sql(kind), {
+            'answers': json.dumps(answers),
+            'test_id': test_id,
+            'whitespace': _WHITESPACE,
+        })
+        total, correct, total_points, awarded_points, question_ids, flags, points = cursor.fetchone()
+
+    return GradeResult(
+        correct_count=correct,
+        total_questions=total,
+        awarded_points=awarded_points,
+        total_points=total_points,
+        question_ids=tuple(question_ids),
+        correct_flags=tuple(flags),
+        points=tuple(points),
+    )
+
+
+def grade_submission(kind, test_id, answers, version=None):
+    """Grade a submission with the configured grading engine; ``version`` is the test's ``answer_key_version``"""
+    if settings.GRADING_ENGINE == 'database':
+        return grade_in_database(kind, test_id, answers, version)
+    return get_answer_key(kind, test_id, version).grade(answers)
@@ -0,0 +1,141 @@
+"""Process-wide HTTP clients for the external AI services.
+
+Creating an ``OpenAI`` client or calling bare ``requests`` per request opens
+a new connection each time, paying DNS, TCP and TLS setup on every call.
+Instead, ``configure()`` (run once from ``ApiConfig.ready()``) builds one
+pooled ``httpx.Client`` per service, with keep-alive connections, bounded
+pool sizes and timeouts, and HTTP/2 when the ``h2`` package is installed.
+All generator and evaluator code paths share them through ``openai_client()``
+and ``http_client()``. httpx clients are thread safe, so job worker threads
+share the pools too.
+
+Each pool counts its requests and reports its open, busy and idle
+connections (see ``pool_stats``).
+"""
+import importlib.util
+import threading
+import time
+
+import httpx
+from django.conf import settings
+from openai import OpenAI
+
+OPENAI = 'openai'
+IMAGES = 'images'
+
+_clients = {}
+_openai = None
+_lock = threading.RLock()
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """An httpx transport that counts the requests going through its pool"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.http2 = kwargs.get('http2', False)
+        self._metrics_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_seconds = 0.0
+
+    def handle_request(self, request):
+        with self._metrics_lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.monotonic()
+        try:
+            return super().handle_request(request)
+        except Exception:
+            with self._metrics_lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._metrics_lock:
+                self.in_flight -= 1
+                self.total_seconds += time.monotonic() - start
+
+    def stats(self):
+        connections = list(self._pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        with self._metrics_lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'avg_ms': round(self.total_seconds * 1000 / self.requests, 1) if self.requests else None,
+                'connections': len(connections),
+                'busy_connections': len(connections) - idle,
+                'idle_connections': idle,
+            }
+
+
+def http2_available():
+    return importlib.util.find_spec('h2') is not None
+
+
+def _build_client(timeout):
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.Client(
+        transport=MeteredTransport(limits=limits, http2=http2_available(), retries=1),
+        timeout=httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+    )
+
+
+def configure():
+    """Build the shared pools; called once per process from ApiConfig.ready()"""
+    with _lock:
+        if _clients:
+            return
+        _clients[OPENAI] = _build_client(settings.OPENAI_TIMEOUT)
+        _clients[IMAGES] = _build_client(settings.IMAGE_API_TIMEOUT)
+
+
+def http_client(name):
+    """The shared httpx client for a service"""
+    if not _clients:
+        configure()
+    return _clients[name]
+
+
+def openai_client():
+    """The shared OpenAI client, created on first use so a missing key only fails the calls that need it"""
+    global _openai
+    if _openai is None:
+        with _lock:
+            if _openai is None:
+                # Retries are left to api.governor, which shares its backoff and limits across workers
+                _openai = OpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client(OPENAI), max_retries=0)
+    return _openai
+
+
+def pool_stats():
+    """Request counters and connection usage of every pool"""
+    if not _clients:
+        configure()
+    return {
+        name: dict(
+            client._transport.stats(),
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            http2=client._transport.http2,
+        )
+        for name, client in _clients.items()
+    }
+
+
+def close():
+    """Close every pool, e.g. before forking or at the end of a test"""
+    global _openai
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _openai = None
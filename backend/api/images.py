@@ -0,0 +1,124 @@
+"""Task 1 images for generated writing tests, rendered by kie.ai in the background.
+
+A writing test is saved with ``PLACEHOLDER_IMAGE`` and a ``writing_image``
+job. The job submits the render to the image service and then re-queues
+itself to poll for the result. The wait between polls grows exponentially up
+to ``IMAGE_POLL_MAX_DELAY`` and is jittered, so many pending renders do not
+poll in lockstep. Once the image is ready its URL replaces the placeholder.
+A render that fails, or is still not ready after ``IMAGE_POLL_TIMEOUT``
+seconds, leaves the placeholder in place. A render started by a generation
+job reports its outcome on that job's ``image`` stage.
+
+``manage.py fake_image_service`` serves the same API locally for offline use;
+point ``IMAGE_API_URL`` at it.
+"""
+import logging
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+
+from tests.models import WritingTest
+from .http_clients import IMAGES, http_client
+from .jobs import enqueue
+from .models import GenerationJob
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_IMAGE = "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iNDAwIiBoZWlnaHQ9IjMwMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KICA8cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZjBmMGYwIi8+CiAgPHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCIgZm9udC1zaXplPSIxOCIgZmlsbD0iIzMzMyIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPkNoYXJ0IFBsYWNlaG9sZGVyPC90ZXh0Pgo8L3N2Zz4K"
+
+# successFlag values reported by the image service
+GENERATING = 0
+SUCCESS = 1
+FAILED = 2
+
+
+def _headers():
+    headers = {"Content-Type": "application/json"}
+    if settings.IMAGE_API_KEY:
+        headers["Authorization"] = f"Bearer {settings.IMAGE_API_KEY}"
+    return headers
+
+
+def submit_image(prompt):
+    """Start a render and return the service's task id"""
+    response = http_client(IMAGES).post(f"{settings.IMAGE_API_URL}/generate", json={
+        "prompt": prompt,
+        "size": "1:1",
+        "nVariants": 1
+    }, headers=_headers())
+    response.raise_for_status()
+    return response.json()["data"]["taskId"]
+
+
+def image_status(task_id):
+    """(successFlag, image URL or error message) of a render"""
+    response = http_client(IMAGES).get(f"{settings.IMAGE_API_URL}/record-info", params={"taskId": task_id},
+                                       headers=_headers())
+    response.raise_for_status()
+    task_data = response.json().get("data") or {}
+    flag = task_data.get("successFlag", GENERATING)
+    if flag == SUCCESS:
+        result_urls = (task_data.get("response") or {}).get("resultUrls") or []
+        return (SUCCESS, result_urls[0]) if result_urls else (FAILED, "No image returned")
+    if flag == FAILED:
+        return FAILED, task_data.get("errorMessage") or "Generation failed"
+    return GENERATING, None
+
+
+def poll_delay(polls):
+    """Seconds before the next poll: capped exponential backoff with full jitter"""
+    ceiling = min(settings.IMAGE_POLL_MAX_DELAY, settings.IMAGE_POLL_BASE_DELAY * 2 ** polls)
+    return random.uniform(settings.IMAGE_POLL_BASE_DELAY, max(settings.IMAGE_POLL_BASE_DELAY, ceiling))
+
+
+def queue_task1_image(test, generation_id=None):
+    """Queue the Task 1 render of a new writing test; call inside the transaction that created it"""
+    payload = {'test_id': test.id}
+    if generation_id:
+        payload['generation_id'] = generation_id
+    return enqueue('writing_image', payload)
+
+
+def _report(payload, status, **detail):
+    if payload.get('generation_id'):
+        GenerationJob.update_stage(payload['generation_id'], 'image', status=status, **detail)
+
+
+def generate_task1_image(payload):
+    """Job handler: submit the render, then poll it from re-queued jobs until done
+
+    Only request errors raise, so the queue retries the same submit or poll.
+    """
+    test = WritingTest.objects.only('task1_type', 'task1_image_description').get(pk=payload['test_id'])
+
+    if 'task_id' not in payload:
+        prompt = f"Create a professional IELTS-style {test.task1_type} showing {(test.task1_image_description or '')[:100]}..."
+        task_id = submit_image(prompt)
+        enqueue('writing_image', dict(
+            payload, task_id=task_id, polls=0, started_at=time.time(),
+        ), delay=timedelta(seconds=poll_delay(0)))
+        return
+
+    flag, result = image_status(payload['task_id'])
+    if flag == SUCCESS:
+        timings = WritingTest.objects.values_list('generation_timings', flat=True).get(pk=test.pk) or {}
+        timings['image'] = round((time.time() - payload['started_at']) * 1000)
+        WritingTest.objects.filter(pk=test.pk).update(task1_image=result, generation_timings=timings)
+        _report(payload, GenerationJob.DONE, duration_ms=timings['image'])
+    elif flag == FAILED:
+        # Not worth retrying; the placeholder stays
+        logger.warning('Image for writing test %s failed: %s', test.pk, result)
+        _report(payload, GenerationJob.FAILED, error=str(result))
+    elif time.time() - payload['started_at'] > settings.IMAGE_POLL_TIMEOUT:
+        logger.warning('Image for writing test %s not generated in time', test.pk)
+        _report(payload, GenerationJob.FAILED, error='Not generated in time')
+    else:
+        polls = payload['polls'] + 1
+        enqueue('writing_image', dict(payload, polls=polls), delay=timedelta(seconds=poll_delay(polls)))
+
+
+def image_failed(payload, error):
+    """Job failure handler: the image service kept erroring; the placeholder stays"""
+    _report(payload, GenerationJob.FAILED, error=error)
@@ -0,0 +1,237 @@
+"""Create tests from the JSON the generators produce.
+
+The generator views, ``manage.py import_tests`` (files such as those in
+``generated_tests/``) and the admin import endpoint all go through these
+functions. A test is written with one ``bulk_create`` per table: a reading
+test takes two INSERTs, a listening test three, plus one UPDATE for the
+denormalized counters that the skipped ``post_save`` signals would otherwise
+maintain. New tests have no cached answer keys, so nothing needs
+invalidating.
+
+Malformed data (a section or question that is not an object, an id that is
+not a whole number, a question type the models do not know) raises
+``InvalidTestData`` before anything is written.
+
+An explicit ``difficulty_level`` wins over one in the data; a writing test
+without a Task 1 image gets the placeholder and an image job. Tests for the
+pre-generated pool are created with ``is_active=False``.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from tests.models import ReadingTest, Question, ListeningTest, ListeningSection, ListeningQuestion, WritingTest
+from .images import PLACEHOLDER_IMAGE, queue_task1_image
+
+READING = 'reading'
+LISTENING = 'listening'
+WRITING = 'writing'
+
+
+class InvalidTestData(ValueError):
+    pass
+
+
+def _require(data, *keys):
+    if not isinstance(data, dict):
+        raise InvalidTestData(f'Expected an object, got {type(data).__name__}')
+    missing = [key for key in keys if key not in data]
+    if missing:
+        raise InvalidTestData(f"Missing {', '.join(missing)}")
+
+
+def _objects(data, key):
+    """``data[key]``, which must be a list of objects"""
+    items = data.get(key, [])
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise InvalidTestData(f'{key} must be a list of objects')
+    return items
+
+
+def _number(value, name):
+    """A non-negative whole number, also accepted as a string of digits"""
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise InvalidTestData(f'{name} must be a whole number, got {value!r}')
+    return value
+
+
+def _choice(value, model, field, name):
+    """``value``, which must be one of the model field's choices"""
+    choices = [choice for choice, _ in model._meta.get_field(field).choices]
+    if value not in choices:
+        raise InvalidTestData(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
+def _difficulty(data, difficulty_level):
+    return difficulty_level or data.get('difficulty_level') or 'medium'
+
+
+def _default_title(kind):
+    return f"IELTS {kind} Test - {timezone.now().strftime('%Y-%m-%d %H:%M')}"
+
+
+@transaction.atomic
+def import_reading_test(data, created_by=None, difficulty_level=None, is_active=True):
+    """``{"title", "passage", "questions": [{"id", "question", "type", "choices", "answer"}]}``"""
+    _require(data, 'title', 'passage', 'questions')
+    questions = _objects(data, 'questions')
+    for question_data in questions:
+        _require(question_data, 'question', 'type', 'answer', 'id')
+    orders = [_number(question_data['id'], 'Question id') for question_data in questions]
+    for question_data in questions:
+        _choice(question_data['type'], Question, 'question_type', 'Question type')
+
+    test = ReadingTest.objects.create(
+        title=data['title'],
+        passage=data['passage'],
+        created_by=created_by,
+        difficulty_level=_difficulty(data, difficulty_level),
+        is_active=is_active
+    )
+    Question.objects.bulk_create([
+        Question(
+            test=test,
+            question_text=question_data['question'],
+            question_type=question_data['type'],
+            choices=question_data.get('choices'),
+            correct_answer=question_data['answer'],
+            order=order
+        )
+        for question_data, order in zip(questions, orders)
+    ])
+    ReadingTest.refresh_counts([test.id])
+    return test
+
+
+def _listening_type(value):
+    # The generator prompt spells "multi-choice" with a hyphen
+    return str(value).replace('-', '_')
+
+
+def _listening_rows(data):
+    """The sections, their numbers and ``(section number, data, order, type)`` per question, validated"""
+    _require(data, 'sections')
+    sections = _objects(data, 'sections')
+    numbers = [_number(section.get('section_number', 0), 'Section number') for section in sections]
+    if len(set(numbers)) < len(numbers):
+        raise InvalidTestData('Section numbers must be unique')
+    questions = []
+    for number, section in zip(numbers, sections):
+        for q_data in _objects(section, 'questions'):
+            question_type = _listening_type(q_data.get('type', 'text'))
+            questions.append((number, q_data, _number(q_data.get('id', 0), 'Question id'),
+                              _choice(question_type, ListeningQuestion, 'question_type', 'Question type')))
+    return sections, numbers, questions
+
+
+def normalize_generated_listening(data):
+    """Generated listening content, checked before its audio is paid for
+
+    A question type the models do not know becomes ``'text'`` rather than
+    failing the generation; anything else the importer would reject raises
+    ``InvalidTestData``. Changes ``data`` in place and returns it.
+    """
+    _require(data, 'sections')
+    known = [choice for choice, _ in ListeningQuestion._meta.get_field('question_type').choices]
+    for section in _objects(data, 'sections'):
+        for q_data in _objects(section, 'questions'):
+            question_type = _listening_type(q_data.get('type', 'text'))
+            q_data['type'] = question_type if question_type in known else 'text'
+    _listening_rows(data)
+    return data
+
+
+@transaction.atomic
+def import_listening_test(data, created_by=None, difficulty_level=None, audio_paths=None, title=None,
+                          is_active=True):
+    """``{"sections": [{"section_number", "title", "audio_transcript", "instructions", "questions": [...]}]}``
+
+    ``audio_paths`` maps section numbers to audio already in storage.
+    """
+    sections, numbers, questions = _listening_rows(data)
+    audio_paths = audio_paths or {}
+
+    test = ListeningTest.objects.create(
+        title=title or data.get('title') or _default_title('Listening'),
+        difficulty_level=_difficulty(data, difficulty_level),
+        created_by=created_by,
+        is_active=is_active
+    )
+    section_objs = ListeningSection.objects.bulk_create([
+        ListeningSection(
+            test=test,
+            section_number=number,
+            title=section.get('title', 'Untitled Section'),
+            transcript=section.get('audio_transcript', ''),
+            instructions=section.get('instructions', ''),
+            audio_file=audio_paths.get(section.get('section_number'))
+        )
+        for number, section in zip(numbers, sections)
+    ])
+    by_number = dict(zip(numbers, section_objs))
+    ListeningQuestion.objects.bulk_create([
+        ListeningQuestion(
+            section=by_number[number],
+            question_text=q_data.get('question', ''),
+            question_type=question_type,
+            choices=q_data.get('choices', []),
+            correct_answer=q_data.get('answer', ''),
+            order=order
+        )
+        for number, q_data, order, question_type in questions
+    ])
+    ListeningTest.refresh_counts([test.id])
+    return test
+
+
+@transaction.atomic
+def import_writing_test(data, created_by=None, difficulty_level=None, title=None, generation_timings=None,
+                        generation_id=None, is_active=True):
+    """``{"task1": {"type", "image", "image_description"}, "task2": {"type", "essay_prompt"}}``"""
+    _require(data, 'task1', 'task2')
+    _require(data['task1'])
+    _require(data['task2'], 'type', 'essay_prompt')
+    task1_type = _choice(data['task1'].get('type', 'graph'), WritingTest, 'task1_type', 'Task 1 type')
+    task2_type = _choice(data['task2']['type'], WritingTest, 'task2_type', 'Task 2 type')
+    image = data['task1'].get('image') or PLACEHOLDER_IMAGE
+    test = WritingTest.objects.create(
+        title=title or data.get('title') or _default_title('Writing'),
+        difficulty_level=_difficulty(data, difficulty_level),
+        created_by=created_by,
+        task1_image=image,
+        task1_image_description=data['task1'].get('image_description'),
+        task1_type=task1_type,
+        task2_essay_prompt=data['task2']['essay_prompt'],
+        task2_type=task2_type,
+        generation_timings=generation_timings or {},
+        is_active=is_active
+    )
+    if image == PLACEHOLDER_IMAGE:
+        queue_task1_image(test, generation_id=generation_id)
+    return test
+
+
+IMPORTERS = {
+    READING: import_reading_test,
+    LISTENING: import_listening_test,
+    WRITING: import_writing_test,
+}
+
+
+def detect_kind(data):
+    """Which importer a generated JSON document belongs to"""
+    if isinstance(data, dict):
+        if 'passage' in data:
+            return READING
+        if 'sections' in data:
+            return LISTENING
+        if 'task1' in data and 'task2' in data:
+            return WRITING
+    raise InvalidTestData('Not a reading, listening or writing test')
+
+
+def import_test(data, kind=None, **kwargs):
+    """Create a test of the given (or detected) kind"""
+    return IMPORTERS[kind or detect_kind(data)](data, **kwargs)
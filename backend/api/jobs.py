@@ -0,0 +1,235 @@
+"""Database-backed background jobs.
+
+A job row is inserted in the same transaction as the data it refers to, so
+it is never lost and never runs before that data is committed. Workers
+(``manage.py run_jobs``) claim due jobs with ``SELECT ... FOR UPDATE SKIP
+LOCKED`` followed by a conditional update, so any number of worker threads
+and processes can share the queue without running a job twice. While a
+handler runs, its worker refreshes the job's lock every third of
+``JOB_LOCK_TIMEOUT``, so only the jobs of a worker that died are presumed
+lost and run again. A failing
+job is retried with exponential backoff until it runs out of attempts, and
+then its kind's failure handler records the outcome. A handler raising
+``RetryLater`` (e.g. the model's circuit is open, see api.governor) is
+requeued without spending an attempt, up to ``JOB_MAX_DEFERRALS`` times;
+after that each ``RetryLater`` spends one, so a job still fails during a
+long outage.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> dotted path of a callable taking the job's payload
+HANDLERS = {
+    'evaluate_writing': 'api.evaluation.evaluate_submission',
+    'writing_image': 'api.images.generate_task1_image',
+    'audio_cleanup': 'api.tts.cleanup_audio_blobs',
+    'generate_test': 'api.generation.run_generation',
+    'refill_pool': 'api.pool.refill_pool',
+    'regrade_test': 'api.regrade.run_regrade',
+}
+
+# Job kind -> dotted path of a callable taking (payload, error), called once
+# the last attempt has failed
+FAILURE_HANDLERS = {
+    'evaluate_writing': 'api.evaluation.evaluation_failed',
+    'writing_image': 'api.images.image_failed',
+    'generate_test': 'api.generation.generation_failed',
+}
+
+
+class RetryLater(Exception):
+    """Raised by a handler that cannot run yet: the job is requeued after ``delay`` seconds
+
+    No attempt is spent until the job has been deferred ``JOB_MAX_DEFERRALS`` times.
+    """
+
+    def __init__(self, message='', delay=0):
+        super().__init__(message)
+        self.delay = delay
+
+
+def enqueue(kind, payload, max_attempts=None, delay=None):
+    """Add a job to the queue; call it inside the transaction that creates the job's data"""
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return Job.objects.create(
+        kind=kind,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts"""
+    return timedelta(seconds=settings.JOB_RETRY_BACKOFF * 2 ** max(0, attempts - 1))
+
+
+def claim_job(worker_id, kinds=None):
+    """Lock the next due job for this worker, or return None when nothing is due"""
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            due = Job.objects.select_for_update(skip_locked=True).filter(status=Job.QUEUED, run_after__lte=now)
+            if kinds:
+                due = due.filter(kind__in=kinds)
+            job = due.order_by('run_after', 'id').first()
+            if job is None:
+                return None
+            # Databases without row locks (SQLite) rely on this check alone
+            claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, attempts=F('attempts') + 1, locked_by=worker_id, locked_at=now,
+            )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+@contextmanager
+def _heartbeat(job):
+    """Keep refreshing the job's lock while its handler runs, so ``requeue_stale()`` leaves it alone"""
+    done = threading.Event()
+
+    def beat():
+        try:
+            while not done.wait(settings.JOB_LOCK_TIMEOUT / 3):
+                Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(
+                    locked_at=timezone.now(),
+                )
+        except DatabaseError:
+            logger.exception('Lost the heartbeat of job %s', job)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'job-heartbeat-{job.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def _finish(job, **fields):
+    Job.objects.filter(pk=job.pk).update(locked_by='', locked_at=None, **fields)
+
+
+def _fail(job, error):
+    _finish(job, status=Job.FAILED, last_error=error, finished_at=timezone.now())
+    failure_handler = FAILURE_HANDLERS.get(job.kind)
+    if failure_handler:
+        import_string(failure_handler)(job.payload, error)
+
+
+def _retry_or_fail(job, error, min_delay=0):
+    """Requeue a job whose attempt failed with backoff, or record the failure after the last attempt"""
+    if job.attempts < job.max_attempts:
+        delay = max(retry_delay(job.attempts), timedelta(seconds=min_delay))
+        logger.warning('Job %s failed (attempt %s of %s), retrying in %s: %s',
+                       job, job.attempts, job.max_attempts, delay, error)
+        _finish(job, status=Job.QUEUED, last_error=error, run_after=timezone.now() + delay)
+    else:
+        logger.error('Job %s failed after %s attempts: %s', job, job.attempts, error)
+        _fail(job, error)
+
+
+def run_job(job):
+    """Run a claimed job, scheduling a retry or recording the failure; returns True on success"""
+    try:
+        with _heartbeat(job):
+            import_string(HANDLERS[job.kind])(job.payload)
+    except RetryLater as e:
+        error = f'{type(e).__name__}: {e}'
+        if job.deferrals >= settings.JOB_MAX_DEFERRALS:
+            # Deferred too often (a long outage): from now on the attempt counts
+            _retry_or_fail(job, error, min_delay=e.delay)
+            return False
+        delay = timedelta(seconds=max(1, e.delay))
+        logger.info('Job %s deferred for %s: %s', job, delay, e)
+        _finish(job, status=Job.QUEUED, attempts=F('attempts') - 1, deferrals=F('deferrals') + 1,
+                last_error=error, run_after=timezone.now() + delay)
+        return False
+    except Exception as e:
+        _retry_or_fail(job, f'{type(e).__name__}: {e}')
+        return False
+
+    _finish(job, status=Job.SUCCEEDED, last_error='', finished_at=timezone.now())
+    return True
+
+
+def requeue_stale(timeout=None):
+    """Return jobs whose worker stopped mid-run to the queue, or fail them when out of attempts"""
+    cutoff = timezone.now() - timedelta(seconds=timeout or settings.JOB_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status=Job.QUEUED, locked_by='', locked_at=None, run_after=timezone.now(),
+    )
+    for job in stale:
+        _fail(job, 'Worker stopped before finishing the job')
+    return requeued
+
+
+def work(worker_id, stop, poll_interval, kinds=None, drain=False):
+    """Claim and run jobs until ``stop`` is set, or with ``drain`` until no job is due"""
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                job = claim_job(worker_id, kinds)
+                if job is not None:
+                    run_job(job)
+                    continue
+            except DatabaseError:
+                # The job, if claimed, is picked up again by requeue_stale()
+                logger.exception('Worker %s lost its database connection', worker_id)
+            else:
+                if drain:
+                    return
+            stop.wait(poll_interval)
+    finally:
+        connection.close()
+
+
+def run_workers(concurrency=None, poll_interval=None, kinds=None, drain=False, stop=None):
+    """Run a pool of worker threads in this process until stopped (or drained)"""
+    concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+    poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+    stop = stop or threading.Event()
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+
+    requeue_stale()
+    last_requeue = time.monotonic()
+    threads = [
+        threading.Thread(target=work, name=f'job-worker-{i}', daemon=True,
+                         args=(f'{prefix}:{i}', stop, poll_interval, kinds, drain))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while any(thread.is_alive() for thread in threads):
+            stop.wait(poll_interval)
+            if time.monotonic() - last_requeue > settings.JOB_LOCK_TIMEOUT / 2:
+                requeue_stale()
+                last_requeue = time.monotonic()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        connection.close()
@@ -0,0 +1,144 @@
+"""Incremental parsing of a JSON document as it streams in.
+
+``JSONStreamParser`` is fed the text of a streamed completion chunk by
+chunk and reports every value at one of the requested paths as soon as the
+value is complete, e.g. each element of ``questions`` while later ones are
+still being generated. ``"*"`` in a path matches any array index or object
+key. Text before the document (a Markdown code fence, a preamble) is
+skipped, and a document cut off part-way keeps everything completed before
+the cut; only the unfinished tail is lost.
+"""
+import json
+
+OBJECT = 'object'
+ARRAY = 'array'
+ROOT = 'root'
+
+# What a container expects next
+KEY = 'key'
+COLON = 'colon'
+VALUE = 'value'
+AFTER = 'after'
+DONE = 'done'
+
+DELIMITERS = ',]}'
+
+
+class _Frame:
+    __slots__ = ('kind', 'path', 'start', 'state', 'key', 'index')
+
+    def __init__(self, kind, path, start, state):
+        self.kind = kind
+        self.path = path
+        self.start = start
+        self.state = state
+        self.key = None
+        self.index = 0
+
+    def child_path(self):
+        if self.kind == OBJECT:
+            return self.path + (self.key,)
+        if self.kind == ARRAY:
+            return self.path + (self.index,)
+        return self.path
+
+
+class JSONStreamParser:
+    def __init__(self, paths):
+        self.paths = [tuple(path) for path in paths]
+        self.buffer = ''
+        self.stack = [_Frame(ROOT, (), 0, VALUE)]
+        self.string = None  # (start, path, is_key) of the string being read
+        self.escape = False
+        self.scalar = None  # (start, path) of the number or literal being read
+
+    @property
+    def finished(self):
+        """Whether the whole document has been read"""
+        return self.stack[0].state == DONE
+
+    def _wanted(self, path):
+        return any(
+            len(pattern) == len(path) and all(part == '*' or part == step for part, step in zip(pattern, path))
+            for pattern in self.paths
+        )
+
+    def _complete(self, path, start, end, events):
+        """A value ended; report it when its path was asked for"""
+        frame = self.stack[-1]
+        frame.state = DONE if frame.kind == ROOT else AFTER
+        if self._wanted(path):
+            try:
+                events.append((path, json.loads(self.buffer[start:end])))
+            except ValueError:
+                pass
+
+    def feed(self, text):
+        """Parse the next chunk; returns ``[(path, value)]`` for every wanted value it completed"""
+        events = []
+        offset = len(self.buffer)
+        self.buffer += text
+        for i in range(offset, len(self.buffer)):
+            char = self.buffer[i]
+
+            if self.string is not None:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    start, path, is_key = self.string
+                    self.string = None
+                    if is_key:
+                        self.stack[-1].key = json.loads(self.buffer[start:i + 1])
+                        self.stack[-1].state = COLON
+                    else:
+                        self._complete(path, start, i + 1, events)
+                continue
+
+            if self.scalar is not None:
+                if char not in DELIMITERS and not char.isspace():
+                    continue
+                start, path = self.scalar
+                self.scalar = None
+                self._complete(path, start, i, events)
+
+            if char.isspace():
+                continue
+            frame = self.stack[-1]
+
+            if frame.state == VALUE:
+                if frame.kind == ARRAY and char == ']':
+                    self._close(i, events)
+                elif frame.kind == ROOT and char not in '{[':
+                    continue  # Anything before the document starts
+                elif char == '"':
+                    self.string = (i, frame.child_path(), False)
+                elif char == '{':
+                    self.stack.append(_Frame(OBJECT, frame.child_path(), i, KEY))
+                elif char == '[':
+                    self.stack.append(_Frame(ARRAY, frame.child_path(), i, VALUE))
+                else:
+                    self.scalar = (i, frame.child_path())
+            elif frame.state == KEY:
+                if char == '"':
+                    self.string = (i, None, True)
+                elif char == '}':
+                    self._close(i, events)
+            elif frame.state == COLON:
+                if char == ':':
+                    frame.state = VALUE
+            elif frame.state == AFTER:
+                if char == ',':
+                    if frame.kind == OBJECT:
+                        frame.state = KEY
+                    else:
+                        frame.index += 1
+                        frame.state = VALUE
+                elif char in ']}':
+                    self._close(i, events)
+        return events
+
+    def _close(self, i, events):
+        frame = self.stack.pop()
+        self._complete(frame.path, frame.start, i + 1, events)
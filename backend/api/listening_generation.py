@@ -0,0 +1,73 @@
+"""Listening test generation: one LLM call for four sections of transcripts and questions.
+
+The reply is checked, and odd question types mapped to text input, before
+the audio is voiced from the transcripts (see ``api.tts``).
+"""
+from .importer import normalize_generated_listening
+from .llm import complete_json, get_client
+
+GENERATION_MODEL = "gpt-3.5-turbo"
+GENERATION_PARAMS = {
+    'response_format': {"type": "json_object"},
+    'temperature': 0.5,
+}
+
+
+def generate_listening_test(difficulty_level, client=None):
+    """Ask the LLM for the sections, in the shape ``api.importer.import_listening_test`` takes"""
+    prompt = f"""
+    You are an IELTS Listening test generator. Create 4 sections of IELTS listening transcripts, each with exactly 10 questions. 
+    Follow official IELTS structure and question types. Ensure difficulty increases by section. Difficulty: {difficulty_level}.
+
+    STRUCTURE:
+    - Section 1: Casual conversation (social context)
+    - Section 2: Monologue (social context)
+    - Section 3: Academic conversation (2-4 speakers)
+    - Section 4: Academic lecture (monologue)
+
+    FORMAT REQUIREMENTS:
+    1. audio_transcript MUST be the actual spoken content (dialogue or monologue) that test-takers would hear
+    2. Transcripts should be natural, authentic English with hesitations and natural speech patterns
+    3. Do NOT include instructions or question text in the audio_transcript
+    4. Ensure each section has exactly 10 questions
+    5. Questions should be based ONLY on information in the audio_transcript
+
+    Return JSON in this format:
+    {{
+        "sections": [
+            {{
+                "section_number": 1,
+                "title": "Section 1 Title",
+                "audio_transcript": "ACTUAL SPOKEN CONTENT...",
+                "instructions": "Instructions for test-takers",
+                "questions": [
+                    {{
+                        "id": 1,
+                        "type": "radio|text|multi-choice|dropdown|labeling|completion|sentence_completion|short_answer",
+                        "question": "Question text",
+                        "choices": ["Option 1", "Option 2"],
+                        "answer": "Correct answer"
+                    }}
+                ]
+            }}
+        ]
+    }}
+
+    EXAMPLE SECTION 1 TRANSCRIPT:
+    "Woman: Good morning, City Library. How can I help you?
+    Man: Hi, I'd like to renew my membership. My card number is HL-45892.
+    Woman: Certainly. Could I have your full name please?
+    Man: Yes, it's Thomas Richardson.
+    Woman: Thank you Mr. Richardson. I see your membership expires next month. Would you like to renew for one year?
+    Man: Actually, could I do six months? I might be traveling soon.
+    Woman: Of course. That'll be £15 for six months. How would you like to pay?
+    ..."
+
+    EXAMPLE SECTION 4 TRANSCRIPT:
+    "Lecturer: Today we'll examine coral reef ecosystems. Coral reefs, often called the 'rainforests of the sea', occupy less than 0.1% of ocean area yet support 25% of marine species. The primary reef-building organisms are scleractinian corals which secrete calcium carbonate skeletons. These structures provide habitat complexity essential for biodiversity..."
+    """
+
+    return normalize_generated_listening(complete_json([
+        {"role": "system", "content": "You are an IELTS test content expert. Generate realistic listening test materials."},
+        {"role": "user", "content": prompt}
+    ], GENERATION_MODEL, use_cache=False, client=client or get_client(), **GENERATION_PARAMS))
@@ -0,0 +1,192 @@
+"""LLM chat completions behind a persistent, content-addressed response cache.
+
+A request is identified by the SHA-256 of its model, parameters and messages.
+The parsed JSON reply is stored in ``LLMCacheEntry`` under that hash, so a
+byte-identical request (a resubmitted essay, a retry after a timeout) is
+answered from the database instead of being paid for twice. Entries expire
+after ``LLM_CACHE_TTL`` seconds and the table is kept under
+``LLM_CACHE_MAX_BYTES`` by evicting the least recently used entries. Hit and
+miss counters live in the shared Django cache (see ``cache_stats``).
+
+Long generations are streamed instead (``stream_json``): the reply is parsed
+as it arrives, so its parts can be used, and checked, before it is complete.
+Every model call goes through the rate limits, retries and circuit breaker
+of ``api.governor``.
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+import httpx
+import openai
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from . import governor
+from .http_clients import openai_client
+from .json_stream import JSONStreamParser
+from .models import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+HITS_KEY = 'llm_cache:hits'
+MISSES_KEY = 'llm_cache:misses'
+
+
+def get_client():
+    return openai_client()
+
+
+def request_key(model, messages, params):
+    """Content address of a completion request"""
+    canonical = json.dumps(
+        {'model': model, 'messages': messages, 'params': params},
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _count(counter_key):
+    cache.add(counter_key, 0, timeout=None)
+    try:
+        cache.incr(counter_key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(counter_key, 1, timeout=None)
+
+
+def lookup(key):
+    """The cached reply stored under ``key``, or None when missing or expired"""
+    now = timezone.now()
+    entries = LLMCacheEntry.objects.filter(key=key, expires_at__gt=now)
+    response = entries.values_list('response', flat=True).first()
+    if response is not None:
+        entries.update(hits=F('hits') + 1, last_used_at=now)
+    return response
+
+
+def store(key, model, response):
+    payload = json.dumps(response, ensure_ascii=False)
+    now = timezone.now()
+    LLMCacheEntry.objects.update_or_create(key=key, defaults={
+        'model': model,
+        'response': response,
+        'size_bytes': len(payload.encode('utf-8')),
+        'last_used_at': now,
+        'expires_at': now + timedelta(seconds=settings.LLM_CACHE_TTL),
+    })
+    evict()
+
+
+def evict(max_bytes=None):
+    """Drop expired entries, then the least recently used ones until the table fits its budget"""
+    max_bytes = settings.LLM_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    removed, _ = LLMCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+
+    total = LLMCacheEntry.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+    if total <= max_bytes:
+        return removed
+
+    # Free a little more than needed so the next few inserts don't evict again
+    to_free = total - int(max_bytes * 0.9)
+    keys, freed = [], 0
+    for key, size in LLMCacheEntry.objects.order_by('last_used_at').values_list('key', 'size_bytes').iterator():
+        if freed >= to_free:
+            break
+        keys.append(key)
+        freed += size
+    deleted, _ = LLMCacheEntry.objects.filter(key__in=keys).delete()
+    return removed + deleted
+
+
+def cached_completion(messages, model, count_miss=True, **params):
+    """The cached reply for a request, without calling the model on a miss
+
+    ``count_miss=False`` leaves a miss uncounted, for a peek that is
+    followed by the real request (and its lookup) when it misses.
+    """
+    response = lookup(request_key(model, messages, params))
+    if response is not None or count_miss:
+        _count(HITS_KEY if response is not None else MISSES_KEY)
+    return response
+
+
+def complete_json(messages, model, use_cache=True, client=None, **params):
+    """Run a chat completion whose reply is a JSON object and return it parsed
+
+    Generators pass ``use_cache=False``: every generated test must be new.
+    """
+    if use_cache:
+        response = cached_completion(messages, model, **params)
+        if response is not None:
+            return response
+
+    completion = governor.run(
+        model, lambda: (client or get_client()).chat.completions.create(model=model, messages=messages, **params),
+        tokens=governor.estimate_tokens(messages, params.get('max_tokens')),
+        used_tokens=lambda completion: getattr(getattr(completion, 'usage', None), 'total_tokens', None),
+    )
+    response = json.loads(completion.choices[0].message.content)
+    if use_cache:
+        store(request_key(model, messages, params), model, response)
+    return response
+
+
+def stream_json(messages, model, paths, on_value, client=None, **params):
+    """Stream a chat completion whose reply is a JSON document, calling ``on_value(path, value)``
+    for every value at one of ``paths`` as soon as it is complete
+
+    Returns the parser, whose ``finished`` tells whether the document was
+    complete, and the completion's finish reason: ``"length"`` when it hit
+    ``max_tokens``, ``"interrupted"`` when the connection broke after some
+    of the reply had arrived. Nothing is cached. The governor's slot is held
+    until the stream ends; a stream that fails before any of the reply
+    arrived is retried.
+    """
+    def stream_reply():
+        parser = JSONStreamParser(paths)
+        finish_reason = None
+        stream = (client or get_client()).chat.completions.create(
+            model=model, messages=messages, stream=True, **params
+        )
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    for path, value in parser.feed(choice.delta.content):
+                        on_value(path, value)
+                finish_reason = choice.finish_reason or finish_reason
+        except (httpx.HTTPError, openai.APIError) as e:
+            if not parser.buffer:
+                raise
+            # Keep what arrived; the caller asks again for the rest
+            logger.warning('Completion stream broke off after %s characters: %s', len(parser.buffer), e)
+            finish_reason = 'interrupted'
+        finally:
+            response = getattr(stream, 'response', None)
+            if response is not None:
+                response.close()
+        return parser, finish_reason
+
+    return governor.run(model, stream_reply, tokens=governor.estimate_tokens(messages, params.get('max_tokens')))
+
+
+def cache_stats():
+    """Hit/miss counters since the cache backend started, and the size of the table"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    table = LLMCacheEntry.objects.aggregate(total_bytes=Sum('size_bytes'), total_hits=Sum('hits'))
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        'entries': LLMCacheEntry.objects.count(),
+        'bytes': table['total_bytes'] or 0,
+        'max_bytes': settings.LLM_CACHE_MAX_BYTES,
+        'stored_hits': table['total_hits'] or 0,
+    }
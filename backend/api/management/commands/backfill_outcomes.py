@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.regrade import RESULT_MODELS, RegradeStats, regrade_test
+
+
+class Command(BaseCommand):
+    help = 'Store per-question outcomes on results graded before outcomes were recorded'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = RegradeStats()
+        for kind, model in RESULT_MODELS.items():
+            test_ids = (
+                model.objects.filter(question_outcomes__isnull=True)
+                .order_by().values_list('test_id', flat=True).distinct()
+            )
+            for test_id in list(test_ids):
+                stats = regrade_test(kind, test_id, batch_size=options['batch_size'], missing_outcomes_only=True)
+                total.add(stats)
+                self.stdout.write(f'{kind} test {test_id}: {stats.updated} results backfilled')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled {total.updated} results in {total.elapsed:.1f}s ({total.rate:.0f} results/s)'
+        ))
@@ -0,0 +1,223 @@
+import json
+import statistics
+import time
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tests.models import TestResult, ListeningUserResult, WritingTestSubmission
+from api.generation import queue_generations
+from api.models import GenerationJob
+from api.seeding import (
+    check_database, create_users, create_reading_catalog, create_listening_catalog, create_writing_catalog,
+    seed_result_chunk,
+)
+
+User = get_user_model()
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+# name, method, path, request body, query budget, p95 latency budget (ms)
+Endpoint = namedtuple('Endpoint', 'name method path data max_queries max_p95_ms')
+
+# Routes that call an external LLM/TTS/image service on every request; the
+# generators only queue jobs now, so none do
+EXTERNAL_ROUTES = set()
+
+
+def _endpoints(ctx):
+    reading_answers = {str(question_id): 'answer' for question_id in ctx['reading_question_ids']}
+    listening_answers = {str(question_id): 'answer' for question_id in ctx['listening_question_ids']}
+    return [
+        Endpoint('register', 'post', '/api/auth/register/', lambda i: {
+            'email': f'bench-register-{i}@example.com', 'username': f'bench-register-{i}',
+            'password': 'Xk29!mvq-Pw', 'password2': 'Xk29!mvq-Pw',
+        }, 6, 1500),
+        Endpoint('login', 'post', '/api/auth/login/', lambda i: {
+            'email': ctx['user'].email, 'password': BENCHMARK_PASSWORD,
+        }, 2, 1500),
+        Endpoint('token_refresh', 'post', '/api/auth/refresh/', lambda i: {
+            'refresh': str(RefreshToken.for_user(ctx['user'])),
+        }, 1, 100),
+        Endpoint('profile', 'get', '/api/profile/', None, 0, 100),
+        Endpoint('test-list', 'get', '/api/tests/', None, 2, 200),
+        Endpoint('test-detail', 'get', f"/api/tests/{ctx['reading_test_id']}/", None, 3, 200),
+        Endpoint('test-submit', 'post', f"/api/tests/{ctx['reading_test_id']}/submit/",
+                 lambda i: {'answers': reading_answers}, 5, 200),
+        Endpoint('result-list', 'get', '/api/results/', None, 1, 200),
+        Endpoint('result-detail', 'get', f"/api/results/{ctx['reading_result_id']}/", None, 2, 200),
+        Endpoint('listening-test-list', 'get', '/api/listening-tests/', None, 2, 200),
+        Endpoint('listening-test-detail', 'get', f"/api/listening-tests/{ctx['listening_test_id']}/", None, 6, 200),
+        Endpoint('listening-test-submit', 'post', f"/api/listening-tests/{ctx['listening_test_id']}/submit/",
+                 lambda i: {'answers': listening_answers}, 5, 200),
+        Endpoint('listening-result-list', 'get', '/api/listening-results/', None, 1, 200),
+        Endpoint('listening-result-detail', 'get', f"/api/listening-results/{ctx['listening_result_id']}/",
+                 None, 3, 200),
+        Endpoint('writing-test-list', 'get', '/api/writing-tests/', None, 2, 200),
+        Endpoint('writing-test-detail', 'get', f"/api/writing-tests/{ctx['writing_test_id']}/", None, 1, 200),
+        Endpoint('writing-test-submit', 'post', f"/api/writing-tests/{ctx['writing_test_id']}/submit/", lambda i: {
+            'task1_answer': 'The chart shows a steady increase.', 'task2_answer': 'Some people argue that...',
+        }, 8, 200),
+        Endpoint('writing-result-list', 'get', '/api/writing-results/', None, 1, 200),
+        Endpoint('writing-result-detail', 'get', f"/api/writing-results/{ctx['writing_result_id']}/", None, 3, 200),
+        Endpoint('writing-result-status', 'get', f"/api/writing-results/{ctx['writing_result_id']}/status/",
+                 None, 1, 100),
+        Endpoint('user-stats', 'get', '/api/stats/', None, 6, 300),
+        Endpoint('llm-cache-stats', 'get', '/api/llm-cache/stats/', None, 3, 200),
+        Endpoint('http-pool-stats', 'get', '/api/http-pools/stats/', None, 0, 100),
+        Endpoint('import-tests', 'post', '/api/tests/import/', lambda i: {'sections': [
+            {'section_number': number, 'title': f'Section {number}', 'audio_transcript': 'Woman: Hello.',
+             'questions': [{'id': q, 'type': 'text', 'question': 'Name?', 'answer': 'answer'} for q in range(1, 11)]}
+            for number in range(1, 5)
+        ]}, 8, 300),
+        Endpoint('generate-test', 'post', '/api/generate-test/', lambda i: {'count': 5}, 15, 200),
+        Endpoint('generate-listening-test', 'post', '/api/generate-listening-test/', None, 7, 200),
+        Endpoint('generate-writing-test', 'post', '/api/writing-tests/generate/', None, 7, 200),
+        Endpoint('generation-list', 'get', '/api/generations/', None, 1, 200),
+        Endpoint('generation-detail', 'get', f"/api/generations/{ctx['generation_id']}/", None, 1, 100),
+        Endpoint('generation-pool', 'get', '/api/generations/pool/', None, 16, 200),
+    ]
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a realistic data volume, exercise every API route and record query counts, '
+        'p50/p95 latency and response size. Fails when a budget is exceeded. '
+        'Everything runs in a transaction that is rolled back, but it writes hundreds of thousands of rows, '
+        'so it refuses to run unless DATABASE_URL points at a database other than production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tests', type=int, default=2000, help='Reading tests to seed')
+        parser.add_argument('--results', type=int, default=200000, help='Reading results to seed')
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--history', type=int, default=300, help='Attempts per module for the benchmark user')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', dest='json_path', help='Write measurements to this file')
+
+    def handle(self, *args, **options):
+        check_database()
+        if options['users'] < 1:
+            raise CommandError('--users must be at least 1')
+
+        with transaction.atomic():
+            started = time.monotonic()
+            ctx = self.seed(options)
+            self.stdout.write(f'Seeded in {time.monotonic() - started:.1f}s')
+            measurements = self.measure(ctx, options['iterations'])
+            transaction.set_rollback(True)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(measurements, f, indent=2)
+
+        failures = [m for m in measurements if m['violations']]
+        if failures:
+            raise CommandError('Budget exceeded: ' + '; '.join(
+                f"{m['name']} ({', '.join(m['violations'])})" for m in failures
+            ))
+        self.stdout.write(self.style.SUCCESS(f'All {len(measurements)} endpoints within budget'))
+
+    def check_route_coverage(self, endpoints):
+        """Every named route in api.urls must be either benchmarked or explicitly external"""
+        resolver = get_resolver('api.urls')
+        route_names = {pattern.name for pattern in resolver.url_patterns if pattern.name}
+        covered = {endpoint.name for endpoint in endpoints} | EXTERNAL_ROUTES
+        missing = route_names - covered
+        if missing:
+            raise CommandError(f"Routes without a benchmark: {', '.join(sorted(missing))}")
+
+    def measure(self, ctx, iterations):
+        client = APIClient()
+        endpoints = _endpoints(ctx)
+        self.check_route_coverage(endpoints)
+
+        measurements = []
+        self.stdout.write(f"{'endpoint':<26}{'queries':>8}{'p50 ms':>9}{'p95 ms':>9}{'bytes':>9}")
+        for endpoint in endpoints:
+            client.force_authenticate(None if endpoint.name in ('register', 'login', 'token_refresh') else ctx['user'])
+            latencies, query_counts, size = [], [], 0
+            for i in range(iterations):
+                data = endpoint.data(i) if endpoint.data else None
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = getattr(client, endpoint.method)(endpoint.path, data, format='json')
+                    latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    raise CommandError(f'{endpoint.name} returned {response.status_code}: {response.content[:200]}')
+                query_counts.append(len(queries.captured_queries))
+                size = len(response.content)
+
+            measurement = {
+                'name': endpoint.name,
+                'queries': max(query_counts),
+                'p50_ms': round(statistics.median(latencies), 2),
+                'p95_ms': round(_percentile(latencies, 0.95), 2),
+                'bytes': size,
+                'violations': [],
+            }
+            if measurement['queries'] > endpoint.max_queries:
+                measurement['violations'].append(f"{measurement['queries']} queries > {endpoint.max_queries}")
+            if measurement['p95_ms'] > endpoint.max_p95_ms:
+                measurement['violations'].append(f"p95 {measurement['p95_ms']}ms > {endpoint.max_p95_ms}ms")
+            measurements.append(measurement)
+
+            line = (f"{endpoint.name:<26}{measurement['queries']:>8}{measurement['p50_ms']:>9.1f}"
+                    f"{measurement['p95_ms']:>9.1f}{size:>9}")
+            self.stdout.write(self.style.ERROR(line) if measurement['violations'] else line)
+
+        for name in sorted(EXTERNAL_ROUTES):
+            self.stdout.write(f'{name:<26}skipped (calls an external AI service)')
+        return measurements
+
+    def seed(self, options):
+        seed = options['seed']
+        history = options['history']
+        results = options['results']
+
+        # Staff, so the admin-only routes can be measured too
+        user = User.objects.create(email='benchmark@example.com', username='benchmark', is_staff=True,
+                                   password=make_password(BENCHMARK_PASSWORD))
+        user_ids = create_users(options['users'], seed, prefix='bench')
+
+        reading = create_reading_catalog(options['tests'], seed)
+        listening = create_listening_catalog(max(1, options['tests'] // 2), seed)
+        writing = create_writing_catalog(max(1, options['tests'] // 4), seed)
+
+        for chunk_index, start in enumerate(range(0, results, 50000)):
+            seed_result_chunk('reading', chunk_index, min(50000, results - start), seed, user_ids, reading)
+        seed_result_chunk('listening', 0, results // 4, seed, user_ids, listening)
+        seed_result_chunk('writing', 0, results // 10, seed, user_ids, writing)
+
+        # The benchmark user's own history, to exercise the result list and detail views
+        for kind, catalog in (('reading', reading), ('listening', listening), ('writing', writing)):
+            seed_result_chunk(kind, 'history', history, seed, [user.id], catalog)
+
+        reading_test_id = next(iter(reading))
+        listening_test_id = next(iter(listening))
+        return {
+            'user': user,
+            'reading_test_id': reading_test_id,
+            'reading_question_ids': [entry[0] for entry in reading[reading_test_id]],
+            'reading_result_id': TestResult.objects.filter(user=user).values_list('id', flat=True).first(),
+            'listening_test_id': listening_test_id,
+            'listening_question_ids': [entry[0] for entry in listening[listening_test_id]],
+            'listening_result_id': ListeningUserResult.objects.filter(user=user).values_list('id', flat=True).first(),
+            'writing_test_id': writing[0],
+            'writing_result_id': WritingTestSubmission.objects.filter(user=user).values_list('id', flat=True).first(),
+            'generation_id': queue_generations(GenerationJob.LISTENING, {'difficulty_level': 'medium'}, user)[0].id,
+        }
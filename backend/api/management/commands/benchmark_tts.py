@@ -0,0 +1,89 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from api.tts import StubTTSBackend, voice_sections
+
+SPEAKERS = ['Woman', 'Man', 'Tutor', 'Student']
+WORDS = (
+    'library membership renew card number course deadline assignment reef coral species habitat '
+    'ecosystem lecture research survey results weekend booking reception schedule'
+).split()
+
+
+def _transcript(rng, chars):
+    turns, length = [], 0
+    while length < chars:
+        turn = f"{rng.choice(SPEAKERS)}: " + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 30))) + '.'
+        turns.append(turn)
+        length += len(turn) + 1
+    return '\n'.join(turns)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time listening test audio generation with the stub TTS backend: one request per section in sequence '
+        '(the old behaviour) against concurrent sections split at speaker turns, streamed to a temporary '
+        'storage directory, and then the same transcripts again from the audio store. No external calls '
+        'are made and nothing is kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sections', type=int, default=4)
+        parser.add_argument('--chars', type=int, default=3000, help='Transcript length per section')
+        parser.add_argument('--latency', type=float, default=1.0, help='Stub seconds per request')
+        parser.add_argument('--seconds-per-kchar', type=float, default=1.0, help='Stub seconds per 1000 characters')
+        parser.add_argument('--concurrency', type=int, help='Defaults to TTS_CONCURRENCY')
+        parser.add_argument('--chunk-chars', type=int, help='Defaults to TTS_CHUNK_CHARS')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['sections'] < 1:
+            raise CommandError('--sections must be at least 1')
+        rng = random.Random(options['seed'])
+
+        def make_sections():
+            return [
+                {'section_number': number, 'audio_transcript': _transcript(rng, options['chars'])}
+                for number in range(1, options['sections'] + 1)
+            ]
+
+        backend = StubTTSBackend()
+        # Audio goes to a throwaway media directory and the blob rows are rolled back
+        with tempfile.TemporaryDirectory() as media, transaction.atomic(), override_settings(
+                MEDIA_ROOT=media,
+                TTS_STUB_LATENCY=options['latency'], TTS_STUB_SECONDS_PER_KCHAR=options['seconds_per_kchar']):
+            start = time.monotonic()
+            with override_settings(TTS_CHUNK_CHARS=options['chars'] * 2):
+                voice_sections(make_sections(), backend=backend, max_workers=1)
+            sequential = time.monotonic() - start
+
+            sections = make_sections()
+            overrides = {'TTS_CHUNK_CHARS': options['chunk_chars']} if options['chunk_chars'] else {}
+            tracemalloc.start()
+            start = time.monotonic()
+            with override_settings(**overrides):
+                paths, errors, _ = voice_sections(sections, backend=backend, max_workers=options['concurrency'])
+            concurrent = time.monotonic() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            size = sum(os.path.getsize(os.path.join(media, path)) for path in paths.values())
+
+            start = time.monotonic()
+            _, _, reused = voice_sections(sections, backend=backend, max_workers=options['concurrency'])
+            cached = time.monotonic() - start
+            transaction.set_rollback(True)
+
+        if errors:
+            raise CommandError(f'Sections failed: {errors}')
+        self.stdout.write(f'sequential  {sequential:7.2f}s')
+        self.stdout.write(f'concurrent  {concurrent:7.2f}s  ({sequential / concurrent:.1f}x)')
+        self.stdout.write(f'cached      {cached:7.2f}s  ({len(reused)} of {len(sections)} sections reused)')
+        self.stdout.write(f'audio       {size // 1024} KiB across {len(paths)} sections, '
+                          f'peak memory {peak // 1024} KiB')
@@ -0,0 +1,130 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.models import ReadingTest, TestResult, ListeningTest, ListeningUserResult, WritingTest, WritingTestSubmission
+from api.seeding import check_database
+
+User = get_user_model()
+
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+INDEX_SCAN = re.compile(r'(?:Index Scan|Index Only Scan|Bitmap Index Scan)(?: Backward)? (?:using|on) (\w+)')
+
+
+def _paths(user):
+    """The read routes of api.urls, pointed at the given user's data"""
+    def first(queryset):
+        return queryset.values_list('id', flat=True).first()
+
+    return [
+        ('test-list', '/api/tests/'),
+        ('test-detail', f"/api/tests/{first(ReadingTest.objects.filter(is_active=True))}/"),
+        ('result-list', '/api/results/'),
+        ('result-detail', f"/api/results/{first(TestResult.objects.filter(user=user))}/"),
+        ('listening-test-list', '/api/listening-tests/'),
+        ('listening-test-detail', f"/api/listening-tests/{first(ListeningTest.objects.filter(is_active=True))}/"),
+        ('listening-result-list', '/api/listening-results/'),
+        ('listening-result-detail', f"/api/listening-results/{first(ListeningUserResult.objects.filter(user=user))}/"),
+        ('writing-test-list', '/api/writing-tests/'),
+        ('writing-test-detail', f"/api/writing-tests/{first(WritingTest.objects.filter(is_active=True))}/"),
+        ('writing-result-list', '/api/writing-results/'),
+        ('writing-result-detail', f"/api/writing-results/{first(WritingTestSubmission.objects.filter(user=user))}/"),
+        ('writing-result-status',
+         f"/api/writing-results/{first(WritingTestSubmission.objects.filter(user=user))}/status/"),
+        ('user-stats', '/api/stats/'),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN (ANALYZE, BUFFERS) on every query the read endpoints issue, against the seeded data '
+        'in the configured PostgreSQL database (see seed_scale), and report which plans fall back to '
+        'sequential scans. Refuses to run unless DATABASE_URL points at a database other than production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email of the user whose history is queried (default: the most active)')
+        parser.add_argument('--endpoint', action='append', help='Only explain these route names')
+        parser.add_argument('--summary', action='store_true', help='Print the scan summary without full plans')
+        parser.add_argument('--min-rows', type=int, default=10000,
+                            help='Sequential scans of tables smaller than this are expected and not reported')
+        parser.add_argument('--fail-on-seq-scan', action='store_true',
+                            help='Exit with an error when a plan scans a large table sequentially')
+
+    def handle(self, *args, **options):
+        check_database()
+        if connection.vendor != 'postgresql':
+            raise CommandError('EXPLAIN (ANALYZE, BUFFERS) needs PostgreSQL; point DATABASE_URL at a seeded database')
+
+        user = self.get_user(options['user'])
+        paths = _paths(user)
+        if options['endpoint']:
+            paths = [(name, path) for name, path in paths if name in options['endpoint']]
+
+        client = APIClient()
+        client.force_authenticate(user)
+        self.row_estimates = {}
+        seq_scans = []
+        # Requests may write (e.g. last_login); nothing is kept
+        with transaction.atomic():
+            for name, path in paths:
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(path)
+                if response.status_code >= 400:
+                    raise CommandError(f'{name} returned {response.status_code}: {response.content[:200]}')
+
+                selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{name} ({path}): {len(selects)} queries'))
+                for sql in selects:
+                    plan = self.explain(sql)
+                    scans = [
+                        table for table in SEQ_SCAN.findall(plan) if self.row_estimate(table) >= options['min_rows']
+                    ]
+                    indexes = INDEX_SCAN.findall(plan)
+                    seq_scans += [(name, table) for table in scans]
+
+                    self.stdout.write(f'  {sql[:160]}')
+                    line = f"    index: {', '.join(indexes) or '-'}  seq scan: {', '.join(scans) or '-'}"
+                    self.stdout.write(self.style.WARNING(line) if scans else line)
+                    if not options['summary']:
+                        self.stdout.write('\n'.join(f'      {row}' for row in plan.splitlines()))
+            transaction.set_rollback(True)
+
+        if seq_scans:
+            message = 'Sequential scans: ' + ', '.join(f'{table} ({name})' for name, table in seq_scans)
+            if options['fail_on_seq_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"No sequential scans of tables over {options['min_rows']} rows"))
+
+    def get_user(self, email):
+        if email:
+            try:
+                return User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f'No user with email {email}')
+        busiest = (
+            TestResult.objects.values('user_id').annotate(results=Count('id')).order_by('-results').first()
+        )
+        if busiest is None:
+            raise CommandError('No results to explain; seed the database first (manage.py seed_scale)')
+        return User.objects.get(pk=busiest['user_id'])
+
+    def row_estimate(self, table):
+        if table not in self.row_estimates:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [table])
+                row = cursor.fetchone()
+            self.row_estimates[table] = row[0] if row else 0
+        return self.row_estimates[table]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
@@ -0,0 +1,133 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+
+API_PREFIX = '/api/v1/gpt4o-image'
+
+SVG = """<svg width="400" height="300" xmlns="http://www.w3.org/2000/svg">
+  <rect width="100%" height="100%" fill="#ffffff"/>
+  <rect x="60" y="180" width="50" height="90" fill="#4a90d9"/>
+  <rect x="140" y="120" width="50" height="150" fill="#4a90d9"/>
+  <rect x="220" y="80" width="50" height="190" fill="#4a90d9"/>
+  <rect x="300" y="140" width="50" height="130" fill="#4a90d9"/>
+  <text x="50%" y="30" font-family="Arial" font-size="16" fill="#333" text-anchor="middle">{title}</text>
+</svg>
+"""
+
+
+class FakeImageService:
+    """In-memory stand-in for the kie.ai image API used by api.images"""
+
+    def __init__(self, render_seconds, failure_rate):
+        self.render_seconds = render_seconds
+        self.failure_rate = failure_rate
+        self.tasks = {}
+        self.lock = threading.Lock()
+
+    def submit(self, prompt):
+        task_id = uuid.uuid4().hex
+        with self.lock:
+            self.tasks[task_id] = {
+                'prompt': prompt,
+                'ready_at': time.monotonic() + self.render_seconds,
+                'fails': random.random() < self.failure_rate,
+            }
+        return task_id
+
+    def status(self, task_id, base_url):
+        with self.lock:
+            task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        if time.monotonic() < task['ready_at']:
+            return {'taskId': task_id, 'successFlag': 0}
+        if task['fails']:
+            return {'taskId': task_id, 'successFlag': 2, 'errorMessage': 'Simulated render failure'}
+        return {'taskId': task_id, 'successFlag': 1, 'response': {'resultUrls': [f'{base_url}/images/{task_id}.svg']}}
+
+
+def make_handler(service, verbosity):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep connections open like the real service, so client pooling is exercised
+        protocol_version = 'HTTP/1.1'
+
+        def send_json(self, status, data):
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if urlparse(self.path).path != f'{API_PREFIX}/generate':
+                return self.send_json(404, {'code': 404, 'msg': 'Not found'})
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                prompt = json.loads(self.rfile.read(length) or b'{}').get('prompt', '')
+            except ValueError:
+                return self.send_json(400, {'code': 400, 'msg': 'Invalid JSON'})
+            self.send_json(200, {'code': 200, 'msg': 'success', 'data': {'taskId': service.submit(prompt)}})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == f'{API_PREFIX}/record-info':
+                task_id = parse_qs(url.query).get('taskId', [''])[0]
+                data = service.status(task_id, f'http://{self.headers.get("Host")}')
+                if data is None:
+                    return self.send_json(404, {'code': 404, 'msg': 'Unknown task'})
+                return self.send_json(200, {'code': 200, 'msg': 'success', 'data': data})
+
+            if url.path.startswith('/images/') and url.path.endswith('.svg'):
+                task_id = url.path[len('/images/'):-len('.svg')]
+                with service.lock:
+                    task = service.tasks.get(task_id)
+                if task is None:
+                    return self.send_json(404, {'code': 404, 'msg': 'Unknown image'})
+                body = SVG.format(title=task['prompt'][:40].replace('<', '').replace('&', '')).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/svg+xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            self.send_json(404, {'code': 404, 'msg': 'Not found'})
+
+        def log_message(self, format, *args):
+            if verbosity > 1:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve a local fake of the kie.ai image API so writing test images can be generated offline. '
+        f'Set IMAGE_API_URL=http://<addr>:<port>{API_PREFIX} for the server and job workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--addr', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--render-seconds', type=float, default=10,
+                            help='Seconds before a submitted image is reported as ready')
+        parser.add_argument('--failure-rate', type=float, default=0.0,
+                            help='Fraction of renders that end in a failure')
+
+    def handle(self, *args, **options):
+        service = FakeImageService(options['render_seconds'], options['failure_rate'])
+        server = ThreadingHTTPServer((options['addr'], options['port']), make_handler(service, options['verbosity']))
+        self.stdout.write(f"Fake image service on http://{options['addr']}:{options['port']}{API_PREFIX}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
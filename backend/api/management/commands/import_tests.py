@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.importer import IMPORTERS, InvalidTestData, detect_kind, import_test
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Create tests from generator JSON files, e.g. generated_tests/*.json. A file holds one test or a list '
+        'of them; directories are read for *.json. Everything is imported in one transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+')
+        parser.add_argument('--kind', choices=sorted(IMPORTERS), help='Detected from the keys by default')
+        parser.add_argument('--difficulty', choices=['easy', 'medium', 'hard'],
+                            help="Overrides the file's difficulty_level (default medium)")
+        parser.add_argument('--created-by', help='Email of the user recorded as the author')
+
+    def files(self, paths):
+        for path in map(Path, paths):
+            if path.is_dir():
+                yield from sorted(path.glob('*.json'))
+            elif path.exists():
+                yield path
+            else:
+                raise CommandError(f'{path} does not exist')
+
+    def handle(self, *args, **options):
+        created_by = None
+        if options['created_by']:
+            try:
+                created_by = User.objects.get(email=options['created_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['created_by']}")
+
+        counts = dict.fromkeys(IMPORTERS, 0)
+        with transaction.atomic():
+            for path in self.files(options['paths']):
+                try:
+                    documents = json.loads(path.read_text())
+                except ValueError as e:
+                    raise CommandError(f'{path}: {e}')
+                for data in documents if isinstance(documents, list) else [documents]:
+                    try:
+                        kind = options['kind'] or detect_kind(data)
+                        test = import_test(data, kind=kind, created_by=created_by,
+                                           difficulty_level=options['difficulty'])
+                    except InvalidTestData as e:
+                        raise CommandError(f'{path}: {e}')
+                    counts[kind] += 1
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{path}: {kind} test {test.id} "{test.title}"')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts['reading']} reading, {counts['listening']} listening and {counts['writing']} writing tests"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.duplicates import index_submission
+from tests.models import WritingTestSubmission
+
+
+class Command(BaseCommand):
+    help = (
+        'Add writing submissions made before the near-duplicate index existed to it; '
+        'new submissions are indexed when they are made.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        pending = WritingTestSubmission.objects.filter(essay_buckets__isnull=True).only(
+            'id', 'test_id', 'task1_answer', 'task2_answer',
+        ).order_by('id')
+        indexed = 0
+        last_id = 0
+        while True:
+            batch = list(pending.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            with transaction.atomic():
+                for submission in batch:
+                    index_submission(submission, count=False)
+            indexed += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} writing submissions'))
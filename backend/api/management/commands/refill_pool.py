@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from api.pool import pool_stats, queue_refill, refill_pool
+
+
+class Command(BaseCommand):
+    help = (
+        'Start (or bring forward) the refill of the pre-generated test pool, which then re-queues itself, '
+        'and print the depth of every pool target. The pooled generations run in the job workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--now', action='store_true',
+                            help='Run the refill in this process instead of queueing it')
+        parser.add_argument('--stats', action='store_true', help='Only print the pool depth')
+
+    def handle(self, *args, **options):
+        if options['now']:
+            refill_pool({})
+        elif not options['stats']:
+            queue_refill()
+
+        stats = pool_stats()
+        self.stdout.write(f"off-peak: {stats['off_peak']}, next refill: {stats['next_refill_at'] or 'none queued'}")
+        self.stdout.write(f"{'target':<40}{'depth':>6}{'ready':>6}{'queued':>7}{'lag s':>7}")
+        for target in stats['targets']:
+            name = ':'.join([target['kind'], *map(str, target['params'].values())])
+            self.stdout.write(f"{name:<40}{target['target']:>6}{target['ready']:>6}{target['in_flight']:>7}"
+                              f"{target['refill_lag_seconds']:>7}")
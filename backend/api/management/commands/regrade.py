@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tests.models import ReadingTest, ListeningTest
+from api.grading import READING, LISTENING
+from api.regrade import regrade_test, RegradeStats
+
+
+class Command(BaseCommand):
+    help = 'Regrade stored reading and listening results against the current answer keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reading-test', type=int, action='append', default=[], dest='reading_tests',
+                            help='Reading test id to regrade (repeatable)')
+        parser.add_argument('--listening-test', type=int, action='append', default=[], dest='listening_tests',
+                            help='Listening test id to regrade (repeatable)')
+        parser.add_argument('--all', action='store_true', help='Regrade results of every test')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        reading_tests = options['reading_tests']
+        listening_tests = options['listening_tests']
+        if options['all']:
+            reading_tests = list(ReadingTest.objects.values_list('id', flat=True))
+            listening_tests = list(ListeningTest.objects.values_list('id', flat=True))
+        if not reading_tests and not listening_tests:
+            raise CommandError('Pass --reading-test, --listening-test or --all')
+
+        total = RegradeStats()
+        for kind, test_ids in ((READING, reading_tests), (LISTENING, listening_tests)):
+            for test_id in test_ids:
+                stats = regrade_test(kind, test_id, batch_size=options['batch_size'])
+                total.add(stats)
+                self.stdout.write(
+                    f'{kind} test {test_id}: {stats.scanned} results scanned, '
+                    f'{stats.updated} updated ({stats.rate:.0f} results/s)'
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Regraded {total.scanned} results, {total.updated} updated '
+            f'in {total.elapsed:.1f}s ({total.rate:.0f} results/s)'
+        ))
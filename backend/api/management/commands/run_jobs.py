@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.jobs import HANDLERS, run_workers
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs (writing evaluation, ...) with a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                            help='Jobs run at the same time by this process')
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL,
+                            help='Seconds an idle worker waits before looking for due jobs again')
+        parser.add_argument('--kind', action='append', choices=sorted(HANDLERS),
+                            help='Only run jobs of these kinds')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due instead of waiting')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Running jobs with {options['concurrency']} workers")
+        try:
+            run_workers(
+                concurrency=options['concurrency'],
+                poll_interval=options['poll_interval'],
+                kinds=options['kind'],
+                drain=options['once'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping after the running jobs finish')
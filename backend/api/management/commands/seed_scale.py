@@ -0,0 +1,90 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.seeding import (
+    check_database, create_users, create_reading_catalog, create_listening_catalog, create_writing_catalog,
+    seed_result_chunk,
+)
+
+# Filled in before the worker pool forks so children inherit it instead of receiving it per task
+_shared = {}
+
+
+def _seed_chunk(task):
+    kind, chunk_index, count = task
+    catalog = _shared['catalogs'][kind]
+    return kind, seed_result_chunk(
+        kind, chunk_index, count, _shared['seed'], _shared['user_ids'], catalog, batch_size=_shared['batch_size']
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic users, tests and results at scale for index and pagination studies; '
+        'refuses to run unless DATABASE_URL points at a database other than production'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--reading-tests', type=int, default=1000)
+        parser.add_argument('--listening-tests', type=int, default=500)
+        parser.add_argument('--writing-tests', type=int, default=500)
+        parser.add_argument('--reading-results', type=int, default=1000000)
+        parser.add_argument('--listening-results', type=int, default=500000)
+        parser.add_argument('--writing-results', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--chunk-size', type=int, default=50000, help='Result rows generated per task')
+        parser.add_argument('--workers', type=int, default=1, help='Processes inserting results in parallel')
+
+    def handle(self, *args, **options):
+        check_database()
+        seed = options['seed']
+        batch_size = options['batch_size']
+        started = time.monotonic()
+
+        user_ids = create_users(options['users'], seed, batch_size=batch_size)
+        catalogs = {
+            'reading': create_reading_catalog(options['reading_tests'], seed, batch_size=batch_size),
+            'listening': create_listening_catalog(options['listening_tests'], seed, batch_size=batch_size),
+            'writing': create_writing_catalog(options['writing_tests'], seed, batch_size=batch_size),
+        }
+        self.stdout.write(
+            f"Created {len(user_ids)} users and {sum(len(c) for c in catalogs.values())} tests "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+        tasks = []
+        for kind in ('reading', 'listening', 'writing'):
+            total = options[f'{kind}_results']
+            if not catalogs[kind]:
+                continue
+            for chunk_index, start in enumerate(range(0, total, options['chunk_size'])):
+                tasks.append((kind, chunk_index, min(options['chunk_size'], total - start)))
+
+        _shared.update(seed=seed, user_ids=user_ids, catalogs=catalogs, batch_size=batch_size)
+        results_started = time.monotonic()
+        inserted = 0
+        if options['workers'] > 1:
+            # Each forked worker must open its own database connection
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(options['workers']) as pool:
+                for kind, count in pool.imap_unordered(_seed_chunk, tasks):
+                    inserted += count
+                    self.report(kind, inserted, results_started)
+        else:
+            for task in tasks:
+                kind, count = _seed_chunk(task)
+                inserted += count
+                self.report(kind, inserted, results_started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {inserted} results in {time.monotonic() - started:.1f}s total'
+        ))
+
+    def report(self, kind, inserted, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'{inserted} results inserted (last chunk: {kind}, {inserted / elapsed:.0f} rows/s)')
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_generation_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='generationjob',
+            name='pooled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='generationjob',
+            index=models.Index(condition=models.Q(('claimed_at__isnull', True), ('pooled', True)), fields=['kind', 'created_at'], name='generation_jobs_pool_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0012_writing_text_features'),
+        ('api', '0005_generation_pool'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EssayBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=5)),
+                ('bucket', models.BigIntegerField()),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='essay_buckets', to='tests.writingtestsubmission')),
+                ('test', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tests.writingtest')),
+            ],
+            options={
+                'db_table': 'essay_buckets',
+                'indexes': [models.Index(fields=['test', 'task', 'bucket'], name='essay_buckets_lookup_idx')],
+            },
+        ),
+    ]
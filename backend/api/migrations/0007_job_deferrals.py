@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_essay_buckets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='deferrals',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
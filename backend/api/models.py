@@ -0,0 +1,198 @@
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of background work, claimed and run by ``manage.py run_jobs`` (see api.jobs)"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    deferrals = models.PositiveIntegerField(default=0)  # Times requeued by RetryLater without spending an attempt
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['-created_at']
+        indexes = [
+            # Workers only ever look for due jobs in the queue
+            models.Index(fields=['run_after', 'id'], condition=Q(status='queued'), name='jobs_queued_idx'),
+        ]
+
+
+class LLMCacheEntry(models.Model):
+    """A parsed LLM reply stored under the hash of its request (see api.llm)"""
+    key = models.CharField(max_length=64, primary_key=True)  # SHA-256 of model, parameters and messages
+    model = models.CharField(max_length=100)
+    response = models.JSONField()
+    size_bytes = models.PositiveIntegerField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.model} {self.key[:12]}"
+
+    class Meta:
+        db_table = 'llm_cache'
+        indexes = [
+            # Eviction removes the least recently used entries first
+            models.Index(fields=['last_used_at'], name='llm_cache_last_used_idx'),
+        ]
+
+
+class AudioBlob(models.Model):
+    """A voiced transcript stored once under the hash of its voice, model and text (see api.tts)
+
+    Listening sections point at the blob's file; a blob no section points at
+    any more is deleted by the ``audio_cleanup`` job.
+    """
+    key = models.CharField(max_length=64, primary_key=True)  # SHA-256 of model, voice and transcript
+    file = models.FileField(upload_to='listening_audios/')
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.file.name
+
+    class Meta:
+        db_table = 'audio_blobs'
+
+
+class EssayBucket(models.Model):
+    """One LSH band of an answer's MinHash signature (see api.duplicates)
+
+    Answers to the same task of the same test that share a bucket are
+    candidate near-duplicates.
+    """
+    submission = models.ForeignKey('tests.WritingTestSubmission', on_delete=models.CASCADE,
+                                   related_name='essay_buckets')
+    # Covered by the lookup index
+    test = models.ForeignKey('tests.WritingTest', on_delete=models.CASCADE, related_name='+', db_index=False)
+    task = models.CharField(max_length=5)  # task1 / task2
+    bucket = models.BigIntegerField()  # Hash of the band number and its rows
+
+    class Meta:
+        db_table = 'essay_buckets'
+        indexes = [
+            models.Index(fields=['test', 'task', 'bucket'], name='essay_buckets_lookup_idx'),
+        ]
+
+
+class GenerationJob(models.Model):
+    """A test generation run out of band by the ``generate_test`` job, with its progress by stage (see api.generation)
+
+    ``stages`` is a list of ``{"name", "status", ...}`` in pipeline order;
+    listening audio reports each section under ``"sections"``. A ``pooled``
+    generation stocks the pre-generated test pool (see api.pool): its test is
+    created inactive and activated when a generate request claims it.
+    """
+    READING = 'reading'
+    LISTENING = 'listening'
+    WRITING = 'writing'
+    KIND_CHOICES = [
+        (READING, 'Reading'),
+        (LISTENING, 'Listening'),
+        (WRITING, 'Writing'),
+    ]
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = Job.STATUS_CHOICES
+
+    # Stage and section statuses
+    PENDING = 'pending'
+    DONE = 'done'
+    SKIPPED = 'skipped'
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict)
+    batch = models.UUIDField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    stages = models.JSONField(default=list)
+    content = models.JSONField(null=True, blank=True)  # Generated content, kept so a retry skips the LLM call
+    test_id = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    pooled = models.BooleanField(default=False)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} generation #{self.pk} ({self.status})"
+
+    def stage(self, name):
+        return next(stage for stage in self.stages if stage['name'] == name)
+
+    @classmethod
+    def update_stage(cls, pk, name, **fields):
+        """Update one stage of a generation from outside its pipeline, e.g. the writing image job"""
+        with transaction.atomic():
+            generation = cls.objects.select_for_update().filter(pk=pk).first()
+            if generation is None:
+                return
+            generation.stage(name).update(fields)
+            generation.save(update_fields=['stages', 'updated_at'])
+
+    @property
+    def is_done(self):
+        """Failed, or succeeded with no stage still to run (a writing image renders after the test exists)"""
+        if self.status == self.FAILED:
+            return True
+        return self.status == self.SUCCEEDED and all(
+            stage['status'] not in (self.PENDING, self.RUNNING) for stage in self.stages
+        )
+
+    @property
+    def progress(self):
+        """Percentage of finished stages; audio counts each section"""
+        if not self.stages:
+            return 0
+        finished = 0.0
+        for stage in self.stages:
+            sections = stage.get('sections')
+            if stage['status'] in (self.PENDING, self.RUNNING) and sections:
+                finished += sum(section['status'] not in (self.PENDING, self.RUNNING) for section in sections) / len(sections)
+            elif stage['status'] not in (self.PENDING, self.RUNNING):
+                finished += 1
+        return round(100 * finished / len(self.stages))
+
+    class Meta:
+        db_table = 'generation_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='generation_jobs_created_idx'),
+            models.Index(fields=['batch'], name='generation_jobs_batch_idx'),
+            # Claims and depth counts only look at the unclaimed pool
+            models.Index(fields=['kind', 'created_at'], condition=Q(pooled=True, claimed_at__isnull=True),
+                         name='generation_jobs_pool_idx'),
+        ]
@@ -0,0 +1,170 @@
+"""Keyset (cursor) pagination for result history lists.
+
+Pages are addressed by the ``(timestamp, id)`` of the row at their edge rather
+than by an offset, so every page is an index range scan of the same cost and
+no ``COUNT(*)`` is issued. The id breaks ties between rows with the same
+timestamp, which DRF's ``CursorPagination`` handles with an offset instead.
+
+Rows are ordered newest first with NULL timestamps (never completed) ahead of
+them, which is PostgreSQL's order for ``DESC`` and so matches the plain
+composite indexes declared on the result models.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    ordering_field = None
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        field = self.ordering_field
+
+        if cursor is None:
+            rows = list(self.forward(queryset)[:self.page_size + 1])
+            has_more, reverse = len(rows) > self.page_size, False
+        else:
+            value, pk, reverse = cursor
+            rows = self.page_before(queryset, value, pk) if reverse else self.page_after(queryset, value, pk)
+            has_more = len(rows) > self.page_size
+
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Coming back from a later page guarantees a next page, and any
+        # cursor moving forward guarantees a previous one
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else cursor is not None
+        self.first = (getattr(rows[0], field), rows[0].pk) if rows else None
+        self.last = (getattr(rows[-1], field), rows[-1].pk) if rows else None
+        return rows
+
+    def forward(self, queryset):
+        return queryset.order_by(F(self.ordering_field).desc(nulls_first=True), '-id')
+
+    def backward(self, queryset):
+        return queryset.order_by(F(self.ordering_field).asc(nulls_last=True), 'id')
+
+    def page_after(self, queryset, value, pk):
+        """Rows following ``(value, pk)``; the NULL timestamps come before all others"""
+        field = self.ordering_field
+        limit = self.page_size + 1
+        if value is not None:
+            # The plain range condition lets the index seek straight to the cursor
+            return list(self.forward(queryset.filter(
+                Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}),
+                **{f'{field}__lte': value}
+            ))[:limit])
+
+        rows = list(self.forward(queryset.filter(**{f'{field}__isnull': True, 'id__lt': pk}))[:limit])
+        if len(rows) < limit:
+            rows += self.forward(queryset.filter(**{f'{field}__isnull': False}))[:limit - len(rows)]
+        return rows
+
+    def page_before(self, queryset, value, pk):
+        """Rows preceding ``(value, pk)``, nearest first"""
+        field = self.ordering_field
+        limit = self.page_size + 1
+        if value is None:
+            return list(self.backward(queryset.filter(**{f'{field}__isnull': True, 'id__gt': pk}))[:limit])
+
+        rows = list(self.backward(queryset.filter(
+            Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}),
+            **{f'{field}__gte': value}
+        ))[:limit])
+        if len(rows) < limit:
+            rows += self.backward(queryset.filter(**{f'{field}__isnull': True}))[:limit - len(rows)]
+        return rows
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            value = data['v']
+            if value is not None:
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError(data['v'])
+            return value, int(data['id']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        value, pk = position
+        data = {'v': value.isoformat() if value is not None else None, 'id': pk}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('ascii')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first is None:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class CompletedAtPagination(KeysetPagination):
+    ordering_field = 'completed_at'
+
+
+class SubmittedAtPagination(KeysetPagination):
+    ordering_field = 'submitted_at'
+
+
+class CreatedAtPagination(KeysetPagination):
+    ordering_field = 'created_at'
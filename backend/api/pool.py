@@ -0,0 +1,200 @@
+"""Pre-generated test pool.
+
+``GENERATION_POOL_TARGETS`` sets how many ready, inactive tests to keep per
+module, difficulty and (for writing) task types, e.g.
+``reading:medium=3,listening:hard=1,writing:medium:graph:opinion=2``. The
+``refill_pool`` job queues pooled generations (see api.generation) for
+every shortfall and then re-queues itself every ``GENERATION_POOL_INTERVAL``
+seconds. It tops the pool up to target only during
+``GENERATION_POOL_OFF_PEAK_HOURS``; at other times it only keeps every
+target from running empty. At most ``GENERATION_POOL_CONCURRENCY`` pooled
+generations are in flight at once, so the refill never crowds out the
+generations admins ask for.
+
+A generate request first claims ready pooled tests that match it and just
+activates them; only the rest are generated from scratch. Any claim or miss
+brings the next refill forward. ``pool_stats`` reports each target's depth
+and how far the refill lags behind it.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, F, Min
+from django.utils import timezone
+
+from tests.models import ReadingTest, ListeningTest, WritingTest
+from .generation import queue_generations
+from .jobs import enqueue
+from .models import GenerationJob, Job
+
+logger = logging.getLogger(__name__)
+
+TEST_MODELS = {
+    GenerationJob.READING: ReadingTest,
+    GenerationJob.LISTENING: ListeningTest,
+    GenerationJob.WRITING: WritingTest,
+}
+
+RANDOM = 'random'
+IN_FLIGHT = [GenerationJob.QUEUED, GenerationJob.RUNNING]
+
+
+def _params(kind, difficulty_level, task1_type=RANDOM, task2_type=RANDOM):
+    """The generation params a pool target stands for, shaped like the generate serializers' data"""
+    params = {'difficulty_level': difficulty_level}
+    if kind == GenerationJob.LISTENING:
+        params['include_audio'] = True
+    elif kind == GenerationJob.WRITING:
+        params.update(task1_type=task1_type, task2_type=task2_type)
+    return params
+
+
+def pool_targets():
+    """``[(kind, params, depth)]`` from ``GENERATION_POOL_TARGETS``"""
+    targets = []
+    for entry in filter(None, (entry.strip() for entry in settings.GENERATION_POOL_TARGETS.split(','))):
+        try:
+            key, depth = entry.split('=')
+            kind, *rest = key.strip().split(':')
+            if kind not in TEST_MODELS or len(rest) > (3 if kind == GenerationJob.WRITING else 1):
+                raise ValueError
+            targets.append((kind, _params(kind, *rest), int(depth)))
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid GENERATION_POOL_TARGETS entry: {entry!r}')
+    return targets
+
+
+def is_off_peak(now=None):
+    """Whether ``now`` (local time) falls in ``GENERATION_POOL_OFF_PEAK_HOURS``, e.g. ``22-6``"""
+    start, end = (int(hour) for hour in settings.GENERATION_POOL_OFF_PEAK_HOURS.split('-'))
+    hour = timezone.localtime(now).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+def _unclaimed(kind, params):
+    """Pooled generations of a target that nobody has claimed, ready or still in flight"""
+    return GenerationJob.objects.filter(
+        kind=kind, pooled=True, claimed_at__isnull=True,
+        **{f'params__{key}': value for key, value in params.items()},
+    )
+
+
+def _claimable(kind, params):
+    """Ready pooled generations that satisfy a generate request's params"""
+    queryset = GenerationJob.objects.filter(
+        kind=kind, pooled=True, claimed_at__isnull=True, status=GenerationJob.SUCCEEDED,
+        params__difficulty_level=params['difficulty_level'],
+    )
+    if kind == GenerationJob.LISTENING:
+        queryset = queryset.filter(params__include_audio=params['include_audio'])
+    elif kind == GenerationJob.WRITING:
+        # A random-type pooled test satisfies a specific request if it came out as that type
+        for task in ('task1', 'task2'):
+            if params[f'{task}_type'] != RANDOM:
+                queryset = queryset.filter(**{f'content__{task}__type': params[f'{task}_type']})
+    return queryset
+
+
+def claim_pooled(kind, params, created_by, count):
+    """Activate up to ``count`` ready pooled tests matching ``params``; returns their generations"""
+    with transaction.atomic():
+        claimed = list(
+            _claimable(kind, params).select_for_update(skip_locked=True).order_by('created_at', 'id')[:count]
+        )
+        if claimed:
+            now = timezone.now()
+            GenerationJob.objects.filter(pk__in=[generation.pk for generation in claimed]).update(
+                claimed_at=now, created_by=created_by, updated_at=now,
+            )
+            TEST_MODELS[kind].objects.filter(pk__in=[generation.test_id for generation in claimed]).update(
+                is_active=True, created_by=created_by,
+            )
+            for generation in claimed:
+                generation.claimed_at = generation.updated_at = now
+                generation.created_by = created_by
+    return claimed
+
+
+def request_generations(kind, params, created_by, count):
+    """Serve a generate request from the pool, generating only what it cannot supply
+
+    Returns ``(generations, pooled)``, where the first ``pooled`` generations
+    are finished tests taken from the pool.
+    """
+    claimed = claim_pooled(kind, params, created_by, count)
+    queued = queue_generations(kind, params, created_by, count - len(claimed)) if len(claimed) < count else []
+    if any(target[0] == kind for target in pool_targets()):
+        transaction.on_commit(queue_refill)
+    return claimed + queued, len(claimed)
+
+
+def queue_refill(delay=None):
+    """Make sure a refill is queued, and bring it forward to ``delay`` from now if it is due later"""
+    run_after = timezone.now() + (delay or timedelta())
+    with transaction.atomic():
+        pending = Job.objects.select_for_update().filter(kind='refill_pool', status__in=[Job.QUEUED, Job.RUNNING])
+        queued = [job for job in pending if job.status == Job.QUEUED]
+        if queued:
+            Job.objects.filter(pk__in=[job.pk for job in queued], run_after__gt=run_after).update(run_after=run_after)
+        elif not pending:
+            enqueue('refill_pool', {}, delay=delay)
+
+
+def refill_pool(payload):
+    """Job handler: queue pooled generations for every target below its depth, then re-queue itself"""
+    off_peak = is_off_peak()
+    budget = settings.GENERATION_POOL_CONCURRENCY - GenerationJob.objects.filter(
+        pooled=True, status__in=IN_FLIGHT,
+    ).count()
+    for kind, params, depth in pool_targets():
+        if budget <= 0:
+            break
+        stocked = _unclaimed(kind, params).filter(status__in=IN_FLIGHT + [GenerationJob.SUCCEEDED]).count()
+        # Outside off-peak hours a target is only kept from running empty
+        wanted = (depth if off_peak else min(depth, 1)) - stocked
+        if wanted > 0:
+            generations = queue_generations(kind, params, None, min(wanted, budget), pooled=True)
+            budget -= len(generations)
+            logger.info('Queued %s pooled %s generations for %s', len(generations), kind, params)
+
+    # A refill queued in the meantime takes over the schedule
+    if not Job.objects.filter(kind='refill_pool', status=Job.QUEUED).exists():
+        enqueue('refill_pool', {}, delay=timedelta(seconds=settings.GENERATION_POOL_INTERVAL))
+
+
+def pool_stats():
+    """Depth of every pool target and how long its refill has been outstanding"""
+    now = timezone.now()
+    stats = []
+    for kind, params, depth in pool_targets():
+        unclaimed = _unclaimed(kind, params)
+        ready = unclaimed.filter(status=GenerationJob.SUCCEEDED).count()
+        in_flight = unclaimed.filter(status__in=IN_FLIGHT)
+        oldest = in_flight.aggregate(oldest=Min('created_at'))['oldest']
+        filled = GenerationJob.objects.filter(
+            kind=kind, pooled=True, status=GenerationJob.SUCCEEDED, finished_at__gte=now - timedelta(days=1),
+            **{f'params__{key}': value for key, value in params.items()},
+        ).aggregate(fill=Avg(F('finished_at') - F('created_at')))['fill']
+        stats.append({
+            'kind': kind,
+            'params': params,
+            'target': depth,
+            'ready': ready,
+            'in_flight': in_flight.count(),
+            'shortfall': max(0, depth - ready),
+            # Refill lag: how long the oldest pooled generation still running has been waiting
+            'refill_lag_seconds': round((now - oldest).total_seconds()) if oldest else 0,
+            'avg_fill_seconds': round(filled.total_seconds()) if filled else None,
+            'claimed_last_24h': GenerationJob.objects.filter(
+                kind=kind, pooled=True, claimed_at__gte=now - timedelta(days=1),
+            ).count(),
+        })
+    next_refill = Job.objects.filter(kind='refill_pool', status=Job.QUEUED).aggregate(at=Min('run_after'))['at']
+    return {
+        'off_peak': is_off_peak(now),
+        'concurrency': settings.GENERATION_POOL_CONCURRENCY,
+        'next_refill_at': next_refill,
+        'targets': stats,
+    }
@@ -0,0 +1,198 @@
+"""Reading test generation: the passage and its questions in one streamed LLM call.
+
+The reply is parsed as it streams in (``api.llm.stream_json``), so every
+question is validated the moment it is complete and the progress callback
+sees the count grow. A reply cut off part-way (``max_tokens``, a dropped
+connection) keeps every question completed before the cut, and invalid
+questions are dropped; only the missing question numbers are then asked for
+again, with the passage, in up to ``MAX_FOLLOW_UPS`` smaller calls.
+"""
+import time
+
+from tests.models import Question
+from .grading import normalize_answer
+from .llm import get_client, stream_json
+
+GENERATION_MODEL = "gpt-3.5-turbo-0125"
+GENERATION_PARAMS = {
+    'max_tokens': 4000,
+    'temperature': 0.7,
+}
+FOLLOW_UP_PARAMS = {
+    'max_tokens': 2500,
+    'temperature': 0.7,
+    'response_format': {'type': 'json_object'},
+}
+
+QUESTION_COUNT = 40
+QUESTIONS_PER_TYPE = 10
+MAX_FOLLOW_UPS = 2
+QUESTION_TYPES = [value for value, _ in Question.QUESTION_TYPES]
+CHOICE_TYPES = {'matching', 'true_false'}
+SYSTEM_PROMPT = "You are an expert IELTS test creator. Generate high-quality academic reading passages and questions."
+
+PROMPT = """
+    Generate an IELTS Academic Reading passage with 40 questions. The passage should be:
+    - 800-1000 words long
+    - Academic in nature (science, history, technology, etc.)
+    - Suitable for IELTS level (B2-C1)
+
+    Create exactly 40 questions with the following distribution:
+    - 10 Matching questions (matching headings, features, etc.)
+    - 10 True/False/Not Given questions
+    - 10 Fill in the blanks questions
+    - 10 Short answer questions
+
+    Return the response in this exact JSON format:
+    {
+        "title": "Passage Title",
+        "passage": "Full passage text here...",
+        "questions": [
+            {
+                "id": 1,
+                "question": "Question text here?",
+                "type": "matching",
+                "choices": ["Option A", "Option B", "Option C", "Option D"],
+                "answer": "Option A"
+            },
+            {
+                "id": 2,
+                "question": "Question text here?",
+                "type": "true_false",
+                "choices": ["True", "False", "Not Given"],
+                "answer": "True"
+            },
+            {
+                "id": 3,
+                "question": "Fill in the blank: The main purpose of the study was to _____.",
+                "type": "fill_blank",
+                "answer": "analyze patterns"
+            },
+            {
+                "id": 4,
+                "question": "What year was the study conducted?",
+                "type": "short_answer",
+                "answer": "2020"
+            }
+        ]
+    }
+    """
+
+
+def validate_question(data):
+    """The question in the importer's shape, or ``None`` when it cannot be used"""
+    if not isinstance(data, dict):
+        return None
+    number = data.get('id')
+    question = data.get('question')
+    answer = data.get('answer')
+    choices = data.get('choices')
+    if isinstance(number, str) and number.isdigit():
+        number = int(number)
+    if not isinstance(number, int) or isinstance(number, bool) or not 1 <= number <= QUESTION_COUNT:
+        return None
+    if not isinstance(question, str) or not question.strip() or data.get('type') not in QUESTION_TYPES:
+        return None
+    if answer is None or isinstance(answer, (dict, list)) or not str(answer).strip():
+        return None
+    if choices is not None or data['type'] in CHOICE_TYPES:
+        if not isinstance(choices, list) or not choices:
+            return None
+        if normalize_answer(answer) not in {normalize_answer(choice) for choice in choices}:
+            return None
+    question_data = {'id': number, 'question': question.strip(), 'type': data['type'], 'answer': str(answer).strip()}
+    if choices:
+        question_data['choices'] = choices
+    return question_data
+
+
+def _follow_up_prompt(passage, missing, types):
+    return f"""
+    Here is an IELTS Academic Reading passage:
+
+    {passage}
+
+    Write questions on this passage with exactly these ids: {', '.join(map(str, missing))}.
+    Use these question types, in this number: {', '.join(f'{count} {kind}' for kind, count in types.items())}.
+    "matching" and "true_false" questions need "choices" and an "answer" that is one of them;
+    true_false choices are ["True", "False", "Not Given"].
+
+    Return the response in this exact JSON format:
+    {{"questions": [{{"id": {missing[0]}, "question": "...", "type": "...", "choices": [...], "answer": "..."}}]}}
+    """
+
+
+def generate_reading_test(client=None, on_progress=None):
+    """Ask the LLM for a passage and its questions, in the shape ``api.importer.import_reading_test`` takes
+
+    ``on_progress(stats)`` is called whenever a question is accepted and
+    after every call, with the counts so far.
+    """
+    client = client or get_client()
+    start = time.monotonic()
+    data = {}
+    questions = {}
+    stats = {'questions': 0, 'first_question_ms': None, 'invalid': 0, 'truncated': False,
+             'recovered': 0, 'follow_ups': 0, 'missing': QUESTION_COUNT}
+
+    def report():
+        stats['questions'] = len(questions)
+        stats['missing'] = QUESTION_COUNT - len(questions)
+        if on_progress:
+            on_progress(dict(stats))
+
+    def accept(value, wanted=None):
+        question = validate_question(value)
+        if question is None or question['id'] in questions or (wanted and question['id'] not in wanted):
+            stats['invalid'] += 1
+            return False
+        questions[question['id']] = question
+        if stats['first_question_ms'] is None:
+            stats['first_question_ms'] = round((time.monotonic() - start) * 1000)
+        report()
+        return True
+
+    def on_value(path, value):
+        if path[0] == 'questions':
+            accept(value)
+        else:
+            data[path[0]] = value
+
+    parser, finish_reason = stream_json([
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": PROMPT},
+    ], GENERATION_MODEL, [('title',), ('passage',), ('questions', '*')], on_value, client=client, **GENERATION_PARAMS)
+    stats['truncated'] = finish_reason in ('length', 'interrupted') or not parser.finished
+    if stats['truncated']:
+        stats['recovered'] = len(questions)
+    report()
+
+    passage = data.get('passage')
+    if not isinstance(passage, str) or not passage.strip():
+        # Nothing to ask follow-up questions about; the job retries the whole call
+        raise ValueError(f'Reading generation returned no passage (finish reason {finish_reason})')
+
+    for _ in range(MAX_FOLLOW_UPS):
+        missing = [number for number in range(1, QUESTION_COUNT + 1) if number not in questions]
+        if not missing:
+            break
+        types = {kind: QUESTIONS_PER_TYPE - sum(question['type'] == kind for question in questions.values())
+                 for kind in QUESTION_TYPES}
+        types = {kind: count for kind, count in types.items() if count > 0}
+        stats['follow_ups'] += 1
+        wanted = set(missing)
+        stream_json([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": _follow_up_prompt(passage, missing, types)},
+        ], GENERATION_MODEL, [('questions', '*')], lambda path, value: accept(value, wanted),
+            client=client, **FOLLOW_UP_PARAMS)
+        report()
+
+    if not questions:
+        raise ValueError('Reading generation returned no usable questions')
+    title = data.get('title')
+    return {
+        'title': title.strip() if isinstance(title, str) and title.strip() else 'Generated Reading Test',
+        'passage': passage,
+        'questions': [questions[number] for number in sorted(questions)],
+    }
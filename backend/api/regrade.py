@@ -0,0 +1,116 @@
+"""Bulk regrading of stored results after a test's answer key changes.
+
+Results are streamed with a server-side cursor and graded a batch at a time
+against the test's cached answer key; only the rows whose grade changed are
+written back, with one ``bulk_update`` per batch. The admin actions queue a
+``regrade_test`` job per test instead of regrading inside the request.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+
+from tests.models import TestResult, ListeningUserResult
+from .grading import READING, LISTENING, get_answer_key
+from .jobs import enqueue
+
+logger = logging.getLogger(__name__)
+
+RESULT_MODELS = {
+    READING: TestResult,
+    LISTENING: ListeningUserResult,
+}
+
+REGRADE_FIELDS = ['correct_answers', 'total_questions', 'score', 'question_outcomes']
+
+
+@dataclass
+class RegradeStats:
+    scanned: int = 0
+    updated: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self):
+        """Results scanned per second"""
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+    def add(self, other):
+        self.scanned += other.scanned
+        self.updated += other.updated
+        self.elapsed += other.elapsed
+
+
+def _band_score(correct, total):
+    score = (correct / total) * 9.0 if total > 0 else 0.0
+    return Decimal(str(round(score, 2)))
+
+
+def regrade_test(kind, test_id, batch_size=2000, missing_outcomes_only=False):
+    """Regrade stored results of one test, writing back only rows that changed
+
+    ``missing_outcomes_only`` backfills outcomes on results stored without
+    them and leaves their scores as they were graded.
+    """
+    model = RESULT_MODELS[kind]
+    answer_key = get_answer_key(kind, test_id)
+    stats = RegradeStats()
+    started = time.monotonic()
+
+    fields = REGRADE_FIELDS
+    results = model.objects.filter(test_id=test_id)
+    if missing_outcomes_only:
+        fields = ['question_outcomes']
+        results = results.filter(question_outcomes__isnull=True)
+
+    with transaction.atomic():
+        results = (
+            results.only('id', 'answers', *fields)
+            .order_by('id')
+            .iterator(chunk_size=batch_size)
+        )
+        while True:
+            batch = list(islice(results, batch_size))
+            if not batch:
+                break
+
+            changed = []
+            for result in batch:
+                grade = answer_key.grade(result.answers if isinstance(result.answers, dict) else {})
+                graded = {
+                    'correct_answers': grade.correct_count,
+                    'total_questions': grade.total_questions,
+                    'score': _band_score(grade.correct_count, grade.total_questions),
+                    'question_outcomes': grade.outcomes,
+                }
+                if any(getattr(result, field) != graded[field] for field in fields):
+                    for field in fields:
+                        setattr(result, field, graded[field])
+                    changed.append(result)
+
+            if changed:
+                model.objects.bulk_update(changed, fields, batch_size=batch_size)
+            stats.scanned += len(batch)
+            stats.updated += len(changed)
+
+    stats.elapsed = time.monotonic() - started
+    return stats
+
+
+def queue_regrades(kind, test_ids):
+    """Queue a ``regrade_test`` job for each test; returns how many were queued"""
+    test_ids = list(test_ids)
+    with transaction.atomic():
+        for test_id in test_ids:
+            enqueue('regrade_test', {'kind': kind, 'test_id': test_id})
+    return len(test_ids)
+
+
+def run_regrade(payload):
+    """Job handler: regrade the stored results of one test"""
+    stats = regrade_test(payload['kind'], payload['test_id'])
+    logger.info('Regraded %s test %s: %s results scanned, %s updated in %.1fs (%.0f results/s)',
+                payload['kind'], payload['test_id'], stats.scanned, stats.updated, stats.elapsed, stats.rate)
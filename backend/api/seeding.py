@@ -0,0 +1,232 @@
+"""Deterministic synthetic data for scale and load testing.
+
+Everything is built with ``bulk_create`` and driven by ``random.Random``
+instances derived from a seed, so the same seed produces the same content.
+Result rows are generated in fixed-size chunks, each with its own derived
+random stream, which keeps the output identical however many worker
+processes share the chunks. ``check_database`` refuses to let the commands
+built on it touch the production database.
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from decouple import config
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from tests.models import (
+    ReadingTest, Question, TestResult, ListeningTest, ListeningSection, ListeningQuestion,
+    ListeningUserResult, WritingTest, WritingTestSubmission,
+)
+from .grading import build_outcomes
+
+User = get_user_model()
+
+SEED_PASSWORD = 'seed-password'
+
+
+def check_database():
+    """Raise ``CommandError`` unless ``DATABASE_URL`` names a database other than production"""
+    if not config('DATABASE_URL', default=''):
+        raise CommandError('Set DATABASE_URL to a local database; the default database is production')
+    if settings.DATABASES['default'].get('HOST') == settings.PRODUCTION_DB_HOST:
+        raise CommandError(f'DATABASE_URL points at the production host {settings.PRODUCTION_DB_HOST}')
+
+WORDS = (
+    'research population climate energy urban growth technology education health policy society '
+    'economy transport water species environment data survey percentage increase decrease trend '
+    'significant period compared whereas however therefore furthermore although consequently'
+).split()
+
+DISTRACTORS = ['true', 'false', 'not given', 'a', 'b', 'c', 'd', '1998', '2020', 'river', 'library', '']
+
+
+def derived_random(seed, *parts):
+    """Independent, reproducible random stream for one part of the data set"""
+    return random.Random(':'.join(str(part) for part in (seed,) + parts))
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def paragraph(rng, sentences, words=14):
+    return ' '.join(sentence(rng, words) for _ in range(sentences))
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep explicitly set auto_now_add values (e.g. historical submitted_at)"""
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+def create_users(count, seed, prefix='seed', batch_size=5000):
+    """Create users sharing one pre-hashed password; returns their ids"""
+    password = make_password(SEED_PASSWORD)
+    users = User.objects.bulk_create([
+        User(email=f'{prefix}-{seed}-{i}@example.com', username=f'{prefix}-{seed}-{i}', password=password,
+             country=derived_random(seed, 'user', i).choice(['UK', 'India', 'Pakistan', 'China', 'Brazil']))
+        for i in range(count)
+    ], batch_size=batch_size)
+    return [user.id for user in users]
+
+
+def create_reading_catalog(count, seed, questions_per_test=40, batch_size=5000):
+    """Create reading tests with questions; returns ``{test_id: [(question_id, answer, points)]}``"""
+    rng = derived_random(seed, 'reading')
+    tests = ReadingTest.objects.bulk_create([
+        ReadingTest(title=sentence(rng, 5), passage=paragraph(rng, 50),
+                    difficulty_level=rng.choice(['easy', 'medium', 'hard']))
+        for _ in range(count)
+    ], batch_size=batch_size)
+    question_types = [choice for choice, _ in Question.QUESTION_TYPES]
+    questions = Question.objects.bulk_create([
+        Question(test=test, question_text=sentence(rng, 12), question_type=question_types[(order - 1) // 10 % 4],
+                 correct_answer=rng.choice(WORDS), order=order)
+        for test in tests for order in range(1, questions_per_test + 1)
+    ], batch_size=batch_size)
+    ReadingTest.refresh_counts([test.id for test in tests])
+
+    catalog = {test.id: [] for test in tests}
+    for question in questions:
+        catalog[question.test_id].append((question.id, question.correct_answer, question.points))
+    return catalog
+
+
+def create_listening_catalog(count, seed, questions_per_section=10, batch_size=5000):
+    """Create listening tests with four sections; returns ``{test_id: [(question_id, answer, points)]}``"""
+    rng = derived_random(seed, 'listening')
+    tests = ListeningTest.objects.bulk_create([
+        ListeningTest(title=sentence(rng, 5), difficulty_level=rng.choice(['easy', 'medium', 'hard']))
+        for _ in range(count)
+    ], batch_size=batch_size)
+    sections = ListeningSection.objects.bulk_create([
+        ListeningSection(test=test, section_number=number, title=sentence(rng, 4),
+                         transcript=paragraph(rng, 30), instructions=sentence(rng, 10))
+        for test in tests for number in range(1, 5)
+    ], batch_size=batch_size)
+    questions = ListeningQuestion.objects.bulk_create([
+        ListeningQuestion(section=section, question_text=sentence(rng, 10), question_type='text',
+                          correct_answer=rng.choice(WORDS), order=order)
+        for section in sections for order in range(1, questions_per_section + 1)
+    ], batch_size=batch_size)
+    ListeningTest.refresh_counts([test.id for test in tests])
+
+    section_tests = {section.id: section.test_id for section in sections}
+    catalog = {test.id: [] for test in tests}
+    for question in questions:
+        catalog[section_tests[question.section_id]].append((question.id, question.correct_answer, question.points))
+    return catalog
+
+
+def create_writing_catalog(count, seed, batch_size=5000):
+    """Create writing tests; returns their ids"""
+    rng = derived_random(seed, 'writing')
+    tests = WritingTest.objects.bulk_create([
+        WritingTest(title=sentence(rng, 5), difficulty_level=rng.choice(['easy', 'medium', 'hard']),
+                    task1_image_description=paragraph(rng, 4),
+                    task1_type=rng.choice(['graph', 'chart', 'table', 'diagram', 'map']),
+                    task2_essay_prompt=paragraph(rng, 2),
+                    task2_type=rng.choice(['opinion', 'problem_solution', 'discussion', 'advantage_disadvantage']))
+        for _ in range(count)
+    ], batch_size=batch_size)
+    return [test.id for test in tests]
+
+
+def _graded_answers(rng, key):
+    """A plausible answers dict for one attempt, with its grading outcome"""
+    ability = rng.betavariate(5, 3)
+    answers, flags = {}, []
+    for question_id, correct_answer, _ in key:
+        roll = rng.random()
+        if roll < ability:
+            answers[str(question_id)] = correct_answer.upper() if roll < 0.05 else correct_answer
+            flags.append(True)
+        else:
+            if roll < 0.97:
+                answers[str(question_id)] = rng.choice(DISTRACTORS)
+            flags.append(False)
+    return answers, flags
+
+
+def _completed_at(rng, now):
+    return now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+
+
+def build_results(kind, rng, user_ids, catalog, count, now=None):
+    """Unsaved TestResult / ListeningUserResult rows with answers consistent with their scores"""
+    model = TestResult if kind == 'reading' else ListeningUserResult
+    now = now or timezone.now()
+    test_ids = list(catalog)
+    rows = []
+    for _ in range(count):
+        test_id = rng.choice(test_ids)
+        key = catalog[test_id]
+        answers, flags = _graded_answers(rng, key)
+        correct = sum(flags)
+        completed_at = _completed_at(rng, now)
+        time_taken = timedelta(minutes=rng.randint(15, 60))
+        row = model(
+            user_id=rng.choice(user_ids), test_id=test_id,
+            score=round((correct / len(key)) * 9.0, 2) if key else 0,
+            total_questions=len(key), correct_answers=correct, answers=answers,
+            question_outcomes=build_outcomes([entry[0] for entry in key], flags, [entry[2] for entry in key]),
+            started_at=completed_at - time_taken, completed_at=completed_at, time_taken=time_taken,
+        )
+        if kind == 'listening':
+            row.mode = rng.choice(['exam', 'practice'])
+        rows.append(row)
+    return rows
+
+
+def build_submissions(rng, user_ids, test_ids, count, now=None):
+    """Unsaved, already evaluated WritingTestSubmission rows"""
+    now = now or timezone.now()
+    rows = []
+    for _ in range(count):
+        submitted_at = _completed_at(rng, now)
+        task1, task2 = rng.choice([5, 5.5, 6, 6.5, 7, 7.5, 8]), rng.choice([5, 5.5, 6, 6.5, 7, 7.5, 8])
+        rows.append(WritingTestSubmission(
+            user_id=rng.choice(user_ids), test_id=rng.choice(test_ids),
+            task1_answer=paragraph(rng, 10), task2_answer=paragraph(rng, 18),
+            task1_score=task1, task2_score=task2, overall_band_score=round((task1 + task2 * 2) / 3 * 2) / 2,
+            task1_feedback=sentence(rng, 20), task2_feedback=sentence(rng, 20),
+            task1_criteria={'task_achievement': task1}, task2_criteria={'task_response': task2},
+            evaluation_status=WritingTestSubmission.COMPLETED,
+            submitted_at=submitted_at, evaluated_at=submitted_at + timedelta(seconds=rng.randint(5, 40)),
+            task1_time_taken=timedelta(minutes=rng.randint(10, 20)),
+            task2_time_taken=timedelta(minutes=rng.randint(25, 40)),
+        ))
+    return rows
+
+
+def save_rows(rows, batch_size=5000):
+    """bulk_create result rows, keeping their historical timestamps"""
+    if not rows:
+        return 0
+    model = type(rows[0])
+    timestamp_fields = [model._meta.get_field('submitted_at' if model is WritingTestSubmission else 'started_at')]
+    with explicit_timestamps(*timestamp_fields):
+        model.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def seed_result_chunk(kind, chunk_index, count, seed, user_ids, catalog, batch_size=5000):
+    """Generate and save one chunk of results; the chunk's content depends only on (seed, kind, chunk_index)"""
+    rng = derived_random(seed, kind, chunk_index)
+    if kind == 'writing':
+        rows = build_submissions(rng, user_ids, catalog, count)
+    else:
+        rows = build_results(kind, rng, user_ids, catalog, count)
+    return save_rows(rows, batch_size=batch_size)
@@ -1,6 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
 from tests.models import ReadingTest, Question, TestResult, ListeningTest, ListeningSection, ListeningQuestion, ListeningUserResult, WritingTest, WritingTestSubmission
 from users.serializers import UserProfileSerializer
+from .grading import normalize_answer, outcomes_by_question
+from .models import GenerationJob
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -19,14 +22,9 @@ class ReadingTestSerializer(serializers.ModelSerializer):
 
 
 class ReadingTestListSerializer(serializers.ModelSerializer):
-    question_count = serializers.SerializerMethodField()
-
     class Meta:
         model = ReadingTest
-        fields = ['id', 'title', 'difficulty_level', 'is_active', 'created_at', 'question_count']
-
-    def get_question_count(self, obj):
-        return obj.questions.count()
+        fields = ['id', 'title', 'difficulty_level', 'is_active', 'created_at', 'question_count', 'total_points']
 
 
 class TestSubmissionSerializer(serializers.Serializer):
@@ -53,11 +51,16 @@ class TestResultDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'test', 'user', 'score', 'total_questions', 'correct_answers', 'answers', 'answers_detail', 'started_at', 'completed_at', 'time_taken']
 
     def get_answers_detail(self, obj):
-        """Return detailed answer comparison"""
+        """Return detailed answer comparison, using the outcome stored at grading time"""
         details = []
+        outcomes = outcomes_by_question(obj.question_outcomes) or {}
         for question in obj.test.questions.all():
             user_answer = obj.answers.get(str(question.id), '')
-            is_correct = str(user_answer).strip().lower() == str(question.correct_answer).strip().lower()
+            if question.id in outcomes:
+                is_correct, awarded_points = outcomes[question.id]
+            else:
+                is_correct = normalize_answer(user_answer) == normalize_answer(question.correct_answer)
+                awarded_points = question.points if is_correct else 0
             
             details.append({
                 'question_id': question.id,
@@ -66,7 +69,8 @@ class TestResultDetailSerializer(serializers.ModelSerializer):
                 'user_answer': user_answer,
                 'correct_answer': question.correct_answer,
                 'is_correct': is_correct,
-                'points': question.points
+                'points': question.points,
+                'awarded_points': awarded_points
             })
         return details
 
@@ -96,18 +100,11 @@ class ListeningTestSerializer(serializers.ModelSerializer):
 
 
 class ListeningTestListSerializer(serializers.ModelSerializer):
-    section_count = serializers.SerializerMethodField()
-    total_questions = serializers.SerializerMethodField()
+    total_questions = serializers.IntegerField(source='question_count', read_only=True)
 
     class Meta:
         model = ListeningTest
-        fields = ['id', 'title', 'difficulty_level', 'is_active', 'created_at', 'total_duration', 'section_count', 'total_questions']
-
-    def get_section_count(self, obj):
-        return obj.sections.count()
-
-    def get_total_questions(self, obj):
-        return sum(section.questions.count() for section in obj.sections.all())
+        fields = ['id', 'title', 'difficulty_level', 'is_active', 'created_at', 'total_duration', 'section_count', 'total_questions', 'total_points']
 
 
 class ListeningTestSubmissionSerializer(serializers.Serializer):
@@ -157,7 +154,7 @@ class ListeningTestResultSerializer(serializers.ModelSerializer):
         if hasattr(obj, 'total_questions') and obj.total_questions is not None:
             return int(obj.total_questions)
         if hasattr(obj, 'test') and obj.test:
-            return sum(section.questions.count() for section in obj.test.sections.all())
+            return obj.test.question_count
         return 0
 
     def get_correct_answers(self, obj):
@@ -191,7 +188,7 @@ class ListeningTestResultDetailSerializer(serializers.ModelSerializer):
         if hasattr(obj, 'total_questions') and obj.total_questions is not None:
             return int(obj.total_questions)
         if hasattr(obj, 'test') and obj.test:
-            return sum(section.questions.count() for section in obj.test.sections.all())
+            return obj.test.question_count
         return 0
 
     def get_answers_detail(self, obj):
@@ -202,11 +199,17 @@ class ListeningTestResultDetailSerializer(serializers.ModelSerializer):
         if not hasattr(obj, 'test') or not obj.test:
             return details
             
+        outcomes = outcomes_by_question(obj.question_outcomes) or {}
         try:
             for section in getattr(obj.test, 'sections', []).all():
                 for question in getattr(section, 'questions', []).all():
-                    user_answer = str(obj.answers.get(str(question.id), '')).strip().lower()
-                    correct_answer = str(getattr(question, 'correct_answer', '')).strip().lower()
+                    user_answer = normalize_answer(obj.answers.get(str(question.id), ''))
+                    correct_answer = normalize_answer(getattr(question, 'correct_answer', ''))
+                    if question.id in outcomes:
+                        is_correct, awarded_points = outcomes[question.id]
+                    else:
+                        is_correct = user_answer == correct_answer
+                        awarded_points = question.points if is_correct else 0
                     
                     details.append({
                         'section_number': getattr(section, 'section_number', 0),
@@ -215,8 +218,9 @@ class ListeningTestResultDetailSerializer(serializers.ModelSerializer):
                         'question_type': getattr(question, 'question_type', 'text'),
                         'user_answer': user_answer if user_answer else 'No answer',
                         'correct_answer': correct_answer if correct_answer else 'Not available',
-                        'is_correct': user_answer == correct_answer,
-                        'points': float(getattr(question, 'points', 0.0))
+                        'is_correct': is_correct,
+                        'points': float(getattr(question, 'points', 0.0)),
+                        'awarded_points': float(awarded_points)
                     })
         except Exception as e:
             print(f"Error generating answer details: {str(e)}")
@@ -226,6 +230,7 @@ class ListeningTestResultDetailSerializer(serializers.ModelSerializer):
 class GenerateListeningTestSerializer(serializers.Serializer):
     difficulty_level = serializers.ChoiceField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium')
     include_audio = serializers.BooleanField(default=True)
+    count = serializers.IntegerField(min_value=1, max_value=settings.GENERATION_MAX_BATCH, default=1)
 
 
 # Writing Module Serializers
@@ -260,7 +265,7 @@ class WritingTestResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = WritingTestSubmission
         fields = ['id', 'test', 'user', 'task1_score', 'task2_score', 'overall_band_score',
-                  'submitted_at', 'evaluated_at', 'task1_time_taken', 'task2_time_taken']
+                  'provisional_band_score', 'evaluation_status', 'submitted_at', 'evaluated_at', 'task1_time_taken', 'task2_time_taken']
 
 
 class WritingTestResultDetailSerializer(serializers.ModelSerializer):
@@ -272,9 +277,17 @@ class WritingTestResultDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'test', 'user', 'task1_answer', 'task2_answer',
                   'task1_score', 'task1_feedback', 'task2_score', 'task2_feedback',
                   'overall_band_score', 'task1_criteria', 'task2_criteria',
+                  'provisional_band_score', 'text_features', 'evaluation_status', 'evaluation_error',
                   'submitted_at', 'evaluated_at', 'task1_time_taken', 'task2_time_taken']
 
 
+class WritingTestResultStatusSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WritingTestSubmission
+        fields = ['id', 'evaluation_status', 'evaluation_error', 'overall_band_score', 'provisional_band_score',
+                  'evaluated_at']
+
+
 class GenerateWritingTestSerializer(serializers.Serializer):
     difficulty_level = serializers.ChoiceField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium')
     task1_type = serializers.ChoiceField(choices=[
@@ -291,4 +304,20 @@ class GenerateWritingTestSerializer(serializers.Serializer):
         ('discussion', 'Discussion'),
         ('advantage_disadvantage', 'Advantage-Disadvantage'),
         ('random', 'Random')
-    ], default='random') 
\ No newline at end of file
+    ], default='random')
+    count = serializers.IntegerField(min_value=1, max_value=settings.GENERATION_MAX_BATCH, default=1)
+
+
+class GenerateReadingTestSerializer(serializers.Serializer):
+    difficulty_level = serializers.ChoiceField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium')
+    count = serializers.IntegerField(min_value=1, max_value=settings.GENERATION_MAX_BATCH, default=1)
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+    done = serializers.BooleanField(source='is_done', read_only=True)
+
+    class Meta:
+        model = GenerationJob
+        fields = ['id', 'kind', 'params', 'batch', 'status', 'stages', 'progress', 'done', 'test_id', 'error',
+                  'created_by', 'created_at', 'started_at', 'finished_at', 'updated_at'] 
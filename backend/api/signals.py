@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tests.models import ReadingTest, Question, ListeningTest, ListeningSection, ListeningQuestion
+from tests.signals import deleted_with_parent, listening_test_ids, parent_ids
+from .grading import READING, LISTENING, invalidate_answer_key
+from .tts import queue_audio_cleanup
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_reading_key_for_question(sender, instance, origin=None, created=False, **kwargs):
+    if deleted_with_parent(origin, (ReadingTest,)):
+        return
+    # A question moved to another test changes both tests' keys
+    for test_id in parent_ids(instance, 'test_id', kwargs['signal'], created):
+        invalidate_answer_key(READING, test_id)
+
+
+@receiver(post_delete, sender=ReadingTest)
+def invalidate_reading_key_for_test(sender, instance, **kwargs):
+    invalidate_answer_key(READING, instance.id)
+
+
+@receiver([post_save, post_delete], sender=ListeningQuestion)
+def invalidate_listening_key_for_question(sender, instance, origin=None, created=False, **kwargs):
+    if deleted_with_parent(origin, (ListeningTest, ListeningSection)):
+        return
+    section_ids = parent_ids(instance, 'section_id', kwargs['signal'], created)
+    for test_id in set(listening_test_ids(instance, section_ids)):
+        invalidate_answer_key(LISTENING, test_id)
+
+
+@receiver([post_save, post_delete], sender=ListeningSection)
+def invalidate_listening_key_for_section(sender, instance, origin=None, created=False, **kwargs):
+    if deleted_with_parent(origin, (ListeningTest,)):
+        return
+    for test_id in parent_ids(instance, 'test_id', kwargs['signal'], created):
+        invalidate_answer_key(LISTENING, test_id)
+
+
+@receiver(post_delete, sender=ListeningTest)
+def invalidate_listening_key_for_test(sender, instance, **kwargs):
+    invalidate_answer_key(LISTENING, instance.id)
+
+
+@receiver(post_delete, sender=ListeningSection)
+def release_section_audio(sender, instance, **kwargs):
+    if instance.audio_file:
+        queue_audio_cleanup([instance.audio_file.name])
@@ -0,0 +1,153 @@
+"""Local text analytics for writing answers, and the provisional band built on them.
+
+``analyze_submission`` measures both answers in-process (a few milliseconds
+for full-length essays, no model call): word count against the task minimum,
+paragraphs, sentence length and its spread, vocabulary range (moving-average
+type-token ratio, so long and short answers compare fairly), long words,
+cohesive devices and subordinate clauses. Each feature maps onto an estimate
+of one of the four criteria, and the criteria average to a provisional band
+the student sees while the examiner's evaluation is pending. The examiner's
+scores replace it once they arrive; the features also go into the examiner
+prompt (see api.evaluation) so the model does not have to count.
+"""
+import math
+import re
+import statistics
+import time
+from decimal import Decimal
+
+MINIMUM_WORDS = {'task1': 150, 'task2': 250}
+MINIMUM_PARAGRAPHS = {'task1': 3, 'task2': 4}
+TTR_WINDOW = 50
+LONG_WORD_LENGTH = 7
+
+COHESIVE_DEVICES = [
+    'however', 'moreover', 'furthermore', 'in addition', 'additionally', 'therefore', 'thus', 'hence',
+    'consequently', 'as a result', 'nevertheless', 'nonetheless', 'on the other hand', 'in contrast',
+    'by contrast', 'whereas', 'while', 'although', 'even though', 'despite', 'in spite of', 'firstly',
+    'secondly', 'thirdly', 'finally', 'lastly', 'for example', 'for instance', 'such as', 'in particular',
+    'in conclusion', 'to conclude', 'to sum up', 'overall', 'in summary', 'similarly', 'likewise',
+    'meanwhile', 'subsequently', 'afterwards', 'in other words', 'that is', 'namely', 'because', 'since',
+]
+SUBORDINATORS = [
+    'which', 'who', 'whom', 'whose', 'that', 'because', 'although', 'though', 'unless', 'whereas', 'while',
+    'if', 'when', 'whenever', 'where', 'since', 'until', 'so that', 'in order to',
+]
+
+WORD_RE = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*")
+SENTENCE_RE = re.compile(r'[^.!?]+[.!?]*')
+PARAGRAPH_RE = re.compile(r'\n\s*\n|\n(?=\s*[A-Z])')
+COHESIVE_RE = re.compile(r'\b(?:%s)\b' % '|'.join(sorted(map(re.escape, COHESIVE_DEVICES), key=len, reverse=True)))
+SUBORDINATOR_RE = re.compile(r'\b(?:%s)\b' % '|'.join(sorted(map(re.escape, SUBORDINATORS), key=len, reverse=True)))
+
+
+def _scale(value, low, high):
+    """``value`` mapped linearly from ``[low, high]`` onto bands 4-8, clamped to 3-9"""
+    return max(3.0, min(9.0, 4 + 4 * (value - low) / (high - low)))
+
+
+def half_band(value):
+    """Round to the nearest half band, halves up, as IELTS does"""
+    return math.floor(value * 2 + 0.5) / 2
+
+
+def _moving_ttr(words):
+    """Mean type-token ratio over every ``TTR_WINDOW``-word window"""
+    if len(words) <= TTR_WINDOW:
+        return len(set(words)) / len(words)
+    counts = {}
+    for word in words[:TTR_WINDOW]:
+        counts[word] = counts.get(word, 0) + 1
+    total = len(counts)
+    for i in range(TTR_WINDOW, len(words)):
+        leaving = words[i - TTR_WINDOW]
+        counts[leaving] -= 1
+        if not counts[leaving]:
+            del counts[leaving]
+        counts[words[i]] = counts.get(words[i], 0) + 1
+        total += len(counts)
+    return total / (len(words) - TTR_WINDOW + 1) / TTR_WINDOW
+
+
+def analyze_answer(text, task):
+    """Features of one answer, with criterion estimates and a provisional band for the task"""
+    words = [word.lower() for word in WORD_RE.findall(text)]
+    minimum = MINIMUM_WORDS[task]
+    features = {'word_count': len(words), 'minimum_words': minimum, 'below_minimum': len(words) < minimum}
+    if not words:
+        features.update(provisional_band=0.0, criteria={})
+        return features
+
+    sentences = [len(WORD_RE.findall(sentence)) for sentence in SENTENCE_RE.findall(text)]
+    sentences = [length for length in sentences if length] or [len(words)]
+    paragraphs = len([paragraph for paragraph in PARAGRAPH_RE.split(text.strip()) if WORD_RE.search(paragraph)])
+    lowered = text.lower()
+    per_100 = 100 / len(words)
+    features.update(
+        paragraph_count=paragraphs,
+        sentence_count=len(sentences),
+        mean_sentence_length=round(statistics.fmean(sentences), 1),
+        sentence_length_stdev=round(statistics.pstdev(sentences), 1),
+        type_token_ratio=round(len(set(words)) / len(words), 3),
+        moving_type_token_ratio=round(_moving_ttr(words), 3),
+        long_word_ratio=round(sum(len(word) >= LONG_WORD_LENGTH for word in words) / len(words), 3),
+        cohesive_devices_per_100=round(len(COHESIVE_RE.findall(lowered)) * per_100, 1),
+        subordinators_per_100=round(len(SUBORDINATOR_RE.findall(lowered)) * per_100, 1),
+    )
+
+    # Cohesive devices help up to about five per hundred words, then read as mechanical
+    cohesion = features['cohesive_devices_per_100']
+    cohesion_band = _scale(cohesion, 1, 4) if cohesion <= 5 else max(5.0, 8 - (cohesion - 5))
+    paragraph_band = 7.0 if paragraphs >= MINIMUM_PARAGRAPHS[task] else 5.0 if paragraphs > 1 else 4.0
+    # Very short sentences read as simple, very long ones as run-on
+    length = features['mean_sentence_length']
+    length_band = _scale(length, 8, 18) if length <= 22 else max(5.0, 8 - (length - 22) / 4)
+    criteria = {
+        'task_achievement' if task == 'task1' else 'task_response':
+            min(paragraph_band + 1, _scale(min(len(words) / minimum, 1.2), 0.5, 1.0)),
+        'coherence_cohesion': (cohesion_band + paragraph_band) / 2,
+        'lexical_resource': (_scale(features['moving_type_token_ratio'], 0.72, 0.88)
+                             + _scale(features['long_word_ratio'], 0.14, 0.28)) / 2,
+        'grammatical_range': (length_band + _scale(features['sentence_length_stdev'], 2, 8)
+                              + _scale(features['subordinators_per_100'], 1.5, 4.5)) / 3,
+    }
+    band = statistics.fmean(criteria.values())
+    if len(words) < minimum / 2:
+        band = min(band, 4.0)
+    elif len(words) < minimum:
+        band -= 0.5
+    features['criteria'] = {name: half_band(value) for name, value in criteria.items()}
+    features['provisional_band'] = half_band(max(1.0, band))
+    return features
+
+
+def analyze_submission(task1_answer, task2_answer):
+    """``(provisional overall band, features)`` for a submission's answers
+
+    Task 2 counts twice as much as Task 1 in the overall band.
+    """
+    start = time.perf_counter()
+    features = {'task1': analyze_answer(task1_answer, 'task1'), 'task2': analyze_answer(task2_answer, 'task2')}
+    band = half_band((features['task1']['provisional_band'] + 2 * features['task2']['provisional_band']) / 3)
+    features['analysis_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return Decimal(str(band)), features
+
+
+def features_summary(features):
+    """The measured figures as prompt lines; stable for identical answers, so cached evaluations still match"""
+    lines = []
+    for task in ('task1', 'task2'):
+        answer = features[task]
+        if not answer['word_count']:
+            lines.append(f'Task {task[-1]}: no answer')
+            continue
+        lines.append(
+            f"Task {task[-1]}: {answer['word_count']} words (minimum {answer['minimum_words']}), "
+            f"{answer['paragraph_count']} paragraphs, {answer['sentence_count']} sentences "
+            f"(mean {answer['mean_sentence_length']} words, s.d. {answer['sentence_length_stdev']}), "
+            f"moving type-token ratio {answer['moving_type_token_ratio']}, "
+            f"long-word ratio {answer['long_word_ratio']}, "
+            f"{answer['cohesive_devices_per_100']} cohesive devices and "
+            f"{answer['subordinators_per_100']} subordinators per 100 words"
+        )
+    return '\n    '.join(lines)
@@ -0,0 +1,276 @@
+"""Text-to-speech for listening test sections.
+
+Sections are voiced concurrently on a bounded thread pool
+(``TTS_CONCURRENCY``). Long transcripts are split at speaker turns, or at
+sentence ends within a long turn, into pieces of at most ``TTS_CHUNK_CHARS``.
+The pieces are voiced in parallel too and their MP3 frames concatenated in
+order. A failed piece fails only its own section: the others keep their audio
+and the error is reported per section.
+
+Audio is never held in memory whole. Each piece is streamed from the API
+(``iter_bytes``) into a temporary file, and a finished section is then copied
+chunk by chunk to the storage backend, so only its final path needs to be set
+on ``ListeningSection.audio_file``. Nothing is stored for a section that
+failed, and the caller can write the database rows in a short transaction
+afterwards.
+
+Voiced sections are stored once per hash of model, voice and transcript
+(``AudioBlob``): a transcript that was voiced before reuses the stored file
+without a TTS call, and sections with the same transcript share one file.
+Blobs no section refers to any more are deleted by the ``audio_cleanup``
+job, after a grace period that covers a generation still writing its rows.
+
+``TTS_BACKEND = 'stub'`` swaps the OpenAI voice for a local backend that
+waits like the real API and returns silent MP3 frames, so the pipeline can be
+run and benchmarked offline (``manage.py benchmark_tts``).
+"""
+import hashlib
+import io
+import json
+import logging
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from tests.models import ListeningSection
+from . import governor
+from .http_clients import openai_client
+from .jobs import enqueue
+from .models import AudioBlob
+
+logger = logging.getLogger(__name__)
+
+TTS_MODEL = "tts-1"
+TTS_VOICE = "alloy"  # Options: alloy, echo, fable, onyx, nova, shimmer
+MAX_INPUT_CHARS = 4096  # OpenAI's limit per speech request
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Makes openai-python hand back the speech response unread, so it can be streamed
+STREAMED_RESPONSE_HEADER = 'X-Stainless-Streamed-Raw-Response'
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz), about 26 ms long
+SILENT_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+
+class OpenAITTSBackend:
+    model = TTS_MODEL
+
+    def stream(self, text):
+        """Yield the MP3 for ``text`` in chunks as it arrives"""
+        response = governor.run(TTS_MODEL, lambda: openai_client().audio.speech.create(
+            model=TTS_MODEL, voice=TTS_VOICE, input=text,
+            extra_headers={STREAMED_RESPONSE_HEADER: 'true'},
+        ))
+        try:
+            yield from response.iter_bytes(STREAM_CHUNK_BYTES)
+        finally:
+            response.close()
+
+
+class StubTTSBackend:
+    """Answers like the TTS API, with the latency of ``TTS_STUB_LATENCY`` plus ``TTS_STUB_SECONDS_PER_KCHAR``"""
+    model = 'stub'
+
+    def stream(self, text):
+        time.sleep(settings.TTS_STUB_LATENCY + settings.TTS_STUB_SECONDS_PER_KCHAR * len(text) / 1000)
+        # Roughly 15 characters of speech per second
+        frames = max(1, round(len(text) / 15 / 0.026))
+        frames_per_chunk = STREAM_CHUNK_BYTES // len(SILENT_FRAME)
+        for start in range(0, frames, frames_per_chunk):
+            yield SILENT_FRAME * min(frames_per_chunk, frames - start)
+
+
+class _ConcatenatedReader(io.RawIOBase):
+    """Reads a section's piece files one after another, as a single stream"""
+
+    def __init__(self, files):
+        self.files = list(files)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.files:
+            count = self.files[0].readinto(buffer)
+            if count:
+                return count
+            self.files.pop(0)
+        return 0
+
+
+def get_backend():
+    if settings.TTS_BACKEND == 'stub':
+        return StubTTSBackend()
+    return OpenAITTSBackend()
+
+
+def _split_long(piece, limit):
+    """Split one turn at sentence ends, and hard-wrap any sentence still over the limit"""
+    parts, current = [], ''
+    for sentence in SENTENCE_END.split(piece):
+        while len(sentence) > limit:
+            parts.append(sentence[:limit])
+            sentence = sentence[limit:]
+        if current and len(current) + 1 + len(sentence) > limit:
+            parts.append(current)
+            current = sentence
+        else:
+            current = f'{current} {sentence}' if current else sentence
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_transcript(transcript, limit=None):
+    """Cut a transcript into pieces of at most ``limit`` characters, preferring speaker turns"""
+    limit = min(limit or settings.TTS_CHUNK_CHARS, MAX_INPUT_CHARS)
+    transcript = transcript.strip()
+    if len(transcript) <= limit:
+        return [transcript] if transcript else []
+
+    turns = [line.strip() for line in transcript.splitlines() if line.strip()]
+    pieces = []
+    for turn in turns:
+        pieces += _split_long(turn, limit) if len(turn) > limit else [turn]
+
+    # Pack whole turns back together up to the limit
+    chunks, current = [], ''
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > limit:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f'{current}\n{piece}' if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _voice_piece(backend, text):
+    """Stream one piece of speech into a temporary file"""
+    piece = tempfile.TemporaryFile()
+    try:
+        for chunk in backend.stream(text):
+            piece.write(chunk)
+        piece.seek(0)
+    except BaseException:
+        piece.close()
+        raise
+    return piece
+
+
+def audio_key(model, voice, transcript):
+    """Content address of a voiced transcript"""
+    canonical = json.dumps({'model': model, 'voice': voice, 'transcript': transcript},
+                           sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _blob_storage():
+    return AudioBlob._meta.get_field('file').storage
+
+
+def _store_blob(key, files):
+    """Copy a section's piece files to storage as the blob for ``key``; returns the stored name"""
+    storage = _blob_storage()
+    name = AudioBlob._meta.get_field('file').generate_filename(None, f'{key}.mp3')
+    reader = io.BufferedReader(_ConcatenatedReader(files), STREAM_CHUNK_BYTES)
+    name = storage.save(name, File(reader, name=name))
+
+    blob, created = AudioBlob.objects.get_or_create(key=key, defaults={'file': name, 'size_bytes': storage.size(name)})
+    if not created:
+        if storage.exists(blob.file.name):
+            # Another section or generation stored the same audio first
+            storage.delete(name)
+            return blob.file.name
+        AudioBlob.objects.filter(key=key).update(file=name, size_bytes=storage.size(name), last_used_at=timezone.now())
+    return name
+
+
+def voice_sections(sections, backend=None, max_workers=None, on_section=None):
+    """Voice every section's ``audio_transcript`` concurrently and store the audio
+
+    Returns ``(paths, errors, reused)``: stored file names and error messages,
+    each keyed by section number, and the numbers of the sections whose audio
+    came from the store. Sections without a transcript appear in none.
+    ``on_section(number, error=None, reused=False)`` is called in this thread
+    as each section's audio is ready or has failed.
+    """
+    backend = backend or get_backend()
+    keys = {
+        section['section_number']: audio_key(backend.model, TTS_VOICE, (section.get('audio_transcript') or '').strip())
+        for section in sections if (section.get('audio_transcript') or '').strip()
+    }
+
+    paths, errors = {}, {}
+    storage = _blob_storage()
+    for blob in AudioBlob.objects.filter(key__in=set(keys.values())):
+        if storage.exists(blob.file.name):
+            paths.update((number, blob.file.name) for number, key in keys.items() if key == blob.key)
+    reused = set(paths)
+    if reused:
+        # Keeps the blobs clear of the orphan sweep until the sections point at them
+        AudioBlob.objects.filter(key__in={keys[number] for number in reused}).update(last_used_at=timezone.now())
+        if on_section:
+            for number in sorted(reused):
+                on_section(number, reused=True)
+
+    pieces = {
+        section['section_number']: split_transcript(section['audio_transcript'])
+        for section in sections if section['section_number'] in keys and section['section_number'] not in reused
+    }
+
+    with ThreadPoolExecutor(max_workers=max_workers or settings.TTS_CONCURRENCY,
+                            thread_name_prefix='tts') as executor:
+        futures = {
+            number: [executor.submit(_voice_piece, backend, chunk) for chunk in chunks]
+            for number, chunks in pieces.items()
+        }
+        # Sections are stored in order while later ones are still being voiced
+        for number, section_futures in futures.items():
+            files = []
+            try:
+                for future in section_futures:
+                    files.append(future.result())
+                paths[number] = _store_blob(keys[number], files)
+            except Exception as e:
+                for future in section_futures:
+                    if not future.cancel() and future.exception() is None:
+                        files.append(future.result())
+                errors[number] = f'{type(e).__name__}: {e}'
+            finally:
+                for piece in set(files):
+                    piece.close()
+            if on_section:
+                on_section(number, error=errors.get(number))
+
+    # Blobs left unreferenced, e.g. when the caller's transaction fails, are swept
+    if paths:
+        queue_audio_cleanup(paths.values())
+    return paths, errors, reused
+
+
+def queue_audio_cleanup(paths):
+    """Check the blobs stored at ``paths`` for references once the grace period is over"""
+    return enqueue('audio_cleanup', {'paths': sorted(set(paths))},
+                   delay=timedelta(seconds=settings.AUDIO_ORPHAN_GRACE))
+
+
+def cleanup_audio_blobs(payload):
+    """Job handler: delete the given blobs that no listening section refers to"""
+    cutoff = timezone.now() - timedelta(seconds=settings.AUDIO_ORPHAN_GRACE)
+    storage = _blob_storage()
+    for blob in AudioBlob.objects.filter(file__in=payload['paths'], last_used_at__lt=cutoff):
+        if ListeningSection.objects.filter(audio_file=blob.file.name).exists():
+            continue
+        storage.delete(blob.file.name)
+        blob.delete()
+        logger.info('Deleted unreferenced audio %s', blob.file.name)
@@ -2,11 +2,12 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     RegisterView, UserProfileView, ReadingTestListView, ReadingTestDetailView,
-    TestSubmissionView, TestResultListView, TestResultDetailView, GenerateTestView, user_stats,
+    TestSubmissionView, TestResultListView, TestResultDetailView, GenerateTestView, user_stats, llm_cache_stats, http_pool_stats, import_tests, generation_pool,
     ListeningTestListView, ListeningTestDetailView, ListeningTestSubmissionView,
     ListeningTestResultListView, ListeningTestResultDetailView, GenerateListeningTestView,
     WritingTestListView, WritingTestDetailView, WritingTestSubmissionView,
-    WritingTestResultListView, WritingTestResultDetailView, GenerateWritingTestView
+    WritingTestResultListView, WritingTestResultDetailView, WritingTestResultStatusView, GenerateWritingTestView,
+    GenerationJobListView, GenerationJobDetailView
 )
 
 urlpatterns = [
@@ -44,12 +45,19 @@ urlpatterns = [
     # Writing Results
     path('writing-results/', WritingTestResultListView.as_view(), name='writing-result-list'),
     path('writing-results/<int:pk>/', WritingTestResultDetailView.as_view(), name='writing-result-detail'),
+    path('writing-results/<int:pk>/status/', WritingTestResultStatusView.as_view(), name='writing-result-status'),
     
     # Admin
     path('generate-test/', GenerateTestView.as_view(), name='generate-test'),
     path('generate-listening-test/', GenerateListeningTestView.as_view(), name='generate-listening-test'),
     path('writing-tests/generate/', GenerateWritingTestView.as_view(), name='generate-writing-test'),
+    path('tests/import/', import_tests, name='import-tests'),
+    path('generations/', GenerationJobListView.as_view(), name='generation-list'),
+    path('generations/<int:pk>/', GenerationJobDetailView.as_view(), name='generation-detail'),
+    path('generations/pool/', generation_pool, name='generation-pool'),
     
     # Statistics
     path('stats/', user_stats, name='user-stats'),
+    path('llm-cache/stats/', llm_cache_stats, name='llm-cache-stats'),
+    path('http-pools/stats/', http_pool_stats, name='http-pool-stats'),
 ] 
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""Writing test generation.
+
+Task 1 and Task 2 are independent LLM calls, so they run side by side on a
+small thread pool and generation takes about as long as the slower of the
+two. The Task 1 image is rendered afterwards by a background job (see
+``api.images``); the test starts out with a placeholder. Each stage's
+duration is returned alongside the content and stored on the ``WritingTest``
+(``generation_timings``).
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .images import PLACEHOLDER_IMAGE
+from .llm import complete_json, get_client
+
+GENERATION_MODEL = "gpt-3.5-turbo"
+GENERATION_PARAMS = {
+    'response_format': {"type": "json_object"},
+    'temperature': 0.7,
+}
+
+TASK1_TYPES = ['graph', 'chart', 'table', 'diagram', 'map']
+TASK2_TYPES = ['opinion', 'problem_solution', 'discussion', 'advantage_disadvantage']
+
+
+def _timed(timings, stage, func, *args):
+    start = time.monotonic()
+    try:
+        return func(*args)
+    finally:
+        timings[stage] = round((time.monotonic() - start) * 1000)
+
+
+def generate_task1(client, difficulty_level, task1_type):
+    """Ask the LLM for a Task 1 visual description"""
+    task1_prompt = f"""
+    Generate an IELTS Writing Task 1 {task1_type} for {difficulty_level} difficulty level.
+
+    Create a detailed description of a {task1_type} that would be suitable for IELTS Writing Task 1.
+    The description should include:
+    - Clear data points, trends, or processes
+    - Specific numbers, percentages, or categories
+    - Time periods or comparisons
+    - Sufficient detail for a 150-word response
+
+    Return in this JSON format:
+    {{
+        "type": "{task1_type}",
+        "image_description": "Detailed description of the {task1_type} with specific data points, trends, and comparisons that a student would need to describe in 150 words."
+    }}
+    """
+
+    return complete_json([
+        {"role": "system", "content": "You are an IELTS test content expert. Generate realistic writing task descriptions."},
+        {"role": "user", "content": task1_prompt}
+    ], GENERATION_MODEL, use_cache=False, client=client, **GENERATION_PARAMS)
+
+
+def generate_task2(client, difficulty_level, task2_type):
+    """Ask the LLM for a Task 2 essay prompt"""
+    task2_prompt = f"""
+    Generate an IELTS Writing Task 2 {task2_type} essay prompt for {difficulty_level} difficulty level.
+
+    Create an essay question that requires the student to:
+    - Write at least 250 words
+    - Address the specific task type: {task2_type}
+    - Present clear arguments and examples
+    - Use appropriate academic language
+
+    Return in this JSON format:
+    {{
+        "type": "{task2_type}",
+        "essay_prompt": "The complete essay question/prompt that students need to respond to."
+    }}
+    """
+
+    return complete_json([
+        {"role": "system", "content": "You are an IELTS test content expert. Generate realistic essay prompts."},
+        {"role": "user", "content": task2_prompt}
+    ], GENERATION_MODEL, use_cache=False, client=client, **GENERATION_PARAMS)
+
+
+def generate_writing_test(difficulty_level, task1_type, task2_type, client=None):
+    """Generate both tasks concurrently; the Task 1 image is left as a placeholder
+
+    Returns the test content and the per-stage timings in milliseconds.
+    """
+    client = client or get_client()
+
+    # Randomize task types if 'random' is selected
+    if task1_type == 'random':
+        task1_type = random.choice(TASK1_TYPES)
+    if task2_type == 'random':
+        task2_type = random.choice(TASK2_TYPES)
+
+    timings = {}
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='writing-generation') as executor:
+        task2_future = executor.submit(_timed, timings, 'task2', generate_task2, client, difficulty_level, task2_type)
+        task1_data = _timed(timings, 'task1', generate_task1, client, difficulty_level, task1_type)
+        task2_data = task2_future.result()
+    timings['total'] = round((time.monotonic() - start) * 1000)
+
+    return {
+        'task1': {
+            'type': task1_data['type'],
+            'image': PLACEHOLDER_IMAGE,
+            'image_description': task1_data['image_description']
+        },
+        'task2': {
+            'type': task2_data['type'],
+            'essay_prompt': task2_data['essay_prompt']
+        },
+        'timings': timings,
+    }
@@ -63,6 +63,8 @@ TEMPLATES = [
 WSGI_APPLICATION = 'ielts_app.wsgi.application'
 
 # Database
+PRODUCTION_DB_HOST = 'aws-1-ap-south-1.pooler.supabase.com'
+
 DATABASES = {
     # 'default': {
     #     'ENGINE': 'django.db.backends.sqlite3',
@@ -75,12 +77,36 @@ DATABASES = {
         'ENGINE' : 'django.db.backends.postgresql',
         'NAME' : 'postgres',
         'USER' : 'postgres.bonlqzntwiqrdnpjxuxg',
-        'HOST' : 'aws-1-ap-south-1.pooler.supabase.com',
+        'HOST' : PRODUCTION_DB_HOST,
         'PORT' : '6543',
         'PASSWORD' : 'djangosupabase'
     }
 }
 
+# Point at another database (e.g. a local one for benchmarks) with DATABASE_URL
+if config('DATABASE_URL', default=''):
+    DATABASES['default'] = dj_database_url.parse(config('DATABASE_URL'))
+
+# Cache
+# The answer-key cache is shared between workers when REDIS_URL is set;
+# otherwise each process keeps its own local-memory cache.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ielts-app',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -166,4 +192,69 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # OpenAI API settings
-OPENAI_API_KEY = config('OPENAI_API_KEY', default='') 
\ No newline at end of file
+OPENAI_API_KEY = config('OPENAI_API_KEY', default='') 
+
+# Grading settings
+# 'answer_key' grades from cached answer keys; 'database' grades inside PostgreSQL
+GRADING_ENGINE = config('GRADING_ENGINE', default='answer_key')
+ANSWER_KEY_CACHE_TIMEOUT = config('ANSWER_KEY_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Background jobs (api.jobs, run by `manage.py run_jobs`)
+JOB_WORKER_CONCURRENCY = config('JOB_WORKER_CONCURRENCY', default=4, cast=int)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+JOB_RETRY_BACKOFF = config('JOB_RETRY_BACKOFF', default=30, cast=int)  # seconds, doubled per attempt
+JOB_LOCK_TIMEOUT = config('JOB_LOCK_TIMEOUT', default=900, cast=int)  # seconds before a running job is presumed lost
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=2, cast=float)
+JOB_MAX_DEFERRALS = config('JOB_MAX_DEFERRALS', default=20, cast=int)  # RetryLater requeues before it spends attempts
+
+# Test generation jobs (api.generation)
+GENERATION_MAX_ATTEMPTS = config('GENERATION_MAX_ATTEMPTS', default=2, cast=int)
+GENERATION_MAX_BATCH = config('GENERATION_MAX_BATCH', default=10, cast=int)  # tests per generate request
+
+# Pre-generated test pool (api.pool): kind:difficulty[:task1_type:task2_type]=depth, comma separated
+GENERATION_POOL_TARGETS = config('GENERATION_POOL_TARGETS', default='reading:medium=2,listening:medium=1,writing:medium=2')
+GENERATION_POOL_OFF_PEAK_HOURS = config('GENERATION_POOL_OFF_PEAK_HOURS', default='1-6')  # local hours, start-end
+GENERATION_POOL_CONCURRENCY = config('GENERATION_POOL_CONCURRENCY', default=2, cast=int)  # pooled generations in flight
+GENERATION_POOL_INTERVAL = config('GENERATION_POOL_INTERVAL', default=300, cast=int)  # seconds between refills
+
+# LLM response cache (api.llm)
+LLM_CACHE_TTL = config('LLM_CACHE_TTL', default=60 * 60 * 24 * 30, cast=int)  # seconds
+LLM_CACHE_MAX_BYTES = config('LLM_CACHE_MAX_BYTES', default=50 * 1024 * 1024, cast=int)
+
+# Near-duplicate writing answers reuse an earlier evaluation (api.duplicates):
+# minimum Jaccard similarity of the answers' word 3-shingles
+ESSAY_DUPLICATE_THRESHOLD = config('ESSAY_DUPLICATE_THRESHOLD', default=0.9, cast=float)
+
+# Outbound model call governor (api.governor), shared through the cache
+# model=requests/tokens per minute, '*' for other models, 0 for no limit
+LLM_RATE_LIMITS = config('LLM_RATE_LIMITS', default='*=3500/80000,tts-1=50/0')
+LLM_MAX_IN_FLIGHT = config('LLM_MAX_IN_FLIGHT', default=8, cast=int)
+LLM_ADMISSION_TIMEOUT = config('LLM_ADMISSION_TIMEOUT', default=60, cast=float)  # seconds, then the job is deferred
+LLM_MAX_RETRIES = config('LLM_MAX_RETRIES', default=3, cast=int)
+LLM_RETRY_BASE_DELAY = config('LLM_RETRY_BASE_DELAY', default=1, cast=float)  # seconds, doubled per attempt
+LLM_RETRY_MAX_DELAY = config('LLM_RETRY_MAX_DELAY', default=30, cast=float)
+LLM_BREAKER_FAILURES = config('LLM_BREAKER_FAILURES', default=5, cast=int)  # failures in a row that open a circuit
+LLM_BREAKER_COOLDOWN = config('LLM_BREAKER_COOLDOWN', default=30, cast=int)  # seconds a circuit stays open
+
+# Shared HTTP connection pools for the AI services (api.http_clients)
+HTTP_POOL_MAX_CONNECTIONS = config('HTTP_POOL_MAX_CONNECTIONS', default=20, cast=int)  # per service
+HTTP_POOL_MAX_KEEPALIVE = config('HTTP_POOL_MAX_KEEPALIVE', default=10, cast=int)
+HTTP_KEEPALIVE_EXPIRY = config('HTTP_KEEPALIVE_EXPIRY', default=30, cast=float)  # seconds an idle connection is kept
+HTTP_CONNECT_TIMEOUT = config('HTTP_CONNECT_TIMEOUT', default=5, cast=float)
+OPENAI_TIMEOUT = config('OPENAI_TIMEOUT', default=120, cast=float)  # seconds per completion request
+
+# Task 1 image service (api.images); run `manage.py fake_image_service` for offline use
+IMAGE_API_URL = config('IMAGE_API_URL', default='https://api.kie.ai/api/v1/gpt4o-image')
+IMAGE_API_KEY = config('IMAGE_API_KEY', default='')
+IMAGE_API_TIMEOUT = config('IMAGE_API_TIMEOUT', default=30, cast=int)  # seconds per request
+IMAGE_POLL_BASE_DELAY = config('IMAGE_POLL_BASE_DELAY', default=2, cast=float)  # seconds, doubled per poll
+IMAGE_POLL_MAX_DELAY = config('IMAGE_POLL_MAX_DELAY', default=60, cast=float)
+IMAGE_POLL_TIMEOUT = config('IMAGE_POLL_TIMEOUT', default=600, cast=int)  # seconds before the placeholder is kept
+
+# Listening test text-to-speech (api.tts)
+TTS_BACKEND = config('TTS_BACKEND', default='openai')  # 'openai' or 'stub' for offline runs
+TTS_CONCURRENCY = config('TTS_CONCURRENCY', default=4, cast=int)  # speech requests in flight per generation
+TTS_CHUNK_CHARS = config('TTS_CHUNK_CHARS', default=1500, cast=int)  # longer transcripts are voiced in parallel pieces
+AUDIO_ORPHAN_GRACE = config('AUDIO_ORPHAN_GRACE', default=60 * 60, cast=int)  # seconds before unreferenced audio is deleted
+TTS_STUB_LATENCY = config('TTS_STUB_LATENCY', default=1.0, cast=float)  # seconds per stub request
+TTS_STUB_SECONDS_PER_KCHAR = config('TTS_STUB_SECONDS_PER_KCHAR', default=1.0, cast=float)
@@ -1,5 +1,11 @@
 from django.contrib import admin
 from .models import ReadingTest, Question, TestResult, ListeningTest, ListeningSection, ListeningQuestion, ListeningUserResult
+from api.grading import READING, LISTENING
+from api.regrade import queue_regrades
+
+
+def _report_regrade(modeladmin, request, queued):
+    modeladmin.message_user(request, f"Queued regrading of {queued} tests; the job workers regrade their results.")
 
 
 @admin.register(ListeningTest)
@@ -8,6 +14,7 @@ class ListeningTestAdmin(admin.ModelAdmin):
     list_filter = ('difficulty_level', 'is_active', 'created_at')
     search_fields = ('title',)
     readonly_fields = ('created_at', 'updated_at')
+    actions = ['regrade_results']
 
     fieldsets = (
         (None, {
@@ -19,6 +26,10 @@ class ListeningTestAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.action(description='Regrade stored results for selected tests')
+    def regrade_results(self, request, queryset):
+        _report_regrade(self, request, queue_regrades(LISTENING, queryset.values_list('id', flat=True)))
+
 @admin.register(ListeningSection)
 class ListeningSectionAdmin(admin.ModelAdmin):
     list_display = ('test', 'section_number', 'audio_file', 'created_at')
@@ -50,6 +61,7 @@ class ReadingTestAdmin(admin.ModelAdmin):
     search_fields = ('title', 'passage')
     readonly_fields = ('created_at', 'updated_at')
     inlines = [QuestionInline]
+    actions = ['regrade_results']
     
     fieldsets = (
         (None, {
@@ -61,6 +73,10 @@ class ReadingTestAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.action(description='Regrade stored results for selected tests')
+    def regrade_results(self, request, queryset):
+        _report_regrade(self, request, queue_regrades(READING, queryset.values_list('id', flat=True)))
+
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
@@ -68,6 +84,12 @@ class QuestionAdmin(admin.ModelAdmin):
     list_filter = ('question_type', 'test', 'points')
     search_fields = ('question_text', 'test__title')
     ordering = ('test', 'order')
+    actions = ['regrade_results']
+
+    @admin.action(description="Regrade stored results for the selected questions' tests")
+    def regrade_results(self, request, queryset):
+        test_ids = queryset.order_by().values_list('test_id', flat=True).distinct()
+        _report_regrade(self, request, queue_regrades(READING, test_ids))
 
 
 @admin.register(TestResult)
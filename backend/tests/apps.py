@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class TestsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'tests' 
\ No newline at end of file
+    name = 'tests'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q, Sum
+
+from tests.models import ReadingTest, Question, ListeningTest, ListeningSection, ListeningQuestion, aggregate_subquery
+
+
+class Command(BaseCommand):
+    help = 'Repair drift in the denormalized question/section counters on tests'
+
+    def handle(self, *args, **options):
+        reading_drift = list(
+            ReadingTest.objects.annotate(
+                actual_questions=aggregate_subquery(Question.objects.all(), 'test', Count('id')),
+                actual_points=aggregate_subquery(Question.objects.all(), 'test', Sum('points')),
+            ).filter(
+                ~Q(question_count=F('actual_questions')) | ~Q(total_points=F('actual_points'))
+            ).values_list('id', flat=True)
+        )
+        listening_drift = list(
+            ListeningTest.objects.annotate(
+                actual_sections=aggregate_subquery(ListeningSection.objects.all(), 'test', Count('id')),
+                actual_questions=aggregate_subquery(ListeningQuestion.objects.all(), 'section__test', Count('id')),
+                actual_points=aggregate_subquery(ListeningQuestion.objects.all(), 'section__test', Sum('points')),
+            ).filter(
+                ~Q(section_count=F('actual_sections'))
+                | ~Q(question_count=F('actual_questions'))
+                | ~Q(total_points=F('actual_points'))
+            ).values_list('id', flat=True)
+        )
+
+        if reading_drift:
+            ReadingTest.refresh_counts(reading_drift)
+        if listening_drift:
+            ListeningTest.refresh_counts(listening_drift)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Repaired counters on {len(reading_drift)} reading and {len(listening_drift)} listening tests'
+        ))
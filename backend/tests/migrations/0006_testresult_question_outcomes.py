@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0005_writingtest_writingtestsubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listeninguserresult',
+            name='question_outcomes',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='testresult',
+            name='question_outcomes',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
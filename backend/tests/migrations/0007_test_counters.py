@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:57
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def _subquery(queryset, group_field, aggregate):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{group_field: OuterRef('pk')})
+            .order_by().values(group_field)
+            .annotate(value=aggregate).values('value')
+        ),
+        0,
+    )
+
+
+def populate_counters(apps, schema_editor):
+    ReadingTest = apps.get_model('tests', 'ReadingTest')
+    Question = apps.get_model('tests', 'Question')
+    ListeningTest = apps.get_model('tests', 'ListeningTest')
+    ListeningSection = apps.get_model('tests', 'ListeningSection')
+    ListeningQuestion = apps.get_model('tests', 'ListeningQuestion')
+
+    ReadingTest.objects.update(
+        question_count=_subquery(Question.objects.all(), 'test', Count('id')),
+        total_points=_subquery(Question.objects.all(), 'test', Sum('points')),
+    )
+    ListeningTest.objects.update(
+        section_count=_subquery(ListeningSection.objects.all(), 'test', Count('id')),
+        question_count=_subquery(ListeningQuestion.objects.all(), 'section__test', Count('id')),
+        total_points=_subquery(ListeningQuestion.objects.all(), 'section__test', Sum('points')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0006_testresult_question_outcomes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listeningtest',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='listeningtest',
+            name='section_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='listeningtest',
+            name='total_points',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='readingtest',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='readingtest',
+            name='total_points',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
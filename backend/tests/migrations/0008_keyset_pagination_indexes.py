@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:07
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('tests', '0007_test_counters'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='listeninguserresult',
+            index=models.Index(fields=['user', '-completed_at', '-id'], name='listening_results_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='testresult',
+            index=models.Index(fields=['user', '-completed_at', '-id'], name='test_results_user_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='writingtestsubmission',
+            index=models.Index(fields=['user', '-submitted_at', '-id'], name='writing_subs_user_recent_idx'),
+        ),
+    ]
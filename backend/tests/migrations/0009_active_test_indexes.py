@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:09
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('tests', '0008_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='listeningtest',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='listening_tests_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='readingtest',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='reading_tests_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='writingtest',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='writing_tests_active_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:12
+
+from django.db import migrations, models
+
+
+def mark_existing_submissions(apps, schema_editor):
+    # Submissions used to be evaluated during the request; one without an
+    # evaluation will never get one
+    WritingTestSubmission = apps.get_model('tests', 'WritingTestSubmission')
+    WritingTestSubmission.objects.filter(evaluated_at__isnull=False).update(evaluation_status='completed')
+    WritingTestSubmission.objects.filter(evaluated_at__isnull=True).update(
+        evaluation_status='failed', evaluation_error='Evaluation did not complete',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0009_active_test_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writingtestsubmission',
+            name='evaluation_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='writingtestsubmission',
+            name='evaluation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('evaluating', 'Evaluating'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_submissions, migrations.RunPython.noop),
+    ]
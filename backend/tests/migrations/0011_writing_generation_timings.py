@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0010_writing_evaluation_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writingtest',
+            name='generation_timings',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0011_writing_generation_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writingtestsubmission',
+            name='provisional_band_score',
+            field=models.DecimalField(blank=True, decimal_places=1, max_digits=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='writingtestsubmission',
+            name='text_features',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
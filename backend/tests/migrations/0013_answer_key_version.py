@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0012_writing_text_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listeningtest',
+            name='answer_key_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='readingtest',
+            name='answer_key_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,10 +1,24 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 import json
 
 User = get_user_model()
 
 
+def aggregate_subquery(queryset, group_field, aggregate):
+    """Correlated subquery computing one aggregate per outer test row"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{group_field: OuterRef('pk')})
+            .order_by().values(group_field)
+            .annotate(value=aggregate).values('value')
+        ),
+        0,
+    )
+
+
 class ReadingTest(models.Model):
     QUESTION_TYPES = [
         ('matching', 'Matching'),
@@ -25,11 +39,30 @@ class ReadingTest(models.Model):
         ('hard', 'Hard'),
     ], default='medium')
 
+    # Denormalized counters, kept current by tests.signals and refresh_counts()
+    question_count = models.PositiveIntegerField(default=0)
+    total_points = models.PositiveIntegerField(default=0)
+    # Bumped whenever a question changes, so every process rebuilds its cached answer key (see api.grading)
+    answer_key_version = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def refresh_counts(cls, test_ids=None):
+        """Recompute the counters of the given tests (all tests when test_ids is None)"""
+        tests = cls.objects.all() if test_ids is None else cls.objects.filter(pk__in=test_ids)
+        return tests.update(
+            question_count=aggregate_subquery(Question.objects.all(), 'test', Count('id')),
+            total_points=aggregate_subquery(Question.objects.all(), 'test', Sum('points')),
+        )
+
     class Meta:
         db_table = 'reading_tests'
+        indexes = [
+            # Catalog list: only active tests, newest first
+            models.Index(fields=['-created_at'], condition=Q(is_active=True), name='reading_tests_active_idx'),
+        ]
 
 
 class Question(models.Model):
@@ -63,6 +96,7 @@ class TestResult(models.Model):
     total_questions = models.PositiveIntegerField()
     correct_answers = models.PositiveIntegerField()
     answers = models.JSONField()  # Store user's answers
+    question_outcomes = models.JSONField(null=True, blank=True)  # Correct flags and awarded points per question
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     time_taken = models.DurationField(null=True, blank=True)
@@ -94,6 +128,10 @@ class TestResult(models.Model):
     class Meta:
         db_table = 'test_results'
         ordering = ['-completed_at']
+        indexes = [
+            # Serves the keyset-paginated history list (see api.pagination)
+            models.Index(fields=['user', '-completed_at', '-id'], name='test_results_user_recent_idx'),
+        ]
 
 
 # Listening Module Models
@@ -110,12 +148,32 @@ class ListeningTest(models.Model):
     ], default='medium')
     total_duration = models.PositiveIntegerField(default=30)  # minutes
 
+    # Denormalized counters, kept current by tests.signals and refresh_counts()
+    section_count = models.PositiveIntegerField(default=0)
+    question_count = models.PositiveIntegerField(default=0)
+    total_points = models.PositiveIntegerField(default=0)
+    # Bumped whenever a question changes, so every process rebuilds its cached answer key (see api.grading)
+    answer_key_version = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def refresh_counts(cls, test_ids=None):
+        """Recompute the counters of the given tests (all tests when test_ids is None)"""
+        tests = cls.objects.all() if test_ids is None else cls.objects.filter(pk__in=test_ids)
+        return tests.update(
+            section_count=aggregate_subquery(ListeningSection.objects.all(), 'test', Count('id')),
+            question_count=aggregate_subquery(ListeningQuestion.objects.all(), 'section__test', Count('id')),
+            total_points=aggregate_subquery(ListeningQuestion.objects.all(), 'section__test', Sum('points')),
+        )
+
     class Meta:
         db_table = 'listening_tests'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], condition=Q(is_active=True), name='listening_tests_active_idx'),
+        ]
 
 
 class ListeningSection(models.Model):
@@ -162,6 +220,12 @@ class ListeningQuestion(models.Model):
     def __str__(self):
         return f"{self.section} - Question {self.order}"
 
+    def get_test_id(self):
+        """Id of the listening test this question belongs to, without loading the section if possible"""
+        if ListeningQuestion.section.is_cached(self):
+            return self.section.test_id
+        return ListeningSection.objects.filter(pk=self.section_id).values_list('test_id', flat=True).first()
+
     class Meta:
         db_table = 'listening_questions'
         ordering = ['order']
@@ -175,6 +239,7 @@ class ListeningUserResult(models.Model):
     total_questions = models.PositiveIntegerField()
     correct_answers = models.PositiveIntegerField()
     answers = models.JSONField()  # Store user's answers
+    question_outcomes = models.JSONField(null=True, blank=True)  # Correct flags and awarded points per question
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     time_taken = models.DurationField(null=True, blank=True)
@@ -210,6 +275,10 @@ class ListeningUserResult(models.Model):
     class Meta:
         db_table = 'listening_user_results'
         ordering = ['-completed_at']
+        indexes = [
+            # Serves the keyset-paginated history list (see api.pagination)
+            models.Index(fields=['user', '-completed_at', '-id'], name='listening_results_recent_idx'),
+        ]
 
 
 # Writing Module Models
@@ -249,15 +318,32 @@ class WritingTest(models.Model):
     task1_time_limit = models.PositiveIntegerField(default=20)  # minutes
     task2_time_limit = models.PositiveIntegerField(default=40)  # minutes
 
+    # Milliseconds spent in each generation stage (see api.writing_generation)
+    generation_timings = models.JSONField(default=dict, blank=True)
+
     def __str__(self):
         return self.title
 
     class Meta:
         db_table = 'writing_tests'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], condition=Q(is_active=True), name='writing_tests_active_idx'),
+        ]
 
 
 class WritingTestSubmission(models.Model):
+    PENDING = 'pending'
+    EVALUATING = 'evaluating'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    EVALUATION_STATUSES = [
+        (PENDING, 'Pending'),
+        (EVALUATING, 'Evaluating'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='writing_submissions')
     test = models.ForeignKey(WritingTest, on_delete=models.CASCADE, related_name='submissions')
     
@@ -275,6 +361,15 @@ class WritingTestSubmission(models.Model):
     # Detailed evaluation criteria
     task1_criteria = models.JSONField(null=True, blank=True)  # Store detailed criteria scores
     task2_criteria = models.JSONField(null=True, blank=True)  # Store detailed criteria scores
+
+    # Local text analytics and the band estimated from them until the
+    # evaluation arrives (see api.text_analytics)
+    provisional_band_score = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
+    text_features = models.JSONField(null=True, blank=True)
+
+    # Background evaluation progress (see api.evaluation)
+    evaluation_status = models.CharField(max_length=20, choices=EVALUATION_STATUSES, default=PENDING)
+    evaluation_error = models.TextField(blank=True)
     
     # Timestamps
     submitted_at = models.DateTimeField(auto_now_add=True)
@@ -289,4 +384,8 @@ class WritingTestSubmission(models.Model):
 
     class Meta:
         db_table = 'writing_test_submissions'
-        ordering = ['-submitted_at'] 
\ No newline at end of file
+        ordering = ['-submitted_at']
+        indexes = [
+            # Serves the keyset-paginated history list (see api.pagination)
+            models.Index(fields=['user', '-submitted_at', '-id'], name='writing_subs_user_recent_idx'),
+        ]
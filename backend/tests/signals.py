@@ -0,0 +1,96 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import ReadingTest, Question, ListeningTest, ListeningSection, ListeningQuestion
+
+# Fields the denormalized counters depend on; saves that change none of them leave the counters alone
+COUNTED_FIELDS = {
+    Question: ('test_id', 'points'),
+    ListeningSection: ('test_id',),
+    ListeningQuestion: ('section_id', 'points'),
+}
+
+
+def deleted_with_parent(origin, parents):
+    """Whether a delete cascaded from one of ``parents``, whose own handlers cover it"""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, parents)
+    return isinstance(origin, parents)
+
+
+def _counted_values(instance):
+    # __dict__ rather than getattr, so a deferred field is not loaded
+    return {field: instance.__dict__.get(field) for field in COUNTED_FIELDS[type(instance)]}
+
+
+@receiver(post_init, sender=Question)
+@receiver(post_init, sender=ListeningSection)
+@receiver(post_init, sender=ListeningQuestion)
+def remember_counted_fields(sender, instance, **kwargs):
+    instance._counted = _counted_values(instance)
+
+
+@receiver(pre_save, sender=Question)
+@receiver(pre_save, sender=ListeningSection)
+@receiver(pre_save, sender=ListeningQuestion)
+def remember_replaced_fields(sender, instance, **kwargs):
+    # Every post_save handler compares against the stored values, whatever order they run in
+    instance._replaced = instance._counted
+    instance._counted = _counted_values(instance)
+
+
+def parent_ids(instance, parent_field, signal, created=False):
+    """Ids of the row's parent and, when a save moved it, of its previous parent"""
+    parents = {instance.__dict__.get(parent_field)}
+    if signal is post_save and not created:
+        parents.add(instance._replaced[parent_field])
+    return [pk for pk in parents if pk is not None]
+
+
+def changed_parents(instance, parent_field, signal, created=False):
+    """Ids of the parents whose counters a save or delete may have changed
+
+    Both the old and the new parent when the row moved; none when a save
+    changed no counted field.
+    """
+    if signal is post_save and not created and instance._replaced == instance._counted:
+        return []
+    return parent_ids(instance, parent_field, signal, created)
+
+
+def listening_test_ids(question, section_ids):
+    """Ids of the listening tests of the given sections of a question"""
+    if section_ids == [question.section_id]:
+        test_ids = [question.get_test_id()]
+    else:
+        test_ids = ListeningSection.objects.filter(pk__in=section_ids).values_list('test_id', flat=True)
+    return [test_id for test_id in test_ids if test_id is not None]
+
+
+@receiver([post_save, post_delete], sender=Question)
+def refresh_reading_counts(sender, instance, origin=None, created=False, **kwargs):
+    if deleted_with_parent(origin, (ReadingTest,)):
+        return
+    test_ids = changed_parents(instance, 'test_id', kwargs['signal'], created)
+    if test_ids:
+        ReadingTest.refresh_counts(test_ids)
+
+
+@receiver([post_save, post_delete], sender=ListeningSection)
+def refresh_listening_counts_for_section(sender, instance, origin=None, created=False, **kwargs):
+    if deleted_with_parent(origin, (ListeningTest,)):
+        return
+    test_ids = changed_parents(instance, 'test_id', kwargs['signal'], created)
+    if test_ids:
+        ListeningTest.refresh_counts(test_ids)
+
+
+@receiver([post_save, post_delete], sender=ListeningQuestion)
+def refresh_listening_counts_for_question(sender, instance, origin=None, created=False, **kwargs):
+    if deleted_with_parent(origin, (ListeningTest, ListeningSection)):
+        return
+    section_ids = changed_parents(instance, 'section_id', kwargs['signal'], created)
+    test_ids = listening_test_ids(instance, section_ids) if section_ids else []
+    if test_ids:
+        ListeningTest.refresh_counts(test_ids)
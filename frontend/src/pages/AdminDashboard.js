@@ -1,66 +1,95 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { FiBook, FiHeadphones, FiEdit3, FiPlus, FiLoader } from 'react-icons/fi';
 import axios from 'axios';
+
+const STAGE_LABELS = {
+  content: 'Content',
+  audio: 'Audio',
+  persisted: 'Saved',
+  image: 'Image',
+};
+
+const STATUS_COLORS = {
+  pending: 'text-gray-400',
+  running: 'text-blue-600',
+  done: 'text-green-600',
+  skipped: 'text-gray-400',
+  failed: 'text-red-600',
+};
+
 const AdminDashboard = () => {
   const { user } = useAuth();
   const [generatingReading, setGeneratingReading] = useState(false);
   const [generatingListening, setGeneratingListening] = useState(false);
   const [generatingWriting, setGeneratingWriting] = useState(false);
   const [message, setMessage] = useState('');
+  const [count, setCount] = useState(1);
+  const [generations, setGenerations] = useState([]);
+  const [pool, setPool] = useState(null);
 
-  const generateReadingTest = async () => {
-    setGeneratingReading(true);
-    setMessage('');
-    
+  const fetchPool = async () => {
     try {
-      const response = await axios.post('/api/generate-test/');
-      const data = response.data;
-      setMessage(`Reading test generated successfully! Test ID: ${data.test_id}`);
+      const response = await axios.get('/api/generations/pool/');
+      setPool(response.data);
     } catch (error) {
-      setMessage(`Error generating reading test: ${error.response?.data?.error || error.message}`);
-    } finally {
-      setGeneratingReading(false);
+      console.error('Error fetching test pool:', error);
     }
   };
 
-  const generateListeningTest = async () => {
-    setGeneratingListening(true);
-    setMessage('');
-    
-    try {
-      const response = await axios.post('/api/generate-listening-test/', {
-        difficulty_level: 'medium',
-        include_audio: true
-      });
-      const data = response.data;
-      setMessage(`Listening test generated successfully! Test ID: ${data.test_id}, Sections: ${data.sections_count}`);
-    } catch (error) {
-      setMessage(`Error generating listening test: ${error.response?.data?.error || error.message}`);
-    } finally {
-      setGeneratingListening(false);
-    }
-  };
+  useEffect(() => {
+    if (user?.is_staff) fetchPool();
+  }, [user]);
+
+  const pendingIds = generations.filter((generation) => !generation.done).map((generation) => generation.id);
 
-  const generateWritingTest = async () => {
-    setGeneratingWriting(true);
+  // Generation runs in the background job workers; poll until every queued test is finished
+  useEffect(() => {
+    if (pendingIds.length === 0) return undefined;
+    const timer = setInterval(async () => {
+      try {
+        const response = await axios.get('/api/generations/', {
+          params: { ids: pendingIds.join(','), page_size: pendingIds.length },
+        });
+        const updated = Object.fromEntries(response.data.results.map((generation) => [generation.id, generation]));
+        setGenerations((previous) => previous.map((generation) => updated[generation.id] || generation));
+      } catch (error) {
+        console.error('Error polling generation progress:', error);
+      }
+    }, 3000);
+    return () => clearInterval(timer);
+  }, [pendingIds.join(',')]);
+
+  const queueGeneration = async (label, url, body, setGenerating) => {
+    setGenerating(true);
     setMessage('');
-    
+
     try {
-      const response = await axios.post('/api/writing-tests/generate/', {
-        difficulty_level: 'medium',
-        task1_type: 'random',
-        task2_type: 'random'
-      });
+      const response = await axios.post(url, { ...body, count });
       const data = response.data;
-      setMessage(`Writing test generated successfully! Test ID: ${data.test_id}`);
+      setGenerations((previous) => [...data.generations, ...previous]);
+      setMessage(`${label} tests: ${data.pooled} ready from the pool, ${data.generations.length - data.pooled} queued`);
+      fetchPool();
     } catch (error) {
-      setMessage(`Error generating writing test: ${error.response?.data?.error || error.message}`);
+      setMessage(`Error generating ${label.toLowerCase()} test: ${error.response?.data?.error || error.message}`);
     } finally {
-      setGeneratingWriting(false);
+      setGenerating(false);
     }
   };
 
+  const generateReadingTest = () => queueGeneration(
+    'Reading', '/api/generate-test/', { difficulty_level: 'medium' }, setGeneratingReading
+  );
+
+  const generateListeningTest = () => queueGeneration(
+    'Listening', '/api/generate-listening-test/', { difficulty_level: 'medium', include_audio: true }, setGeneratingListening
+  );
+
+  const generateWritingTest = () => queueGeneration(
+    'Writing', '/api/writing-tests/generate/', { difficulty_level: 'medium', task1_type: 'random', task2_type: 'random' },
+    setGeneratingWriting
+  );
+
   if (!user?.is_staff) {
     return (
       <div className="min-h-screen bg-gray-50 flex items-center justify-center">
@@ -81,6 +110,21 @@ const AdminDashboard = () => {
           <p className="text-gray-600">Manage IELTS tests and content generation</p>
         </div>
 
+        {/* Batch size */}
+        <div className="flex items-center mb-4">
+          <label htmlFor="generation-count" className="text-gray-700 mr-3">Tests per generation</label>
+          <select
+            id="generation-count"
+            value={count}
+            onChange={(event) => setCount(Number(event.target.value))}
+            className="border border-gray-300 rounded-md px-3 py-1"
+          >
+            {[1, 2, 3, 5, 10].map((value) => (
+              <option key={value} value={value}>{value}</option>
+            ))}
+          </select>
+        </div>
+
         {/* Test Generation Section */}
         <div className="grid grid-cols-1 md:grid-cols-3 gap-8 mb-8">
           {/* Reading Test Generation */}
@@ -101,7 +145,7 @@ const AdminDashboard = () => {
               {generatingReading ? (
                 <>
                   <FiLoader className="animate-spin mr-2" />
-                  Generating...
+                  Queueing...
                 </>
               ) : (
                 <>
@@ -130,7 +174,7 @@ const AdminDashboard = () => {
               {generatingListening ? (
                 <>
                   <FiLoader className="animate-spin mr-2" />
-                  Generating...
+                  Queueing...
                 </>
               ) : (
                 <>
@@ -159,7 +203,7 @@ const AdminDashboard = () => {
               {generatingWriting ? (
                 <>
                   <FiLoader className="animate-spin mr-2" />
-                  Generating...
+                  Queueing...
                 </>
               ) : (
                 <>
@@ -181,6 +225,79 @@ const AdminDashboard = () => {
           </div>
         )}
 
+        {/* Generation Progress */}
+        {generations.length > 0 && (
+          <div className="bg-white rounded-lg shadow-md p-6 mb-8">
+            <h3 className="text-lg font-semibold text-gray-900 mb-4">Generation Progress</h3>
+            <ul className="space-y-4">
+              {generations.map((generation) => (
+                <li key={generation.id}>
+                  <div className="flex justify-between text-sm mb-1">
+                    <span className="font-medium text-gray-900 capitalize">
+                      {generation.kind} #{generation.id}
+                      {generation.test_id && <span className="text-gray-500"> → test {generation.test_id}</span>}
+                    </span>
+                    <span className={generation.status === 'failed' ? 'text-red-600' : 'text-gray-600'}>
+                      {generation.status} · {generation.progress}%
+                    </span>
+                  </div>
+                  <div className="w-full bg-gray-200 rounded-full h-2 mb-1">
+                    <div
+                      className={`h-2 rounded-full ${generation.status === 'failed' ? 'bg-red-500' : 'bg-blue-600'}`}
+                      style={{ width: `${generation.progress}%` }}
+                    />
+                  </div>
+                  <div className="flex flex-wrap gap-x-4 text-xs">
+                    {generation.stages.map((stage) => (
+                      <span key={stage.name} className={STATUS_COLORS[stage.status]}>
+                        {STAGE_LABELS[stage.name] || stage.name}: {stage.status}
+                        {stage.sections && ` (${stage.sections.filter((section) => section.status === 'done').length}/${stage.sections.length} sections)`}
+                        {stage.questions && ` (${stage.questions.questions}/40 questions${stage.questions.follow_ups ? `, ${stage.questions.follow_ups} follow-ups` : ''})`}
+                      </span>
+                    ))}
+                  </div>
+                  {generation.error && <p className="text-xs text-red-600 mt-1">{generation.error}</p>}
+                </li>
+              ))}
+            </ul>
+          </div>
+        )}
+
+        {/* Test Pool */}
+        {pool && pool.targets.length > 0 && (
+          <div className="bg-white rounded-lg shadow-md p-6 mb-8">
+            <h3 className="text-lg font-semibold text-gray-900 mb-2">Pre-generated Test Pool</h3>
+            <p className="text-sm text-gray-600 mb-4">
+              {pool.off_peak ? 'Off-peak: refilling to target' : 'Peak hours: only empty targets are refilled'}
+              {pool.next_refill_at && ` · next refill ${new Date(pool.next_refill_at).toLocaleTimeString()}`}
+            </p>
+            <table className="w-full text-sm">
+              <thead>
+                <tr className="text-left text-gray-500">
+                  <th className="py-1">Target</th>
+                  <th className="py-1">Ready</th>
+                  <th className="py-1">Generating</th>
+                  <th className="py-1">Refill lag</th>
+                </tr>
+              </thead>
+              <tbody>
+                {pool.targets.map((target) => (
+                  <tr key={`${target.kind}:${Object.values(target.params).join(':')}`} className="border-t">
+                    <td className="py-1 capitalize">
+                      {target.kind} ({Object.values(target.params).filter((value) => typeof value === 'string').join(', ')})
+                    </td>
+                    <td className={`py-1 ${target.ready < target.target ? 'text-orange-600' : 'text-green-600'}`}>
+                      {target.ready} / {target.target}
+                    </td>
+                    <td className="py-1">{target.in_flight}</td>
+                    <td className="py-1">{target.refill_lag_seconds ? `${Math.round(target.refill_lag_seconds / 60)} min` : '-'}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        )}
+
         {/* Admin Information */}
         <div className="bg-white rounded-lg shadow-md p-6">
           <h2 className="text-xl font-semibold text-gray-900 mb-4">Admin Information</h2>
@@ -8,6 +8,7 @@ const ListeningResults = () => {
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextPage, setNextPage] = useState(null);
 
   useEffect(() => {
     fetchResults();
@@ -16,8 +17,8 @@ const ListeningResults = () => {
   const fetchResults = async () => {
     try {
       const response = await axios.get('/api/listening-results/');
-      const data = response.data;
       setResults(response.data.results || response.data);
+      setNextPage(response.data.next || null);
       setLoading(false);
     } catch (err) {
       setError(err.response?.data?.error || err.message);
@@ -25,6 +26,16 @@ const ListeningResults = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      const response = await axios.get(`/api/listening-results/${new URL(nextPage).search}`);
+      setResults((previous) => [...previous, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      setError(err.response?.data?.error || err.message);
+    }
+  };
+
   const getScoreColor = (score) => {
     if (score >= 7.0) return 'text-green-600';
     if (score >= 6.0) return 'text-yellow-600';
@@ -144,6 +155,16 @@ const ListeningResults = () => {
               </div>
             </div>
           ))}
+          {nextPage && (
+            <div className="text-center">
+              <button
+                onClick={loadMore}
+                className="px-4 py-2 text-sm font-medium text-blue-600 border border-blue-600 rounded-md hover:bg-blue-50"
+              >
+                Load more
+              </button>
+            </div>
+          )}
         </div>
 
         {/* Empty State */}
@@ -29,6 +29,7 @@ const Results = () => {
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(true);
   const [stats, setStats] = useState(null);
+  const [nextPage, setNextPage] = useState(null);
 
   useEffect(() => {
     fetchResults();
@@ -42,6 +43,7 @@ const Results = () => {
       ]);
       
       setResults(resultsResponse.data.results || resultsResponse.data);
+      setNextPage(resultsResponse.data.next || null);
       setStats(statsResponse.data);
     } catch (error) {
       console.error('Error fetching results:', error);
@@ -51,6 +53,17 @@ const Results = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      const response = await axios.get(`/api/results/${new URL(nextPage).search}`);
+      setResults((previous) => [...previous, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (error) {
+      console.error('Error fetching results:', error);
+      toast.error('Failed to load more results');
+    }
+  };
+
   const formatTime = (seconds) => {
     const minutes = Math.floor(seconds / 60);
     const remainingSeconds = seconds % 60;
@@ -236,6 +249,16 @@ const Results = () => {
                 </div>
               </div>
             ))}
+            {nextPage && (
+              <div className="text-center pt-2">
+                <button
+                  onClick={loadMore}
+                  className="px-4 py-2 text-sm font-medium text-primary-600 border border-primary-600 rounded-lg hover:bg-primary-50 transition-colors duration-200"
+                >
+                  Load more
+                </button>
+              </div>
+            )}
           </div>
         ) : (
           <div className="text-center py-12">
@@ -16,6 +16,26 @@ const WritingResultDetail = () => {
     fetchWritingResult();
   }, [resultId]);
 
+  const evaluationInProgress = ['pending', 'evaluating'].includes(result?.evaluation_status);
+
+  // The evaluation runs in the background; poll until it finishes
+  useEffect(() => {
+    if (!evaluationInProgress) return undefined;
+    const timer = setInterval(async () => {
+      try {
+        const response = await axios.get(`/api/writing-results/${resultId}/status/`);
+        if (response.data.evaluation_status === 'completed') {
+          fetchWritingResult();
+        } else {
+          setResult((previous) => ({ ...previous, ...response.data }));
+        }
+      } catch (error) {
+        console.error('Error polling evaluation status:', error);
+      }
+    }, 3000);
+    return () => clearInterval(timer);
+  }, [evaluationInProgress, resultId]);
+
   const fetchWritingResult = async () => {
     console.log('fetchWritingResult', resultId);
     try {
@@ -29,6 +49,9 @@ const WritingResultDetail = () => {
     }
   };
 
+  // The provisional band from text analytics stands in until the evaluation arrives
+  const bandScore = (result) => result.overall_band_score || result.provisional_band_score;
+
   const getScoreColor = (score) => {
     if (score >= 8) return 'text-green-600';
     if (score >= 7) return 'text-blue-600';
@@ -99,13 +122,27 @@ const WritingResultDetail = () => {
             </div>
           </div>
           <div className="text-right">
-            <div className={`inline-flex items-center px-4 py-2 rounded-full text-2xl font-bold ${getScoreBgColor(result.overall_band_score)} ${getScoreColor(result.overall_band_score)}`}>
-              {result.overall_band_score || 'N/A'}
+            <div className={`inline-flex items-center px-4 py-2 rounded-full text-2xl font-bold ${getScoreBgColor(bandScore(result))} ${getScoreColor(bandScore(result))}`}>
+              {bandScore(result) || 'N/A'}
             </div>
-            <p className="text-sm text-gray-600 mt-1">Overall Band Score</p>
+            <p className="text-sm text-gray-600 mt-1">
+              {result.overall_band_score ? 'Overall Band Score' : result.provisional_band_score ? 'Provisional Band Score' : 'Overall Band Score'}
+            </p>
           </div>
         </div>
 
+        {evaluationInProgress && (
+          <div className="flex items-center bg-purple-50 text-purple-800 rounded-md p-3 mb-4">
+            <FiLoader className="animate-spin mr-2" />
+            <span>Your writing is being evaluated. Scores and feedback will appear here shortly.</span>
+          </div>
+        )}
+        {result.evaluation_status === 'failed' && (
+          <div className="bg-red-50 text-red-800 rounded-md p-3 mb-4">
+            We could not evaluate this submission. Please try submitting again later.
+          </div>
+        )}
+
         <button
           onClick={() => navigate('/writing-results')}
           className="flex items-center text-gray-600 hover:text-gray-800"
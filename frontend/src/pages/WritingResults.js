@@ -9,6 +9,7 @@ const WritingResults = () => {
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextPage, setNextPage] = useState(null);
 
   useEffect(() => {
     fetchWritingResults();
@@ -18,6 +19,7 @@ const WritingResults = () => {
     try {
       const response = await axios.get('/api/writing-results/');
       setResults(response.data.results || response.data);
+      setNextPage(response.data.next || null);
     } catch (error) {
       setError('Failed to fetch writing results');
       console.error('Error fetching writing results:', error);
@@ -26,6 +28,20 @@ const WritingResults = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      const response = await axios.get(`/api/writing-results/${new URL(nextPage).search}`);
+      setResults((previous) => [...previous, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (error) {
+      setError('Failed to fetch writing results');
+      console.error('Error fetching writing results:', error);
+    }
+  };
+
+  // The provisional band from text analytics stands in until the evaluation arrives
+  const bandScore = (result) => result.overall_band_score || result.provisional_band_score;
+
   const getScoreColor = (score) => {
     if (score >= 8) return 'text-green-600';
     if (score >= 7) return 'text-blue-600';
@@ -98,10 +114,12 @@ const WritingResults = () => {
                   </div>
                 </div>
                 <div className="text-right">
-                  <div className={`inline-flex items-center px-3 py-1 rounded-full text-lg font-bold ${getScoreBgColor(result.overall_band_score)} ${getScoreColor(result.overall_band_score)}`}>
-                    {result.overall_band_score || 'N/A'}
+                  <div className={`inline-flex items-center px-3 py-1 rounded-full text-lg font-bold ${getScoreBgColor(bandScore(result))} ${getScoreColor(bandScore(result))}`}>
+                    {bandScore(result) || 'N/A'}
                   </div>
-                  <p className="text-sm text-gray-600 mt-1">Overall Band Score</p>
+                  <p className="text-sm text-gray-600 mt-1">
+                    {result.overall_band_score ? 'Overall Band Score' : result.provisional_band_score ? 'Provisional Band Score' : 'Overall Band Score'}
+                  </p>
                 </div>
               </div>
 
@@ -142,6 +160,16 @@ const WritingResults = () => {
               </div>
             </div>
           ))}
+          {nextPage && (
+            <div className="text-center">
+              <button
+                onClick={loadMore}
+                className="px-4 py-2 text-sm font-medium text-purple-600 border border-purple-600 rounded-md hover:bg-purple-50 transition-colors duration-200"
+              >
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="text-center py-12">